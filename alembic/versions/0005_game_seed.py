@@ -0,0 +1,34 @@
+"""per-game simulation seed on games
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Every scheduled game is now simulated from its own seed, derived from
+(season, week, home, away, season seed) by handball.season.game_seed. Store it
+on the game row so any game can be re-simulated on its own. Nullable: games
+recorded before this (or played unseeded, e.g. ad-hoc matchups) have none.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = r"""
+alter table games add column seed bigint;
+"""
+
+SCHEMA_DOWN = r"""
+alter table games drop column if exists seed;
+"""
+
+
+def upgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA)
+
+
+def downgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA_DOWN)
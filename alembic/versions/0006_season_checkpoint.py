@@ -0,0 +1,38 @@
+"""in-period run checkpoint on season_state
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+A period now commits week by week. season_state records the last committed week
+and the injury simulator's RNG state at that point, so an interrupted run can
+resume at the next week (SeasonRunner.resume_period) instead of being rolled
+back. season_state is created outside these migrations, hence `if exists`.
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = r"""
+alter table if exists season_state
+    add column if not exists checkpoint_week integer not null default 0,
+    add column if not exists injury_rng_state jsonb;
+"""
+
+SCHEMA_DOWN = r"""
+alter table if exists season_state
+    drop column if exists injury_rng_state,
+    drop column if exists checkpoint_week;
+"""
+
+
+def upgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA)
+
+
+def downgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA_DOWN)
@@ -0,0 +1,56 @@
+"""sim_jobs work queue
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+Period simulation moves out of the API process into `python -m handball.worker`
+processes. The API enqueues a period as one row per game plus a period_end row;
+workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED (see handball/sim_jobs.py).
+`stage` orders a period's rows (the week for a game, last week + 1 for
+period_end); the partial index serves the claim query's "no unfinished earlier
+stage" check. Backend-only, like the raw players table: RLS on, no policies.
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = r"""
+create table if not exists sim_jobs (
+    id          bigserial primary key,
+    season      integer not null,
+    period      integer not null,
+    stage       integer not null,
+    kind        text not null check (kind in ('game', 'period_end')),
+    week        integer,
+    home_slug   text,
+    away_slug   text,
+    seed        bigint,
+    status      text not null default 'queued' check (status in ('queued', 'done', 'failed')),
+    error       text,
+    created_at  timestamptz not null default now(),
+    finished_at timestamptz,
+    check ((kind = 'game') = (week is not null and home_slug is not null and away_slug is not null))
+);
+
+create index if not exists sim_jobs_open_idx
+    on sim_jobs (season, period, stage) where status <> 'done';
+
+alter table sim_jobs enable row level security;
+"""
+
+SCHEMA_DOWN = r"""
+drop table if exists sim_jobs;
+"""
+
+
+def upgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA)
+
+
+def downgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA_DOWN)
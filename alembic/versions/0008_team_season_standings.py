@@ -0,0 +1,146 @@
+"""team_season_standings: incrementally maintained league table
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+One row per (season, team), updated by PostgresRecordSink in the same transaction
+as each game insert and reversed by schedule_repository.reset_run (see
+handball/standings_repository.py). It carries everything the tiebreakers need --
+W-L-T, goals for/against, home/away, division and conference splits, the current
+streak -- so draft seeding, playoff seeding and the Standings page read one
+indexed table instead of aggregating `games`.
+
+goal_diff is a stored generated column so the ranking order (wins desc, losses,
+goal_diff desc, goals_for desc) is a plain index scan. Division/conference splits
+come from the fixture's schedule_games.matchup_type; a game with no fixture (no
+week) counts only toward the overall and home/away columns.
+
+Existing games are backfilled, streaks included. Read-unlocked for members like
+`games` (Supabase only; RLS is on everywhere).
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+SCHEMA = r"""
+create table if not exists team_season_standings (
+    season        integer not null,
+    team_id       uuid not null references teams(id) on delete cascade,
+    wins          integer not null default 0,
+    losses        integer not null default 0,
+    ties          integer not null default 0,
+    goals_for     integer not null default 0,
+    goals_against integer not null default 0,
+    goal_diff     integer generated always as (goals_for - goals_against) stored,
+    home_wins     integer not null default 0,
+    home_losses   integer not null default 0,
+    home_ties     integer not null default 0,
+    away_wins     integer not null default 0,
+    away_losses   integer not null default 0,
+    away_ties     integer not null default 0,
+    div_wins      integer not null default 0,
+    div_losses    integer not null default 0,
+    div_ties      integer not null default 0,
+    conf_wins     integer not null default 0,
+    conf_losses   integer not null default 0,
+    conf_ties     integer not null default 0,
+    streak        integer not null default 0,   -- +n: n straight wins, -n: losses, 0 after a tie
+    updated_at    timestamptz not null default now(),
+    primary key (season, team_id)
+);
+
+create index if not exists team_season_standings_rank_idx
+    on team_season_standings (season, wins desc, losses, goal_diff desc, goals_for desc);
+
+alter table team_season_standings enable row level security;
+"""
+
+# One row per team per scored game, then summed; the streak is the length of
+# the run of equal results ending at the team's latest game.
+BACKFILL = r"""
+with sides as (
+    select g.season, g.week, g.played_at, g.home_team_id as team_id, true as home,
+           g.home_score as gf, g.away_score as ga, sg.matchup_type
+    from games g
+    left join schedule_games sg on sg.season = g.season and sg.week = g.week
+         and sg.home_team_id = g.home_team_id and sg.away_team_id = g.away_team_id
+    where g.home_score is not null and g.away_score is not null
+    union all
+    select g.season, g.week, g.played_at, g.away_team_id, false,
+           g.away_score, g.home_score, sg.matchup_type
+    from games g
+    left join schedule_games sg on sg.season = g.season and sg.week = g.week
+         and sg.home_team_id = g.home_team_id and sg.away_team_id = g.away_team_id
+    where g.home_score is not null and g.away_score is not null
+),
+results as (
+    select *, sign(gf - ga)::int as res,
+           matchup_type in ('division_rival', 'division_non_rival') as div,
+           matchup_type in ('division_rival', 'division_non_rival', 'conference') as conf,
+           row_number() over (partition by season, team_id
+                              order by week desc nulls last, played_at desc) as rn
+    from sides
+),
+streaks as (
+    select l.season, l.team_id,
+           l.res * coalesce((select min(r.rn) from results r
+                             where r.season = l.season and r.team_id = l.team_id
+                               and r.res <> l.res) - 1,
+                            (select count(*) from results r
+                             where r.season = l.season and r.team_id = l.team_id)) as streak
+    from results l where l.rn = 1
+)
+insert into team_season_standings (
+    season, team_id, wins, losses, ties, goals_for, goals_against,
+    home_wins, home_losses, home_ties, away_wins, away_losses, away_ties,
+    div_wins, div_losses, div_ties, conf_wins, conf_losses, conf_ties, streak)
+select r.season, r.team_id,
+       count(*) filter (where res > 0), count(*) filter (where res < 0),
+       count(*) filter (where res = 0), sum(gf), sum(ga),
+       count(*) filter (where home and res > 0), count(*) filter (where home and res < 0),
+       count(*) filter (where home and res = 0),
+       count(*) filter (where not home and res > 0), count(*) filter (where not home and res < 0),
+       count(*) filter (where not home and res = 0),
+       count(*) filter (where div and res > 0), count(*) filter (where div and res < 0),
+       count(*) filter (where div and res = 0),
+       count(*) filter (where conf and res > 0), count(*) filter (where conf and res < 0),
+       count(*) filter (where conf and res = 0),
+       max(s.streak)
+from results r
+join streaks s on s.season = r.season and s.team_id = r.team_id
+where r.team_id is not null
+group by r.season, r.team_id
+on conflict (season, team_id) do nothing;
+"""
+
+SUPABASE = r"""
+do $do$
+begin
+  if not exists (select 1 from pg_roles where rolname = 'authenticated') then
+    return;
+  end if;
+  execute $q$ grant select on team_season_standings to authenticated $q$;
+  execute $q$ create policy team_season_standings_read on team_season_standings
+            for select to authenticated using (true) $q$;
+end
+$do$;
+"""
+
+SCHEMA_DOWN = r"""
+drop table if exists team_season_standings;
+"""
+
+
+def upgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA)
+    op.get_bind().exec_driver_sql(BACKFILL)
+    op.get_bind().exec_driver_sql(SUPABASE)
+
+
+def downgrade() -> None:
+    op.get_bind().exec_driver_sql(SCHEMA_DOWN)
@@ -15,23 +15,27 @@ trade_service. Authorization is by manager↔team ownership + the commissioner r
 """
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-import threading
-import urllib.request
+from dataclasses import asdict
 
-from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
 from handball import offseason
 from handball import schedule_repository as sched_repo
+from handball import sim_jobs
+from handball import standings_repository
 from handball import trade_service as ts
 from handball.db import get_engine
 from handball.domain import ArrangementError
-from handball.league import build_production_league_pg
 from handball.league_views import TeamArrangement
 from handball.pg_repository import PostgresTeamRepository
+from handball.progress import GAME_FINISHED, GameRate, PostgresProgressBus
 from handball.season import PERIODS
 
 from api.auth import Manager, get_current_manager
@@ -54,6 +58,8 @@ app.add_middleware(
 
 engine = get_engine()
 repo = PostgresTeamRepository(engine)
+# Workers NOTIFY their progress; /periods/progress streams it to the browser.
+progress = PostgresProgressBus(engine)
 
 
 # -- request bodies --------------------------------------------------------
@@ -226,11 +232,13 @@ def _run_transition(fn, trade_id: str):
 def season_state(mgr: Manager = Depends(get_current_manager)):
     """Current run cursor + gating flags for the Commissioner page. Any
     authenticated manager may read it; only the commissioner can act on it. The
-    page polls this while a period runs (run_status == 'running')."""
+    page polls this while a period runs (run_status == 'running'); run_progress
+    counts the run's sim_jobs as the workers drain them."""
     season = _active_season()
     state = sched_repo.get_season_state(engine, season)
     periods_run = state["periods_run"] if state else 0
     run_status = state["run_status"] if state else "idle"
+    run_period = state["run_period"] if state else None
     return {
         "season": season,
         "periods_run": periods_run,
@@ -239,13 +247,58 @@ def season_state(mgr: Manager = Depends(get_current_manager)):
         "schedule_generated": bool(state and state["schedule_generated"]),
         "queue_clear": _queue_clear(),
         "run_status": run_status,
-        "run_period": state["run_period"] if state else None,
+        "run_period": run_period,
         "run_error": state["run_error"] if state else None,
+        "run_progress": sim_jobs.progress(engine, season, run_period) if run_period else None,
+        "checkpoint_week": state["checkpoint_week"] if state else 0,
         "run_stale": _run_stale(state),
         "regular_season_complete": periods_run >= PERIODS,
     }
 
 
+# An SSE comment line this often keeps proxies from closing an idle stream.
+_PROGRESS_KEEPALIVE_SECONDS = 15
+# How often an idle stream checks its subscription and the client connection.
+_PROGRESS_POLL_SECONDS = 0.25
+
+
+@app.get("/periods/progress")
+def period_progress(request: Request, mgr: Manager = Depends(get_current_manager)):
+    """Server-Sent Events stream of the workers' progress: one event per game
+    finished, week committed, injury step and period done (event name = the
+    ProgressEvent kind, data = its JSON). Game events also carry games_per_sec
+    over the last ten seconds. One long-lived response instead of polling
+    /season/state; any authenticated manager may watch."""
+    return StreamingResponse(
+        _progress_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _progress_stream(request: Request):
+    """Polls the subscription on the event loop (no threadpool thread per
+    stream) and ends -- closing the subscription -- when the client goes; the
+    `with` also closes it if the response is cancelled mid-wait."""
+    rate = GameRate()
+    with progress.subscribe() as sub:
+        idle = 0.0
+        while not await request.is_disconnected():
+            event = sub.get(timeout=0)
+            if event is None:
+                await asyncio.sleep(_PROGRESS_POLL_SECONDS)
+                idle += _PROGRESS_POLL_SECONDS
+                if idle >= _PROGRESS_KEEPALIVE_SECONDS:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+                continue
+            idle = 0.0
+            data = asdict(event)
+            if event.kind == GAME_FINISHED:
+                data["games_per_sec"] = round(rate.add(event.at), 2)
+            yield f"event: {event.kind}\ndata: {json.dumps(data)}\n\n"
+
+
 def _run_stale(state: dict | None) -> bool:
     """A 'running' row whose heartbeat has gone quiet -- the worker died mid-run."""
     return bool(
@@ -282,62 +335,37 @@ def generate_schedule(mgr: Manager = Depends(get_current_manager)):
     return {"season": season, "fixtures": n}
 
 
-# A 'running' row whose heartbeat is older than this is treated as a dead worker
-# (the web instance was spun down / restarted mid-run). The keep-alive heartbeats
-# every 60s, so 5 missed beats is a confident "it died".
+# A 'running' row whose heartbeat is older than this is treated as a dead run:
+# workers heartbeat with every job they finish (a game takes seconds), so five
+# quiet minutes means no worker is draining the queue.
 STALE_RUN_SECONDS = 300
-_KEEPALIVE_PERIOD_SECONDS = 60
-
-
-def _keepalive_loop(season: int, stop: threading.Event) -> None:
-    """While a period runs, every minute: heartbeat the run (so a live-but-slow run
-    isn't mistaken for dead) and ping our own public URL (an inbound request resets
-    the free-tier idle timer, so the instance isn't spun down mid-run). Both are
-    best-effort; the public URL comes from Render's $RENDER_EXTERNAL_URL (or an
-    explicit $NHA_SELF_PING_URL), and is simply skipped locally where it's unset."""
-    base = os.environ.get("RENDER_EXTERNAL_URL") or os.environ.get("NHA_SELF_PING_URL")
-    health = base.rstrip("/") + "/health" if base else None
-    while not stop.wait(_KEEPALIVE_PERIOD_SECONDS):
-        try:
-            sched_repo.heartbeat(engine, season)
-        except Exception:  # noqa: BLE001 - never let keep-alive kill the run
-            pass
-        if health:
-            try:
-                urllib.request.urlopen(health, timeout=10).read()
-            except Exception:  # noqa: BLE001
-                pass
-
-
-def _run_period_job(season: int, period: int, injury_seed: int | None) -> None:
-    """Background worker: simulate one period and persist results, then advance the
-    cursor. A period is ~150 games / minutes against a remote DB, so it runs off the
-    request thread; status/errors land in season_state for the website to poll. A
-    keep-alive thread heartbeats + pings the instance warm for the duration."""
-    stop = threading.Event()
-    keepalive = threading.Thread(target=_keepalive_loop, args=(season, stop), daemon=True)
-    keepalive.start()
-    try:
-        schedule = sched_repo.load_schedule(engine, season)
-        league = build_production_league_pg(
-            year=season, seed=injury_seed, schedule=schedule
-        )
-        league.run_period(period)
-        sched_repo.bump_periods_run(engine, season)
-        sched_repo.set_run_status(engine, season, "done", period=period)
-    except Exception as e:  # noqa: BLE001 - surface any failure to the operator
-        sched_repo.set_run_status(engine, season, "error", period=period, error=str(e))
-    finally:
-        stop.set()
+
+
+def _enqueue_period(season: int, period: int, injury_seed: int | None, *, after_week: int = 0) -> int:
+    """Queue `period` for the workers (python -m handball.worker) and flip the
+    run to 'running', in one transaction so a double-click can't queue it twice."""
+    schedule = sched_repo.load_schedule(engine, season)
+    with engine.begin() as conn:
+        n = sim_jobs.enqueue_period(conn, season, period, schedule, injury_seed,
+                                    after_week=after_week)
+        _mark_running(conn, season, period)
+    return n
+
+
+def _mark_running(conn, season: int, period: int) -> None:
+    conn.execute(
+        text("update season_state set run_status = 'running', run_period = :p, "
+             "run_error = null, updated_at = now() where season = :s"),
+        {"s": season, "p": period},
+    )
 
 
 @app.post("/periods/run", status_code=202)
-def run_period(
-    background: BackgroundTasks, mgr: Manager = Depends(get_current_manager)
-):
-    """Kick off simulation of the next period in the background and return 202. The
-    Commissioner page polls /season/state for completion. Commissioner-only; the
-    trade queue must be clear and no run may already be in flight."""
+def run_period(mgr: Manager = Depends(get_current_manager)):
+    """Queue the next period for the simulation workers and return 202. The
+    Commissioner page polls /season/state for progress and completion.
+    Commissioner-only; the trade queue must be clear and no run may already be
+    in flight."""
     _require_commissioner(mgr)
     season = _active_season()
     state = sched_repo.get_season_state(engine, season)
@@ -347,7 +375,7 @@ def run_period(
         if _run_stale(state):
             raise HTTPException(
                 status_code=409,
-                detail="the previous run was interrupted; reset it before running again",
+                detail="the previous run was interrupted; resume or reset it before running again",
             )
         raise HTTPException(status_code=409, detail="a period is already running")
 
@@ -360,11 +388,8 @@ def run_period(
             detail="clear the trade approval queue before running a period",
         )
 
-    # Flip to 'running' synchronously (so a double-click is rejected above), then
-    # hand the heavy work to a background task that runs after the response.
-    sched_repo.set_run_status(engine, season, "running", period=next_period, error=None)
-    background.add_task(_run_period_job, season, next_period, state["injury_seed"])
-    return {"season": season, "period": next_period, "run_status": "running"}
+    jobs = _enqueue_period(season, next_period, state["injury_seed"])
+    return {"season": season, "period": next_period, "jobs": jobs, "run_status": "running"}
 
 
 @app.post("/periods/reset")
@@ -386,6 +411,35 @@ def reset_run(mgr: Manager = Depends(get_current_manager)):
     return {"season": season, "rolled_back_games": rolled, "run_status": "idle"}
 
 
+@app.post("/periods/resume", status_code=202)
+def resume_run(mgr: Manager = Depends(get_current_manager)):
+    """The alternative to /periods/reset: continue an interrupted (stale 'running')
+    or failed ('error') period, keeping the work already done. Its failed jobs go
+    back in the queue; a period with no jobs (run before the queue existed) is
+    queued from the week after its last committed one. Same gating as reset;
+    returns 202 like /periods/run."""
+    _require_commissioner(mgr)
+    season = _active_season()
+    state = sched_repo.get_season_state(engine, season)
+    if not state:
+        raise HTTPException(status_code=409, detail="no season to resume")
+    if state["run_status"] == "running" and not _run_stale(state):
+        raise HTTPException(status_code=409, detail="a period is currently in progress")
+    if state["run_status"] not in ("running", "error") or state["run_period"] is None:
+        raise HTTPException(status_code=409, detail="nothing to resume")
+
+    period = state["run_period"]
+    with engine.begin() as conn:
+        queued = sim_jobs.has_jobs(conn, season, period)
+        if queued:
+            sim_jobs.requeue_failed(conn, season, period)
+            _mark_running(conn, season, period)
+    if not queued:
+        _enqueue_period(season, period, state["injury_seed"], after_week=state["checkpoint_week"])
+    return {"season": season, "period": period, "resume_after_week": state["checkpoint_week"],
+            "run_status": "running"}
+
+
 # -- offseason: retirement + advance season --------------------------------
 @app.get("/retirement/candidates")
 def retirement_candidates(mgr: Manager = Depends(get_current_manager)):
@@ -421,6 +475,6 @@ def advance_season(mgr: Manager = Depends(get_current_manager)):
             status_code=409, detail="clear the trade approval queue before advancing"
         )
 
-    # Standings (best->worst) read before the rollover zeroes records.
-    ranked = build_production_league_pg(year=season).ranked_team_ids()
+    # Standings (best->worst, goal-differential tiebreaks) for the finished season.
+    ranked = standings_repository.ranked_team_ids(engine, season)
     return offseason.advance_season(engine, season, ranked)
@@ -0,0 +1,363 @@
+"""
+Name: batch_simulator.py
+Description: Vectorized multi-game simulation. GameSimulator plays one game at a
+    time in a pure-Python loop, and with REGULATION_TIME = 60*3600 every game is
+    tens of thousands of possessions -- fine for a week of league play, far too
+    slow for projections and playoff-odds runs that need thousands of games.
+
+    BatchGameSimulator plays N games at once. Every per-game variable of the
+    scalar simulator (ball position, clock, phase, possession, scores, per-scorer
+    shot/goal counters, goalie saves/goals allowed, turnovers) is a NumPy array
+    indexed by game, and each loop iteration advances every live game by ONE
+    action (a shot or a pass) using masks -- the same decision tree as
+    GameSimulator.offensive_posession / StatTracker.take_shot, evaluated for all
+    games together. Games that finish simply drop out of the live mask.
+
+    The batch engine reproduces the scalar simulator's rules, including its
+    quirks, so the two are statistically interchangeable:
+      - team stats are sampled by game_simulator.calculate_team_stats (same
+        draws, same update_performances call);
+      - at halftime the stats side flips back to the team that lost the coin toss
+        but the scoring-credit flag does NOT, so second-half credit and stats can
+        be misaligned exactly as in simulate_game;
+      - the halftime goalie swap is undone on the first second-half possession,
+        so the starting goalie faces every shot;
+      - tied regulation goes to sudden-death overtime unless allow_tie.
+
+    It does NOT replay the scalar simulator draw-for-draw (the random streams are
+    consumed in a different order), and it keeps no scoring log.
+
+    By default the whole batch shares one Generator. Given per-game `seeds`, each
+    game instead draws from its own stream (_GameStreams), so a game's result
+    depends only on its teams and seed -- not on what else is in the batch.
+
+    BatchGameEngine wraps it as a GameEngine, returning the same GameResult
+    objects GameSimulatorAdapter builds, so SeasonOrchestrator and PlayoffService
+    can use it unchanged.
+Author: Oliver Hvidsten (oliverhvidsten@gmail.com)
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from handball.domain import Team
+from handball.game_simulator import calculate_team_stats, team_matrix
+from handball.orchestration import GameResult, game_lines_for
+from handball.utils import AliasTable, RandomSource
+from handball.simulation_vars import (
+    REGULATION_TIME, K, TIME_PER_PASS, TIME_PER_SHOT, TIME_AFTER_SCORE
+    )
+
+HOME, AWAY = 0, 1
+
+# Game phases. A game is live while phase < DONE.
+FIRST_HALF, SECOND_HALF, OVERTIME, DONE = 0, 1, 2, 3
+
+# Scorer order matches StatTracker: starting F/M, then bench F/M.
+N_SCORERS = 10
+
+# Uniform columns drawn per live game per step.
+_U_ACTION, _U_PASS, _U_PASS_TO = 0, 1, 2
+_U_SHOT = slice(3, 8)        # scorer, on goal, goal, recovery, turnover spot
+_U_BUZZER = slice(8, 13)     # same layout, for a buzzer-beater after a pass
+_U_OT_FLIP = 13
+_N_UNIFORMS = 14
+
+
+class _GameStreams:
+    """One Generator per game for seeded batches. Each game's step draws (the
+    _N_UNIFORMS uniforms and the pass-length normal) are pre-drawn `block` steps
+    at a time, so a lockstep step is still a single gather over the live games;
+    a game's buffer is refilled from its own Generator when it runs out."""
+
+    def __init__(self, seeds: Sequence[int], block: int = 128):
+        self.generators = [np.random.default_rng(seed) for seed in seeds]
+        self.block = block
+        n = len(self.generators)
+        self._u = np.empty((n, block, _N_UNIFORMS))
+        self._z = np.empty((n, block))
+        self._cursor = np.full(n, block)
+
+    def step(self, live: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(uniforms[m, _N_UNIFORMS], pass lengths N(4, 1.5)[m]) for the live games."""
+        for g in live[self._cursor[live] == self.block]:
+            gen = self.generators[g]
+            self._u[g] = gen.random((self.block, _N_UNIFORMS))
+            self._z[g] = gen.normal(4, 1.5, self.block)
+            self._cursor[g] = 0
+        at = self._cursor[live]
+        self._cursor[live] += 1
+        return self._u[live, at], self._z[live, at]
+
+
+class BatchGameSimulator:
+    """Simulate many independent games in lockstep.
+
+    `pairs` is a sequence of (home, away) Teams. The same Team object may appear
+    in several pairs (e.g. a projection replaying one schedule), but every pair's
+    stats are drawn (init_stats) before any game is applied: a later pair does not
+    see an earlier pair's postgame changes, so this is not the same as playing the
+    games one after another. Postgame updates are then applied in pair order.
+
+    Call simulate() once; it mutates the teams like GameSimulator.postgame and
+    returns one GameResult per pair, in order."""
+
+    def __init__(
+        self,
+        pairs: Sequence[tuple[Team, Team]],
+        allow_tie: bool = False,
+        rng: np.random.Generator | None = None,
+        regulation_time: float = REGULATION_TIME,
+        seeds: Sequence[int] | None = None,
+    ):
+        self.pairs = list(pairs)
+        if seeds is not None and len(seeds) != len(self.pairs):
+            raise ValueError(f"{len(seeds)} seeds for {len(self.pairs)} games")
+        self.seeds = list(seeds) if seeds is not None else None
+        self.streams = _GameStreams(self.seeds) if seeds is not None else None
+        self.allow_tie = allow_tie
+        self.regulation_time = regulation_time
+        # Seed from the global legacy RNG by default so np.random.seed(...) makes
+        # batch runs reproducible, just like the scalar simulator. Unused (and the
+        # global state untouched) when every game has its own seed.
+        if rng is None and seeds is None:
+            rng = np.random.default_rng(np.random.randint(0, 2**32, dtype=np.uint64))
+        self.rng = rng
+
+        n = len(self.pairs)
+        self.offense = np.zeros((n, 2))
+        self.defense = np.zeros((n, 2))
+        self.goalie = np.zeros((n, 2))
+        self.scorer_offense = np.zeros((n, 2, N_SCORERS))
+        # Per-game, per-side alias tables over the scorers (AliasTable.draw_rows).
+        self.scorer_prob = np.zeros((n, 2, N_SCORERS))
+        self.scorer_alias = np.zeros((n, 2, N_SCORERS), dtype=np.int64)
+        # Per-game performance lines captured at sampling time, so a team that
+        # plays several games in one batch still reports each game's own value.
+        self._performances: list[dict] = []
+        self.init_stats()
+
+        self.home_score = np.zeros(n, dtype=np.int64)
+        self.away_score = np.zeros(n, dtype=np.int64)
+        self.goals = np.zeros((n, 2, N_SCORERS), dtype=np.int64)
+        self.shots = np.zeros((n, 2, N_SCORERS), dtype=np.int64)
+        self.saves = np.zeros((n, 2), dtype=np.int64)            # by each side's goalie
+        self.goals_allowed = np.zeros((n, 2), dtype=np.int64)    # by each side's goalie
+        self.turnovers = np.zeros((n, 2), dtype=np.int64)
+        self.went_to_overtime = np.zeros(n, dtype=bool)
+
+    def init_stats(self):
+        shared = None if self.streams else RandomSource(self.rng)
+        for g, (home, away) in enumerate(self.pairs):
+            draws = RandomSource(self.streams.generators[g]) if self.streams else shared
+            for side, team in ((HOME, home), (AWAY, away)):
+                offense, defense, goalie, _reserve, scorers = calculate_team_stats(team, draws)
+                self.offense[g, side] = offense
+                self.defense[g, side] = defense
+                self.goalie[g, side] = goalie
+                self.scorer_offense[g, side] = [p.offense for p in scorers]
+                table = team_matrix(team).scorer_alias
+                self.scorer_prob[g, side], self.scorer_alias[g, side] = table.prob, table.alias
+            self._performances.append({
+                p.id: float(p.current_season_log["performances"][-1])
+                for team in (home, away) for p in team.roster()
+            })
+        # ratio[g, s]: pass completion odds for side s on offense vs the other side
+        self.ratio = self.offense / (self.offense + self.defense[:, ::-1])
+
+    # -- the lockstep loop -------------------------------------------------
+    def simulate(self) -> list[GameResult]:
+        n = len(self.pairs)
+        if n == 0:
+            return []
+        rng = self.rng
+        half = self.regulation_time / 2
+
+        # Coin flip: the winner has the ball (and the stats) to start.
+        if self.streams:
+            flips = np.array([gen.random() for gen in self.streams.generators])
+        else:
+            flips = rng.random(n)
+        flip_winner = np.where(flips <= 0.5, HOME, AWAY)
+        credit = flip_winner.copy()      # whose score/shots a possession counts for
+        stats = flip_winner.copy()       # whose offense_stats drive the odds
+        phase = np.full(n, FIRST_HALF)
+        clock = np.full(n, float(half))
+        ball = np.full(n, 20.0)
+
+        live = np.flatnonzero(phase < DONE)
+        while live.size:
+            m = live.size
+            if self.streams:
+                u, z = self.streams.step(live)
+            else:
+                u = rng.random((m, _N_UNIFORMS))
+                z = rng.normal(4, 1.5, m)
+            pos = ball[live]
+            c = credit[live]
+            s = stats[live]
+            regulation = phase[live] < OVERTIME
+
+            scored = np.zeros(m, dtype=bool)
+            ended = np.zeros(m, dtype=bool)
+            turnover_at = np.zeros(m)      # 0.0 = no turnover, as in the scalar sim
+
+            shoot = u[:, _U_ACTION] < 1 / (1 + np.exp(-0.3 * (pos - 34)))
+
+            # Shots: burn the clock (a shot at 0 still evaluates), then shoot.
+            i = np.flatnonzero(shoot)
+            timed = live[i[regulation[i]]]
+            clock[timed] = np.maximum(0, clock[timed] - TIME_PER_SHOT)
+            goal, turnover = self._take_shot(live[i], pos[i], c[i], s[i], u[i, _U_SHOT])
+            scored[i] = goal
+            ended[i] = goal | turnover
+            turnover_at[i[turnover]] = pos[i[turnover]] + (40 - pos[i[turnover]]) * u[i[turnover], _U_SHOT][:, 4]
+
+            # Passes.
+            j = np.flatnonzero(~shoot)
+            complete = u[j, _U_PASS] < self.ratio[live[j], s[j]]
+            gain = np.minimum(40 - pos[j], z[j])
+
+            done_pass = j[complete]
+            ball[live[done_pass]] = pos[done_pass] + gain[complete]
+            reg = done_pass[regulation[done_pass]]
+            clock[live[reg]] = np.maximum(0, clock[live[reg]] - TIME_PER_PASS)
+            # Clock ran out on the pass: immediate buzzer-beater, possession over.
+            buzzer = reg[clock[live[reg]] == 0]
+            goal, _ = self._take_shot(live[buzzer], ball[live[buzzer]], c[buzzer], s[buzzer], u[buzzer, _U_BUZZER])
+            scored[buzzer] = goal
+            ended[buzzer] = True
+
+            lost = j[~complete]
+            turnover_at[lost] = pos[lost] + gain[~complete] * u[lost, _U_PASS_TO]
+            np.add.at(self.turnovers, (live[lost], c[lost]), 1)
+            reg = lost[regulation[lost]]
+            clock[live[reg]] = np.maximum(0, clock[live[reg]] - TIME_PER_PASS)
+            ended[lost] = True
+
+            # -- possession changes (simulate_half / _simulate_overtime) ----
+            e = np.flatnonzero(ended)
+            ge = live[e]
+            home_goal = scored[e] & (c[e] == HOME)
+            away_goal = scored[e] & (c[e] == AWAY)
+            self.home_score[ge] += home_goal
+            self.away_score[ge] += away_goal
+
+            ot = ~regulation[e]
+            phase[ge[ot & scored[e]]] = DONE
+
+            credit[ge] = 1 - credit[ge]
+            stats[ge] = 1 - stats[ge]
+            has_to = turnover_at[e] > 0
+            ball[ge[has_to]] = 40 - turnover_at[e][has_to]
+            inbound = ~has_to & (scored[e] | ot)
+            ball[ge[inbound]] = 20
+            after_goal = ge[~has_to & scored[e] & ~ot]
+            clock[after_goal] = np.maximum(0, clock[after_goal] - TIME_AFTER_SCORE)
+
+            # End of a half: the clock only matters between possessions.
+            expired = ge[~ot & (clock[ge] <= 0)]
+            first = expired[phase[expired] == FIRST_HALF]
+            second = expired[phase[expired] == SECOND_HALF]
+
+            phase[first] = SECOND_HALF
+            clock[first] = half
+            stats[first] = 1 - flip_winner[first]     # credit deliberately untouched
+
+            tied = self.home_score[second] == self.away_score[second]
+            phase[second[~tied | self.allow_tie]] = DONE
+            to_ot = second[tied & (not self.allow_tie)]
+            if to_ot.size:
+                phase[to_ot] = OVERTIME
+                self.went_to_overtime[to_ot] = True
+                pick = u[np.searchsorted(live, to_ot), _U_OT_FLIP]
+                credit[to_ot] = stats[to_ot] = np.where(pick <= 0.5, HOME, AWAY)
+                ball[to_ot] = 20
+
+            live = np.flatnonzero(phase < DONE)
+
+        return self.postgame()
+
+    def _take_shot(self, games, pos, credit, stats, u):
+        """StatTracker.take_shot for a vector of shots. Shots and goals go to the
+        crediting side's scorer; odds come from the stats side vs the other
+        side's defense and starting goalie. Returns (goal, turnover) masks; a
+        shot that is neither was recovered by the offense."""
+        if games.size == 0:
+            empty = np.zeros(0, dtype=bool)
+            return empty, empty
+        defending = 1 - stats
+        shooter = AliasTable.draw_rows(self.scorer_prob[games, credit], self.scorer_alias[games, credit], u[:, 0])
+        np.add.at(self.shots, (games, credit, shooter), 1)
+
+        shooter_offense = self.scorer_offense[games, credit, shooter]
+        on_goal = u[:, 1] < shooter_offense * np.exp(-K * (40 - pos))
+        offense = self.offense[games, stats]
+        goal_odds = (0.5 * offense + 1.25 * shooter_offense) / (
+            offense + self.defense[games, defending] + self.goalie[games, defending])
+        goal = on_goal & (u[:, 2] < goal_odds)
+        recovered = ~goal & (u[:, 3] < 0.1)
+        saved = on_goal & ~goal & ~recovered
+
+        np.add.at(self.goals, (games[goal], credit[goal], shooter[goal]), 1)
+        np.add.at(self.goals_allowed, (games[goal], 1 - credit[goal]), 1)
+        np.add.at(self.saves, (games[saved], 1 - credit[saved]), 1)
+        return goal, ~goal & ~recovered
+
+    def postgame(self) -> list[GameResult]:
+        """Apply each game to its teams (records, season logs) in pair order and
+        build the GameResults."""
+        results = []
+        for g, (home, away) in enumerate(self.pairs):
+            hs, as_ = int(self.home_score[g]), int(self.away_score[g])
+            if hs > as_:
+                home.record_result("W")
+                away.record_result("L")
+            elif as_ > hs:
+                home.record_result("L")
+                away.record_result("W")
+            else:
+                home.record_result("T")
+                away.record_result("T")
+
+            home.update_offensive_stats(goals_scored=self.goals[g, HOME], shots_taken=self.shots[g, HOME])
+            away.update_offensive_stats(goals_scored=self.goals[g, AWAY], shots_taken=self.shots[g, AWAY])
+            home.update_goalie_stats(saves=self.saves[g, HOME], goals_allowed=self.goals_allowed[g, HOME])
+            away.update_goalie_stats(saves=self.saves[g, AWAY], goals_allowed=self.goals_allowed[g, AWAY])
+
+            lines = {**game_lines_for(home), **game_lines_for(away)}
+            for pid, perf in self._performances[g].items():
+                lines[pid]["performance"] = perf
+            results.append(GameResult(
+                home_id=home.id,
+                away_id=away.id,
+                home_score=hs,
+                away_score=as_,
+                went_to_overtime=bool(self.went_to_overtime[g]),
+                player_lines=lines,
+                seed=self.seeds[g] if self.seeds else None,
+            ))
+        return results
+
+
+class BatchGameEngine:
+    """GameEngine backed by BatchGameSimulator. play() is a batch of one;
+    play_many() is where the speed-up is."""
+
+    def __init__(self, allow_tie: bool = False, seed: int | None = None,
+                 regulation_time: float = REGULATION_TIME):
+        self.allow_tie = allow_tie
+        self.regulation_time = regulation_time
+        self.rng = np.random.default_rng(seed) if seed is not None else None
+
+    def play(self, home: Team, away: Team, *, seed: int | None = None) -> GameResult:
+        return self.play_many([(home, away)], None if seed is None else [seed])[0]
+
+    def play_many(
+        self, pairs: Sequence[tuple[Team, Team]], seeds: Sequence[int] | None = None
+    ) -> list[GameResult]:
+        sim = BatchGameSimulator(pairs, allow_tie=self.allow_tie, rng=self.rng,
+                                 regulation_time=self.regulation_time, seeds=seeds)
+        return sim.simulate()
@@ -0,0 +1,131 @@
+"""
+Name: buffered_record_sink.py
+Description: Write-behind RecordSink. PostgresRecordSink.record_game blocks the
+    simulation thread on a network round trip after every game; wrapping it in a
+    BufferedRecordSink moves that I/O to a background thread so persistence
+    overlaps with simulation.
+
+    record_game() only puts the result on a bounded queue (blocking when it is
+    full, so a slow database throttles the simulation instead of piling up
+    memory). The writer thread hands games to the wrapped sink in batches: when
+    `batch_size` games are waiting, or when the oldest waiting game is
+    `flush_interval` seconds old. A sink with record_games() gets each batch in
+    one call (PostgresRecordSink writes it in one transaction); any other sink
+    gets one record_game() per game.
+
+    flush() returns once every game recorded so far has been written; close()
+    flushes and stops the thread. A failed write is not retried: the batch is
+    dropped, later games are discarded, and the next record_game()/flush()/
+    close() raises RecordSinkError chained to the original exception, so the
+    SeasonRunner driving the period sees it.
+Author: design sketch
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+
+from handball.orchestration import GameResult, RecordSink
+
+# Queue sentinels: write what's waiting now / write it and stop.
+_FLUSH = object()
+_STOP = object()
+
+
+class RecordSinkError(RuntimeError):
+    """A background write to the wrapped sink failed."""
+
+
+class BufferedRecordSink:
+    def __init__(
+        self,
+        sink: RecordSink,
+        *,
+        batch_size: int = 32,
+        flush_interval: float = 1.0,
+        max_pending: int = 256,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="BufferedRecordSink", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "BufferedRecordSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # -- RecordSink --------------------------------------------------------
+    def record_game(self, result: GameResult, *, week: int | None = None) -> None:
+        self._raise_if_failed()
+        if self._closed:
+            raise RuntimeError("record_game on a closed BufferedRecordSink")
+        self._queue.put((result, week))
+
+    # -- lifecycle ---------------------------------------------------------
+    def flush(self) -> None:
+        """Block until every game recorded so far is written (or has failed)."""
+        if not self._closed:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """Flush, then stop the writer thread. Safe to call more than once."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RecordSinkError(f"writing game records failed: {self._error!r}") from self._error
+
+    # -- writer thread -----------------------------------------------------
+    def _run(self) -> None:
+        batch: list[tuple[GameResult, int | None]] = []
+        taken = 0          # queue items taken but not yet marked done
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+                taken += 1
+            except queue.Empty:
+                item = _FLUSH  # the oldest waiting game is flush_interval old
+
+            if item is not _FLUSH and item is not _STOP:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (item is _FLUSH or item is _STOP or len(batch) >= self.batch_size):
+                self._write(batch)
+                batch = []
+            if not batch:
+                for _ in range(taken):
+                    self._queue.task_done()
+                taken = 0
+            if item is _STOP:
+                return
+
+    def _write(self, batch: list[tuple[GameResult, int | None]]) -> None:
+        if self._error is not None:
+            return  # already failed: drop the rest, the caller is told on its next call
+        try:
+            record_games = getattr(self.sink, "record_games", None)
+            if record_games is not None:
+                record_games(batch)
+            else:
+                for result, week in batch:
+                    self.sink.record_game(result, week=week)
+        except Exception as e:  # noqa: BLE001 - handed to the caller's thread
+            self._error = e
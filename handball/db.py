@@ -9,11 +9,21 @@ Description: One place that knows how to reach Postgres. Both PostgresTeamReposi
     A project-root .env (git-ignored) is auto-loaded on import, so the migration
     CLI, Alembic, and the API all pick up HANDBALL_DB_URL / SUPABASE_* without any
     shell sourcing (and without mangling special characters in the DB password).
+
+    pipeline(conn) is an opt-in psycopg pipeline mode for a run of independent
+    writes: inside it each statement is sent without waiting for the previous
+    reply, so N writes cost about one round trip to the pooler instead of N.
+    It is on when $HANDBALL_DB_PIPELINE is set (1/true/yes/on) or the engine
+    carries execution_options(pipeline=True); otherwise it does nothing.
+
+    transaction(engine, conn) is the `conn=` convention the stores share: write
+    inside the caller's open transaction when given one, else in a fresh one.
 Author: relational backend
 """
 from __future__ import annotations
 
 import os
+from contextlib import contextmanager
 from pathlib import Path
 
 from sqlalchemy import create_engine, event
@@ -69,3 +79,45 @@ def get_engine(url: str | None = None, **kwargs) -> Engine:
         dbapi_conn.commit()
 
     return engine
+
+
+@contextmanager
+def transaction(engine: Engine, conn=None):
+    """`conn` as given (its owner commits), else a fresh engine.begin()."""
+    if conn is not None:
+        yield conn
+    else:
+        with engine.begin() as conn:
+            yield conn
+
+
+def pipeline_enabled(conn=None) -> bool:
+    """True if `conn`'s engine opted in (execution_options(pipeline=True)) or,
+    failing an explicit option, $HANDBALL_DB_PIPELINE says so."""
+    option = conn.get_execution_options().get("pipeline") if conn is not None else None
+    if option is not None:
+        return bool(option)
+    return os.environ.get("HANDBALL_DB_PIPELINE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@contextmanager
+def pipeline(conn):
+    """Run the block's statements on `conn` in psycopg pipeline mode, if enabled
+    (see pipeline_enabled); leaving the block syncs and waits for every reply.
+
+    Only for statements whose result is not read inside the block: a
+    statement's rows and rowcount arrive at the sync, not when it executes.
+    A failing statement raises at the sync, as the driver's (psycopg) error,
+    and aborts the rest of the block -- the caller's transaction then rolls
+    back as usual."""
+    raw = conn.connection.driver_connection if pipeline_enabled(conn) else None
+    if raw is None or not hasattr(raw, "pipeline"):
+        yield conn
+        return
+    from psycopg import Pipeline
+
+    if not Pipeline.is_supported():        # libpq < 14
+        yield conn
+        return
+    with raw.pipeline():
+        yield conn
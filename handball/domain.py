@@ -359,6 +359,16 @@ class Team:
     bench: dict[str, list[Player]]      # kills the list|single union + isinstance
     reserves: list[Player]
     record: tuple[int, int, int] = (0, 0, 0)
+    # The game simulator's per-slot arrays for this lineup (game_simulator.TeamMatrix),
+    # built on first use. Not team state: excluded from init/repr/eq, never serialized.
+    _matrix: object = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate_matrix(self) -> None:
+        """Drop the cached simulator arrays. apply_arrangement and injury processing
+        call this; anything else that changes who plays where on a live Team must
+        call it too. Rating and injury changes are picked up without it (the cache
+        is keyed on the players' ratings, see game_simulator.team_matrix)."""
+        self._matrix = None
 
     # -- reads -------------------------------------------------------------
     def roster(self) -> list[Player]:
@@ -494,6 +504,7 @@ class Team:
         self.starters = {pos: [by_id[i] for i in ids] for pos, ids in arr.starters.items()}
         self.bench = {pos: [by_id[i] for i in ids] for pos, ids in arr.bench.items()}
         self.reserves = [by_id[i] for i in arr.reserves]
+        self.invalidate_matrix()
 
 
 def validate(arr: TeamArrangement, team: Team, rules: RosterRules = DEFAULT_RULES) -> None:
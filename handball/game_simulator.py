@@ -8,26 +8,191 @@ Date: 1/20/2025 12:32PM PST
 ## For each player, in each team, draw a random contribution to offense and defense
 ## Team A offense - Team B defense -> shots on goal, multiply by goalie save 
 # Pass length correlates with amount of time off clock
+import math
+from dataclasses import dataclass, fields
+from time import perf_counter
+
 import numpy as np
-from itertools import chain
 
-from handball.utils import ProbabilityStack
+from handball.utils import AliasTable, RandomSource
 from handball.domain import Team
+from handball.possession_chain import SHOT, max_passes, possession_table
 from handball.simulation_vars import (
     REGULATION_TIME, K, TIME_PER_PASS, TIME_PER_SHOT, MAIN_STAT, SECONDARY_STAT, MIDDIE_STATS, TIME_AFTER_SCORE, STARTER_MINUTES, BENCH_MINUTES
     )
 
+# Possession kernels: "loop" samples every pass and shot; "chain" resolves each
+# run of passes from precomputed absorbing-chain tables (see possession_chain.py);
+# "flat" is the loop kernel as one exception-free loop per half, draw-for-draw the
+# same game as "loop" for the same seed.
+KERNELS = ("loop", "chain", "flat")
+
+# Play-by-play events are kept as rows of a typed array and only rendered to
+# text when asked for (StatTracker.scoring_tracker / get_score_info).
+EVENT_DTYPE = np.dtype([
+    ("period", np.uint8),    # FIRST_HALF, SECOND_HALF or OVERTIME
+    ("clock", np.int32),     # whole seconds left in the period
+    ("team", np.uint8),      # HOME or AWAY
+    ("scorer", np.int8),     # index into that side's 10 scorers, -1 for markers
+    ("event", np.uint8),     # GOAL, HALFTIME_MARK or OVERTIME_MARK
+])
+FIRST_HALF, SECOND_HALF, OVERTIME = 0, 1, 2
+HOME, AWAY = 0, 1
+GOAL, HALFTIME_MARK, OVERTIME_MARK = 0, 1, 2
+PERIOD_LABELS = ("1st half", "2nd half", "OT")
+
+# Shot-share weights by scorer slot (starting F/M, then bench F/M): minutes played.
+SCORER_MINUTES = np.array([STARTER_MINUTES] * 6 + [BENCH_MINUTES] * 4)
+
+
+def scorer_likelihood(scorers):
+    """ Chance each of a team's 10 scorers takes a given shot: weighted by the minutes
+    played and overall contribution to the offense (the Player's offense rating). """
+    likelihood = SCORER_MINUTES * np.array([player.offense for player in scorers])
+    return likelihood / sum(likelihood)
+
+
+# Position weights per field slot, in Team.update_performances order:
+# starting F/M/D, then bench F/M/D.
+OFFENSE_WEIGHTS = np.array([MAIN_STAT] * 3 + [MIDDIE_STATS] * 3 + [SECONDARY_STAT] * 3
+                           + [MAIN_STAT] * 2 + [MIDDIE_STATS] * 2 + [SECONDARY_STAT] * 2)
+DEFENSE_WEIGHTS = np.array([SECONDARY_STAT] * 3 + [MIDDIE_STATS] * 3 + [MAIN_STAT] * 3
+                           + [SECONDARY_STAT] * 2 + [MIDDIE_STATS] * 2 + [MAIN_STAT] * 2)
+FIELD_MINUTES = np.array([STARTER_MINUTES] * 9 + [BENCH_MINUTES] * 6) / 60
+
+
+class TeamMatrix():
+    """
+    A lineup's per-slot arrays, so a game's team stats are one vectorised draw.
+    Slots follow Team.update_performances: 15 field players (starting F/M/D, bench
+    F/M/D) and the two goalies. The draw vector is the 15 offense ratings, the 15
+    defense ratings, then the starting and bench goalie skill -- the order the
+    per-player draws always had, so seeded games are unchanged.
+
+    Cached on the Team (see team_matrix) and rebuilt when a lineup change calls
+    Team.invalidate_matrix or any slotted player's ratings or injury status move
+    (the cache is keyed on ratings_key, so Player.update_stats, injure, ... on a
+    live Team are seen by the next game without anyone invalidating it).
+    """
+    def __init__(self, team:Team):
+        s, b = team.starters, team.bench
+        field_players = [*s["Forward"], *s["Midfielder"], *s["Defense"],
+                         *b["Forward"], *b["Midfielder"], *b["Defense"]]
+        goalies = [s["Goalie"][0], b["Goalie"][0]]
+        self.players = field_players + goalies
+        self.key = ratings_key(self.players)
+
+        self.loc = np.array([p.offense for p in field_players] + [p.defense for p in field_players]
+                            + [g.goalie_skill for g in goalies])
+        self.scale = np.array([p.variance for p in field_players] * 2 + [g.variance for g in goalies])
+        # An injured player contributes nothing; their normal is still drawn
+        self.healthy = np.array([not p.is_injured for p in field_players] * 2
+                                + [not g.is_injured for g in goalies], dtype=float)
+
+        self.scorers = [*s["Forward"], *s["Midfielder"], *b["Forward"], *b["Midfielder"]]
+        self.scorer_likelihood = scorer_likelihood(self.scorers)
+        self.scorer_alias = AliasTable(self.scorer_likelihood)
+
+
+def ratings_key(players):
+    """ Everything TeamMatrix reads from its players; the matrix is stale once this changes """
+    return tuple((p.offense, p.defense, p.goalie_skill, p.variance, p.is_injured) for p in players)
+
+
+def team_matrix(team:Team):
+    """ The team's TeamMatrix, built on first use and cached until invalidated or
+    until a player's ratings change """
+    matrix = team._matrix
+    if matrix is None or matrix.key != ratings_key(matrix.players):
+        matrix = team._matrix = TeamMatrix(team)
+    return matrix
+
+
+def calculate_team_stats(team_obj:Team, rng:RandomSource=None):
+    """ Calculate individual performances and save those in overall team performances.
+    Module-level so the batch engine samples a game's team stats exactly like init_stats. """
+    rng = rng if rng is not None else RandomSource.from_global()
+    matrix = team_matrix(team_obj)
+
+    # Sample every player's stats at once, then weight by position importance
+    sampled = rng.normals(matrix.loc, matrix.scale) * matrix.healthy
+    offense_stats = sampled[:15] * OFFENSE_WEIGHTS
+    defense_stats = sampled[15:30] * DEFENSE_WEIGHTS
+    goalie, goalie_reserve = (sampled[30:] * 4).tolist()
+
+    # Team totals: each player's weighted stat times the minutes they play
+    offense = float(offense_stats @ FIELD_MINUTES)
+    defense = float(defense_stats @ FIELD_MINUTES)
+
+    # Performances (15 field players + 2 goalies); goalies only count on defense
+    team_obj.update_performances((offense_stats + defense_stats).tolist() + [goalie, goalie_reserve])
+
+    # Return Player objects for scorers (StatTracker needs to access .offense attribute)
+    return offense, defense, goalie, goalie_reserve, list(matrix.scorers)
+
+
+@dataclass
+class GameMetrics():
+    """
+    Opt-in counters and wall times for one game (GameSimulator(metrics=True)).
+    Possessions include overtime ones; passes count every attempt, completed or
+    not; turnovers are failed passes (missed and saved shots are not counted).
+    Times are seconds. Metrics add up field by field, so a period's games sum to
+    one GameMetrics with `games` set to the number of games.
+    """
+    games: int = 1
+    possessions: int = 0
+    overtime_possessions: int = 0
+    passes: int = 0
+    shots: int = 0
+    shots_on_goal: int = 0
+    turnovers: int = 0
+    rng_draws: int = 0
+    init_stats_time: float = 0.0
+    first_half_time: float = 0.0
+    second_half_time: float = 0.0
+    overtime_time: float = 0.0
+    postgame_time: float = 0.0
+
+    def __add__(self, other):
+        return GameMetrics(*(getattr(self, f.name) + getattr(other, f.name) for f in fields(self)))
+
 
 class GameSimulator():
-    def __init__(self, home_team:Team, away_team:Team, allow_tie=False):
+    def __init__(self, home_team:Team, away_team:Team, allow_tie=False, kernel="loop", rng:RandomSource=None,
+                 record_events=True, metrics=False):
+        if kernel not in KERNELS:
+            raise ValueError(f"unknown kernel {kernel!r}; expected one of {KERNELS}")
         self.home_team = home_team
         self.away_team = away_team
         self.allow_tie = allow_tie
+        self.kernel = kernel
+        # Every draw of this game comes from here (defaults to a stream seeded from the
+        # global np.random state, so np.random.seed(...) still reproduces a game)
+        self.rng = rng if rng is not None else RandomSource.from_global()
+        # record_events=False is summary-only mode for bulk runs: no play-by-play
+        # is kept, so get_score_info() and summary["scoring_log"] are None
+        self.record_events = record_events
+        # metrics=True fills a GameMetrics as the game runs (None otherwise)
+        self.metrics = GameMetrics() if metrics else None
+        self._draws_at_start = self.rng.draws
+        self.possessions = 0
+        self.overtime_possessions = 0
+        self.passes = 0
 
         self.home_score = 0
         self.away_score = 0
 
+        started = perf_counter()
         self.home_stats, home_scorer_stats, self.away_stats, away_scorer_stats = self.init_stats()
+        self._lap("init_stats_time", started)
+        if kernel == "chain":
+            # Both sides' tables are picked once per game, off the shared ratio grid
+            self._tables = {
+                True: possession_table(self.home_stats["ratio"], self.rng.uniform()),
+                False: possession_table(self.away_stats["ratio"], self.rng.uniform()),
+            }
+            self._chain_horizon = TIME_PER_PASS * max_passes()
 
         self.ball_position = 20
         self.game_clock = GameClock()
@@ -36,100 +201,22 @@ class GameSimulator():
                                 home_team=home_team, 
                                 home_scorer_stats=home_scorer_stats, 
                                 away_team=away_team, 
-                                away_scorer_stats=away_scorer_stats
+                                away_scorer_stats=away_scorer_stats,
+                                record_events=record_events
                                 )
-        self.prob_stack = ProbabilityStack()
 
         self.offense_stats = None
         self.defense_stats = None
 
-    def init_stats(self):
-        # See game_mechanics.txt
-
-        def calculate_stats(team_obj:Team):
-            """ Calculate individual performances and save those in overall team performances """
-
-            minutes_list = [STARTER_MINUTES if i < 9 else BENCH_MINUTES for i in range(15)]
-
-            ## Calculate offense stats for each player (weighted by position)
-            # Sample stats for each player. An injured player contributes nothing
-            # (multiplied by 0); the normal is still drawn so RNG draw counts --
-            # and seeded reproducibility -- are unaffected by who is injured.
-            start_forward_offense_raw = [np.random.normal(forward.offense, forward.variance) * (not forward.is_injured) for forward in team_obj.starters["Forward"]]
-            start_middie_offense_raw = [np.random.normal(middie.offense, middie.variance) * (not middie.is_injured) for middie in team_obj.starters["Midfielder"]]
-            start_defense_offense_raw = [np.random.normal(defense.offense, defense.variance) * (not defense.is_injured) for defense in team_obj.starters["Defense"]]
-            bench_forward_offense_raw = [np.random.normal(forward.offense, forward.variance) * (not forward.is_injured) for forward in team_obj.bench["Forward"]]
-            bench_middie_offense_raw = [np.random.normal(middie.offense, middie.variance) * (not middie.is_injured) for middie in team_obj.bench["Midfielder"]]
-            bench_defense_offense_raw = [np.random.normal(defense.offense, defense.variance) * (not defense.is_injured) for defense in team_obj.bench["Defense"]]
-
-            # Weight each stat by position importance and multiply by minutes played
-            start_forward_offense = [stat * MAIN_STAT for stat in start_forward_offense_raw]
-            start_middie_offense = [stat * MIDDIE_STATS for stat in start_middie_offense_raw]
-            start_defense_offense = [stat * SECONDARY_STAT for stat in start_defense_offense_raw]
-            bench_forward_offense = [stat * MAIN_STAT for stat in bench_forward_offense_raw]
-            bench_middie_offense = [stat * MIDDIE_STATS for stat in bench_middie_offense_raw]
-            bench_defense_offense = [stat * SECONDARY_STAT for stat in bench_defense_offense_raw]
-
-            # Get the Player objects for scorers (forwards and midfielders only)
-            # StatTracker needs Player objects to access .offense attribute
-            scorer_players = (list(team_obj.starters["Forward"]) + list(team_obj.starters["Midfielder"]) + 
-                            list(team_obj.bench["Forward"]) + list(team_obj.bench["Midfielder"]))
-            
-            # Get the sampled stats for scorers (for weighting likelihood)
-            scorer_stats = start_forward_offense_raw + start_middie_offense_raw + bench_forward_offense_raw + bench_middie_offense_raw
-
-            # Combine all weighted offensive stats into a single list (one entry per player)
-            all_offense_stats = (start_forward_offense + start_middie_offense + start_defense_offense + 
-                               bench_forward_offense + bench_middie_offense + bench_defense_offense)
-            
-            # Calculate total offense by multiplying each player's weighted stat by their minutes
-            offense = sum(np.array(all_offense_stats) * (np.array(minutes_list) / 60))
-
-
-            ## Calculate defense stats for each player (weighted by position)
-            # Sample stats for each player (injured players contribute nothing).
-            start_forward_defense_raw = [np.random.normal(forward.defense, forward.variance) * (not forward.is_injured) for forward in team_obj.starters["Forward"]]
-            start_middie_defense_raw = [np.random.normal(middie.defense, middie.variance) * (not middie.is_injured) for middie in team_obj.starters["Midfielder"]]
-            start_defense_defense_raw = [np.random.normal(defense.defense, defense.variance) * (not defense.is_injured) for defense in team_obj.starters["Defense"]]
-            bench_forward_defense_raw = [np.random.normal(forward.defense, forward.variance) * (not forward.is_injured) for forward in team_obj.bench["Forward"]]
-            bench_middie_defense_raw = [np.random.normal(middie.defense, middie.variance) * (not middie.is_injured) for middie in team_obj.bench["Midfielder"]]
-            bench_defense_defense_raw = [np.random.normal(defense.defense, defense.variance) * (not defense.is_injured) for defense in team_obj.bench["Defense"]]
-
-            # Weight each stat by position importance
-            start_forward_defense = [stat * SECONDARY_STAT for stat in start_forward_defense_raw]
-            start_middie_defense = [stat * MIDDIE_STATS for stat in start_middie_defense_raw]
-            start_defense_defense = [stat * MAIN_STAT for stat in start_defense_defense_raw]
-            bench_forward_defense = [stat * SECONDARY_STAT for stat in bench_forward_defense_raw]
-            bench_middie_defense = [stat * MIDDIE_STATS for stat in bench_middie_defense_raw]
-            bench_defense_defense = [stat * MAIN_STAT for stat in bench_defense_defense_raw]
-
-            # Combine all weighted defensive stats into a single list (one entry per player)
-            all_defense_stats = (start_forward_defense + start_middie_defense + start_defense_defense + 
-                               bench_forward_defense + bench_middie_defense + bench_defense_defense)
-            
-            # Calculate total defense by multiplying each player's weighted stat by their minutes
-            defense = sum(np.array(all_defense_stats) * (np.array(minutes_list) / 60))
-
-
-            ## Calculate goalies' stats (an injured goalie contributes nothing)
-            start_goalie = team_obj.starters["Goalie"][0]
-            bench_goalie = team_obj.bench["Goalie"][0]
-            goalie = np.random.normal(start_goalie.goalie_skill, start_goalie.variance) * 4 * (not start_goalie.is_injured)
-            goalie_reserve = np.random.normal(bench_goalie.goalie_skill, bench_goalie.variance) * 4 * (not bench_goalie.is_injured)
-
-            # Build combined performance list (15 non-goalies + 2 goalies = 17 players)
-            # Goalies don't contribute to offense/defense, so their offense contribution is 0
-            combined_list_off = all_offense_stats + [0, 0]
-            combined_list_def = all_defense_stats + [goalie, goalie_reserve]
-            combined_list = np.array(combined_list_off) + np.array(combined_list_def)
+        # Set by postgame; the summary dict itself is built on first read
+        self.finished = False
+        self._game_summary = None
 
-            team_obj.update_performances(combined_list)
-
-            # Return Player objects for scorers (StatTracker needs to access .offense attribute)
-            return offense, defense, goalie, goalie_reserve, scorer_players
-
-        home_offense, home_defense, home_goalie, home_goalie_reserve, home_scorer_stats = calculate_stats(self.home_team)
-        away_offense, away_defense, away_goalie, away_goalie_reserve, away_scorer_stats = calculate_stats(self.away_team)
+    def init_stats(self, rng:RandomSource=None):
+        # See game_mechanics.txt
+        rng = rng if rng is not None else self.rng
+        home_offense, home_defense, home_goalie, home_goalie_reserve, home_scorer_stats = calculate_team_stats(self.home_team, rng)
+        away_offense, away_defense, away_goalie, away_goalie_reserve, away_scorer_stats = calculate_team_stats(self.away_team, rng)
 
  
         home_ratio = home_offense / (home_offense + away_defense)
@@ -146,7 +233,7 @@ class GameSimulator():
 
     def simulate_game(self):
         ## Coin Flip
-        if self.prob_stack.pop() <= 0.5:
+        if self.rng.uniform() <= 0.5:
             self.home_flip_winner = True
             self.home_posession = True
             self.offense_stats = self.home_stats
@@ -158,8 +245,10 @@ class GameSimulator():
             self.defense_stats = self.home_stats
 
         # Set the clock and simulate first half
+        started = perf_counter()
         self.game_clock.set_time(REGULATION_TIME/2)
         self.simulate_half()
+        started = self._lap("first_half_time", started)
 
         ## HALFTIME,
         # 1) flip the possessions from the coinflip
@@ -187,13 +276,38 @@ class GameSimulator():
         # Set the clock and simulate seond half
         self.game_clock.set_time(REGULATION_TIME/2)
         self.simulate_half(second_half=True)
+        started = self._lap("second_half_time", started)
 
         # OVERTIME: Sudden death if tied and ties not allowed
         if self.home_score == self.away_score and not self.allow_tie:
             self._simulate_overtime()
+            started = self._lap("overtime_time", started)
 
         # Game is done! Retrieve information from objects
         self.postgame()
+        self._lap("postgame_time", started)
+        self._count_metrics()
+
+    def _lap(self, field, started):
+        """ Add the wall time since `started` to metrics.<field> (if metrics are on)
+        and return the current time, to start the next lap """
+        now = perf_counter()
+        if self.metrics is not None:
+            setattr(self.metrics, field, getattr(self.metrics, field) + now - started)
+        return now
+
+    def _count_metrics(self):
+        """ Copy the game's counters into metrics once it is over """
+        if self.metrics is None:
+            return
+        tracker, metrics = self.stat_tracker, self.metrics
+        metrics.possessions = self.possessions
+        metrics.overtime_possessions = self.overtime_possessions
+        metrics.passes = self.passes
+        metrics.shots = int(tracker.home_shots.sum() + tracker.away_shots.sum())
+        metrics.shots_on_goal = tracker.shots_on_goal
+        metrics.turnovers = tracker.home_turnovers + tracker.away_turnovers
+        metrics.rng_draws = self.rng.draws - self._draws_at_start
 
     def _simulate_overtime(self):
         """
@@ -203,7 +317,7 @@ class GameSimulator():
         self.stat_tracker.start_overtime()
 
         # Coin flip for first OT possession
-        if self.prob_stack.pop() <= 0.5:
+        if self.rng.uniform() <= 0.5:
             self.home_posession = True
             self.offense_stats = self.home_stats
             self.defense_stats = self.away_stats
@@ -217,7 +331,12 @@ class GameSimulator():
 
         # Keep playing until someone scores
         while self.home_score == self.away_score:
-            scored, turnover_position = self.offensive_posession_overtime()
+            self.possessions += 1
+            self.overtime_possessions += 1
+            if self.kernel == "chain":
+                scored, turnover_position = self.offensive_posession_chain(overtime=True)
+            else:
+                scored, turnover_position = self.offensive_posession_overtime()
 
             if scored:
                 if self.home_posession:
@@ -246,18 +365,18 @@ class GameSimulator():
         scored = False
 
         while True:
-            if self.prob_stack.pop() < 1 / (1 + np.exp(-0.3 * (self.ball_position-34))):
+            if self.rng.uniform() < 1 / (1 + np.exp(-0.3 * (self.ball_position-34))):
                 # Take a shot
                 scored, off_recovery, turnover = self.stat_tracker.take_shot(
                     ball_position=self.ball_position,
-                    prob_stack=self.prob_stack,
+                    rng=self.rng,
                     offense_stats=self.offense_stats,
                     defense_stats=self.defense_stats,
                     home_posession=self.home_posession,
                     time_left=0,  # OT has no clock display
                 )
                 if turnover:
-                    turnover_position = self.ball_position + (40 - self.ball_position) * self.prob_stack.pop()
+                    turnover_position = self.ball_position + (40 - self.ball_position) * self.rng.uniform()
                     break
                 if scored:
                     break
@@ -265,10 +384,11 @@ class GameSimulator():
                     pass
             else:
                 # Pass the ball
-                if np.random.uniform(0, 1) < self.offense_stats["ratio"]:
-                    self.ball_position += min(40 - self.ball_position, np.random.normal(4, 1.5))
+                self.passes += 1
+                if self.rng.uniform() < self.offense_stats["ratio"]:
+                    self.ball_position += min(40 - self.ball_position, self.rng.normal(4, 1.5))
                 else:
-                    turnover_position = self.ball_position + min(40 - self.ball_position, np.random.normal(4, 1.5)) * self.prob_stack.pop()
+                    turnover_position = self.ball_position + min(40 - self.ball_position, self.rng.normal(4, 1.5)) * self.rng.uniform()
                     if self.home_posession:
                         self.stat_tracker.home_turnovers += 1
                     else:
@@ -279,6 +399,9 @@ class GameSimulator():
 
 
     def simulate_half(self, second_half=False):
+            if self.kernel == "flat":
+                return self._simulate_half_flat(second_half)
+
             swap_goalie = second_half
             
             while self.game_clock.time_left > 0:
@@ -297,7 +420,11 @@ class GameSimulator():
                     swap_goalie = False
 
 
-                scored, turnover_position = self.offensive_posession()
+                self.possessions += 1
+                if self.kernel == "chain":
+                    scored, turnover_position = self.offensive_posession_chain()
+                else:
+                    scored, turnover_position = self.offensive_posession()
 
                 # If scored, add point to the respecitve team
                 if scored:
@@ -320,9 +447,101 @@ class GameSimulator():
                     self.ball_position = 20
                     try:
                         self.game_clock.decrement(TIME_AFTER_SCORE)
-                    except:
+                    except ZeroDivisionError:
                         break
 
+    def _simulate_half_flat(self, second_half=False):
+        """
+        simulate_half + offensive_posession as a single loop (kernel="flat"). The clock
+        is a local float with explicit expiry checks instead of GameClock's
+        divide-by-zero, lookups are bound once, and the shot odds are only recomputed
+        when the ball moves. Every branch (buzzer beaters, the clock running on after
+        an offensive recovery at 0:00, the goalie swap check) and every draw happens
+        as in the loop kernel.
+        """
+        uniform, normal = self.rng.uniform, self.rng.normal
+        rng, tracker = self.rng, self.stat_tracker
+        take_shot = tracker.take_shot
+        exp = math.exp
+        home_stats, away_stats = self.home_stats, self.away_stats
+        offense, defense = self.offense_stats, self.defense_stats
+        home_posession = self.home_posession
+        position = self.ball_position
+        home_score, away_score = self.home_score, self.away_score
+        clock = self.game_clock.time_left
+        swap_goalie = second_half
+        swap_at = REGULATION_TIME/2 + 30
+        possessions, passes = self.possessions, self.passes
+
+        while clock > 0:
+            possessions += 1
+            if swap_goalie and clock <= swap_at:
+                home_stats["goalie"], home_stats["bench_goalie"] = home_stats["bench_goalie"], home_stats["goalie"]
+                away_stats["goalie"], away_stats["bench_goalie"] = away_stats["bench_goalie"], away_stats["goalie"]
+                swap_goalie = False
+
+            # One possession: pass until a shot ends it or a pass fails
+            ratio = offense["ratio"]
+            shot_odds = 1 / (1 + exp(-0.3 * (position-34)))
+            scored, turnover_position = False, False
+            while True:
+                if uniform() < shot_odds:
+                    clock -= TIME_PER_SHOT
+                    if clock < 0:
+                        clock = 0   # the shot still counts (buzzer beater)
+                    scored, _, turnover = take_shot(position, rng, offense, defense, home_posession, clock)
+                    if turnover:
+                        turnover_position = position + (40 - position)*uniform()
+                        break
+                    if scored:
+                        break
+                elif uniform() < ratio:
+                    passes += 1
+                    position += min(40-position, normal(4, 1.5))
+                    shot_odds = 1 / (1 + exp(-0.3 * (position-34)))
+                    clock -= TIME_PER_PASS
+                    if clock <= 0:
+                        # Time has run out, immediately take a buzzer beater shot
+                        clock = 0
+                        scored = take_shot(position, rng, offense, defense, home_posession, clock)[0]
+                        break
+                else:
+                    passes += 1
+                    turnover_position = position + min(40-position, normal(4, 1.5))*uniform()
+                    if home_posession:
+                        tracker.home_turnovers += 1
+                    else:
+                        tracker.away_turnovers += 1
+                    clock -= TIME_PER_PASS
+                    if clock < 0:
+                        clock = 0
+                    break
+
+            if scored:
+                if home_posession:
+                    home_score += 1
+                else:
+                    away_score += 1
+
+            home_posession = not home_posession
+            offense, defense = defense, offense
+
+            if turnover_position:
+                position = 40-turnover_position
+            elif scored:
+                position = 20
+                clock -= TIME_AFTER_SCORE
+                if clock <= 0:
+                    clock = 0
+                    break
+
+        self.offense_stats, self.defense_stats = offense, defense
+        self.home_posession = home_posession
+        self.ball_position = position
+        self.home_score, self.away_score = home_score, away_score
+        self.game_clock.time_left = clock
+        self.possessions, self.passes = possessions, passes
+
 
 
     def offensive_posession(self):
@@ -334,17 +553,17 @@ class GameSimulator():
 
         # Evaluate shots and passes until something happens
         while True:
-            if self.prob_stack.pop() < 1 / (1 + np.exp(-0.3 * (self.ball_position-34))): # odds of taking a shot
+            if self.rng.uniform() < 1 / (1 + np.exp(-0.3 * (self.ball_position-34))): # odds of taking a shot
                 try: # Decrement 
                     self.game_clock.decrement(TIME_PER_SHOT)
-                except:
+                except ZeroDivisionError:
                     # This shot will evaluate as normal, acting like a buzzer beater shot
                     pass
                 
                 # Take a shot with the stat tracker object
                 scored, off_recovery, turnover = self.stat_tracker.take_shot(
                     ball_position=self.ball_position,
-                    prob_stack=self.prob_stack,
+                    rng=self.rng,
                     offense_stats=self.offense_stats,
                     defense_stats=self.defense_stats,
                     home_posession=self.home_posession,
@@ -352,7 +571,7 @@ class GameSimulator():
                 )
                 if turnover: 
                     # Put in info for where the turnover took place (don't track turnovers due to missed shots)
-                    turnover_position = self.ball_position + (40 - self.ball_position)*self.prob_stack.pop()
+                    turnover_position = self.ball_position + (40 - self.ball_position)*self.rng.uniform()
                     break
                 if scored:
                     break
@@ -360,15 +579,16 @@ class GameSimulator():
                     pass
             else:
                 # Pass the ball
-                if np.random.uniform(0,1) < self.offense_stats["ratio"]: # type: ignore
-                    self.ball_position += min(40-self.ball_position, np.random.normal(4, 1.5)) # normal pass completed and advanced
+                self.passes += 1
+                if self.rng.uniform() < self.offense_stats["ratio"]: # type: ignore
+                    self.ball_position += min(40-self.ball_position, self.rng.normal(4, 1.5)) # normal pass completed and advanced
                     try: # Decrement game clock
                         self.game_clock.decrement(TIME_PER_PASS)
-                    except:
+                    except ZeroDivisionError:
                         # Time has run out, immediately take a buzzer beater shot
                         scored, _, _ = self.stat_tracker.take_shot(
                             ball_position=self.ball_position,
-                            prob_stack=self.prob_stack,
+                            rng=self.rng,
                             offense_stats=self.offense_stats,
                             defense_stats=self.defense_stats,
                             home_posession=self.home_posession,
@@ -377,7 +597,7 @@ class GameSimulator():
                         break
 
                 else:
-                    turnover_position = self.ball_position + min(40-self.ball_position, np.random.normal(4, 1.5))*self.prob_stack.pop()
+                    turnover_position = self.ball_position + min(40-self.ball_position, self.rng.normal(4, 1.5))*self.rng.uniform()
                     # Record passing turnover and break out of loop
                     if self.home_posession:
                         self.stat_tracker.home_turnovers += 1
@@ -385,14 +605,58 @@ class GameSimulator():
                         self.stat_tracker.away_turnovers += 1
                     try: # Decrement 
                         self.game_clock.decrement(TIME_PER_PASS)
-                    except:
+                    except ZeroDivisionError:
                         # Cannot take buzzer beater due to turnover
                         pass
                     
                     break
 
         return scored, turnover_position
-    
+
+    def offensive_posession_chain(self, overtime=False):
+        """
+        Same possession as offensive_posession, but each run of passes up to the next
+        shot or failed pass is drawn in one go from the possession_chain tables.
+        Near the end of a half the clock could run out mid-run (a buzzer beater), so
+        the rest of the possession falls back to the per-pass loop.
+        """
+        table = self._tables[self.home_posession]
+        horizon = self._chain_horizon
+
+        while True:
+            if not overtime and self.game_clock.time_left <= horizon:
+                return self.offensive_posession()
+
+            passes, self.ball_position, ending, elapsed = table.draw(self.ball_position, self.rng.uniform())
+            self.passes += passes if ending == SHOT else passes + 1
+            if not overtime:
+                try: # Decrement (a shot at 0:00 still evaluates, as in the loop)
+                    self.game_clock.decrement(elapsed)
+                except ZeroDivisionError:
+                    pass
+
+            if ending == SHOT:
+                scored, off_recovery, turnover = self.stat_tracker.take_shot(
+                    ball_position=self.ball_position,
+                    rng=self.rng,
+                    offense_stats=self.offense_stats,
+                    defense_stats=self.defense_stats,
+                    home_posession=self.home_posession,
+                    time_left=0 if overtime else self.game_clock.time_left,
+                )
+                if turnover:
+                    return False, self.ball_position + (40 - self.ball_position)*self.rng.uniform()
+                if scored:
+                    return True, False
+                # Offensive recovery: a new run starts from the same spot
+            else:
+                turnover_position = self.ball_position + min(40-self.ball_position, self.rng.normal(4, 1.5))*self.rng.uniform()
+                if self.home_posession:
+                    self.stat_tracker.home_turnovers += 1
+                else:
+                    self.stat_tracker.away_turnovers += 1
+                return False, turnover_position
+
     def postgame(self):
         # Add win and loss to the correct teams' records
         if self.home_score > self.away_score:
@@ -425,44 +689,46 @@ class GameSimulator():
             goals_allowed=self.stat_tracker.away_goalie_goals_allowed
         )
 
-        # Build game summary for RecordKeeper
-        self.game_summary = {
-            "home_team": self.home_team.id,
-            "away_team": self.away_team.id,
-            "home_score": self.home_score,
-            "away_score": self.away_score,
-            "went_to_overtime": self.stat_tracker.in_overtime,
-            "scoring_log": self.stat_tracker.get_score_info(),
-            "home_goals_by_player": {
-                self.stat_tracker.home_scorers[i].name: int(self.stat_tracker.home_goals[i])
-                for i in range(len(self.stat_tracker.home_scorers))
-                if self.stat_tracker.home_goals[i] > 0
-            },
-            "away_goals_by_player": {
-                self.stat_tracker.away_scorers[i].name: int(self.stat_tracker.away_goals[i])
-                for i in range(len(self.stat_tracker.away_scorers))
-                if self.stat_tracker.away_goals[i] > 0
-            },
-            # Shots keyed by every player who attempted at least one shot, so
-            # RecordKeeper can build complete per-player game lines (including
-            # players who shot but did not score).
-            "home_shots_by_player": {
-                self.stat_tracker.home_scorers[i].name: int(self.stat_tracker.home_shots[i])
-                for i in range(len(self.stat_tracker.home_scorers))
-                if self.stat_tracker.home_shots[i] > 0
-            },
-            "away_shots_by_player": {
-                self.stat_tracker.away_scorers[i].name: int(self.stat_tracker.away_shots[i])
-                for i in range(len(self.stat_tracker.away_scorers))
-                if self.stat_tracker.away_shots[i] > 0
-            },
-            "home_goalie_saves": self.stat_tracker.home_goalie_saves,
-            "away_goalie_saves": self.stat_tracker.away_goalie_saves,
-        }
+        self.finished = True
+        self._game_summary = None
+
+    @property
+    def game_summary(self):
+        """ Summary dict for RecordKeeper, built from the stat tracker the first
+        time it is read (None before postgame). scoring_log is None when the game
+        ran with record_events=False. """
+        if not self.finished:
+            return None
+        if self._game_summary is None:
+            tracker = self.stat_tracker
+            self._game_summary = {
+                "home_team": self.home_team.id,
+                "away_team": self.away_team.id,
+                "home_score": self.home_score,
+                "away_score": self.away_score,
+                "went_to_overtime": tracker.in_overtime,
+                "scoring_log": tracker.get_score_info(),
+                "home_goals_by_player": _by_name(tracker.home_scorers, tracker.home_goals),
+                "away_goals_by_player": _by_name(tracker.away_scorers, tracker.away_goals),
+                # Shots keyed by every player who attempted at least one shot, so
+                # RecordKeeper can build complete per-player game lines (including
+                # players who shot but did not score).
+                "home_shots_by_player": _by_name(tracker.home_scorers, tracker.home_shots),
+                "away_shots_by_player": _by_name(tracker.away_scorers, tracker.away_shots),
+                "home_goalie_saves": tracker.home_goalie_saves,
+                "away_goalie_saves": tracker.away_goalie_saves,
+            }
+        return self._game_summary
 
     def get_game_summary(self):
         """Return the game summary dict for RecordKeeper integration."""
-        return getattr(self, 'game_summary', None)
+        return self.game_summary
+
+
+def _by_name(scorers, counts):
+    """ {player name: count} for the scorers with a nonzero count """
+    return {scorers[i].name: int(counts[i]) for i in range(len(scorers)) if counts[i] > 0}
+
 
 class GameClock():
     def __init__(self):
@@ -486,14 +752,38 @@ class GameClock():
 
 
 
+class EventLog():
+    """
+    Append-only buffer of EVENT_DTYPE rows. Grows by doubling, so recording an
+    event is one row assignment (no string formatting, no per-event objects).
+    """
+    def __init__(self, capacity=64):
+        self._rows = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.size = 0
+
+    def append(self, period, clock, team, scorer, event):
+        if self.size == len(self._rows):
+            self._rows = np.concatenate((self._rows, np.zeros(len(self._rows), dtype=EVENT_DTYPE)))
+        self._rows[self.size] = (period, clock, team, scorer, event)
+        self.size += 1
+
+    @property
+    def rows(self):
+        """ The recorded events, in order (a view; copy before keeping it) """
+        return self._rows[:self.size]
+
+    def __len__(self):
+        return self.size
+
+
 class StatTracker():
     """
     Keeps track of players stats throughout the match
     """
-    def __init__(self, home_team, home_scorer_stats, away_team, away_scorer_stats):
+    def __init__(self, home_team, home_scorer_stats, away_team, away_scorer_stats, record_events=True):
 
-        # Scoring Updates
-        self.scoring_tracker = []
+        # Scoring updates (None in summary-only mode: nothing is logged)
+        self.events = EventLog() if record_events else None
 
         # what half it is
         self.first_half = True
@@ -501,19 +791,12 @@ class StatTracker():
 
         ## SET UP HOME TEAM INFO
         self.home_team_name = home_team.id
-        self.home_scorers = list(chain(
-            home_team.starters["Forward"], # 3 players
-            home_team.starters["Midfielder"], # 3 players
-            home_team.bench["Forward"], # 2 players
-            home_team.bench["Midfielder"], # 2 players
-            ))
-
-        # Weight by the minutes played and overall contribution to the offense.
-        # Use the offense values from the Player objects on the team, so this
-        # works whether the caller passes in Player objects or simple ratings.
-        home_scorer_offense_values = np.array([player.offense for player in self.home_scorers])
-        self.home_scorers_likelihood = np.array([45, 45, 45, 45, 45, 45, 22.5, 22.5, 22.5, 22.5]) * home_scorer_offense_values
-        self.home_scorers_likelihood = self.home_scorers_likelihood / sum(self.home_scorers_likelihood)
+        # Starting F/M then bench F/M, weighted by minutes played and offense
+        # rating (see scorer_likelihood); cached per lineup on the TeamMatrix.
+        home_matrix = team_matrix(home_team)
+        self.home_scorers = list(home_matrix.scorers)
+        self.home_scorers_likelihood = home_matrix.scorer_likelihood
+        self.home_scorers_alias = home_matrix.scorer_alias
 
         self.home_goals = np.array([0]*10)
         self.home_shots = np.array([0]*10)
@@ -528,18 +811,12 @@ class StatTracker():
 
         ## SET UP AWAY TEAM INFO
         self.away_team_name = away_team.id
-        self.away_scorers = list(chain(
-            away_team.starters["Forward"], # 3 players
-            away_team.starters["Midfielder"], # 3 players
-            away_team.bench["Forward"], # 2 players
-            away_team.bench["Midfielder"], # 2 players
-            ))
-
-        # Weight by the minutes played and overall contribution to the offense.
-        # Use the offense values from the Player objects on the team.
-        away_scorer_offense_values = np.array([player.offense for player in self.away_scorers])
-        self.away_scorers_likelihood = np.array([45, 45, 45, 45, 45, 45, 22.5, 22.5, 22.5, 22.5]) * away_scorer_offense_values
-        self.away_scorers_likelihood = self.away_scorers_likelihood / sum(self.away_scorers_likelihood)
+        # Starting F/M then bench F/M, weighted by minutes played and offense
+        # rating (see scorer_likelihood); cached per lineup on the TeamMatrix.
+        away_matrix = team_matrix(away_team)
+        self.away_scorers = list(away_matrix.scorers)
+        self.away_scorers_likelihood = away_matrix.scorer_likelihood
+        self.away_scorers_alias = away_matrix.scorer_alias
 
         self.away_goals = np.array([0]*10)
         self.away_shots = np.array([0]*10)
@@ -551,51 +828,85 @@ class StatTracker():
         self.away_goalie_saves = 0  # saves made by away goalie
         self.away_goalie_goals_allowed = 0  # goals allowed by away goalie
 
+        # Shots on goal by either side (GameMetrics)
+        self.shots_on_goal = 0
+
+    @property
+    def period(self):
+        if self.in_overtime:
+            return OVERTIME
+        return FIRST_HALF if self.first_half else SECOND_HALF
+
     def halftime(self):
         """ Update information """
         self.first_half = False
-        self.scoring_tracker.append("--- HALFTIME ---")
+        if self.events is not None:
+            self.events.append(SECOND_HALF, 0, HOME, -1, HALFTIME_MARK)
 
     def start_overtime(self):
         """ Mark the start of overtime """
         self.in_overtime = True
-        self.scoring_tracker.append("--- OVERTIME (SUDDEN DEATH) ---")
+        if self.events is not None:
+            self.events.append(OVERTIME, 0, HOME, -1, OVERTIME_MARK)
+
+    @property
+    def scoring_tracker(self):
+        """ The event log rendered as text, one line per event ([] in summary-only mode) """
+        if self.events is None:
+            return []
+        lines = []
+        for period, clock, team, scorer, event in self.events.rows.tolist():
+            if event == HALFTIME_MARK:
+                lines.append("--- HALFTIME ---")
+            elif event == OVERTIME_MARK:
+                lines.append("--- OVERTIME (SUDDEN DEATH) ---")
+            else:
+                if team == HOME:
+                    team_name, scorers = self.home_team_name, self.home_scorers
+                else:
+                    team_name, scorers = self.away_team_name, self.away_scorers
+                lines.append(
+                    f"{team_name}: {scorers[scorer].name} scores with {GameClock.time_to_str(clock)} in the {PERIOD_LABELS[period]}!"
+                )
+        return lines
 
     def get_score_info(self):
+        """ Rendered scoring log, or None if the game ran with record_events=False """
+        if self.events is None:
+            return None
         info = [f"{self.away_team_name} @ {self.home_team_name}\n", "--- START OF REGULATION ---"]
         info.extend(self.scoring_tracker)
         info.extend("--- END OF REGULATION ---")
         return "\n".join(info)
 
 
-    def take_shot(self, ball_position, prob_stack, offense_stats, defense_stats, home_posession, time_left):
+    def take_shot(self, ball_position, rng, offense_stats, defense_stats, home_posession, time_left):
         """ Handles the shot taking mechanics and records relevant information """
         scored, off_recovery, turnover = False, False, False
 
         # Which team has posession?
         if home_posession:
             scorers = self.home_scorers
-            likelihood = self.home_scorers_likelihood
+            scorers_alias = self.home_scorers_alias
             goals = self.home_goals
             shots = self.home_shots
             off_recov = self.home_off_recov
-            team_name = self.home_team_name
         else:
             scorers = self.away_scorers
-            likelihood = self.away_scorers_likelihood
+            scorers_alias = self.away_scorers_alias
             goals = self.away_goals
             shots = self.away_shots
             off_recov = self.away_off_recov
-            team_name = self.away_team_name
 
         # Who shot the ball
-        idx = np.random.choice(np.arange(len(scorers)), p=likelihood)
+        idx = scorers_alias.draw(rng.uniform())
         shots[idx] += 1
 
-        if prob_stack.pop() < scorers[idx].offense * np.exp(-K * (40-ball_position)): # If shot was taken, was it on goal?
+        if rng.uniform() < scorers[idx].offense * np.exp(-K * (40-ball_position)): # If shot was taken, was it on goal?
             # Shot taken was on goal
+            self.shots_on_goal += 1
             # Evaluate the result of the shot (weight the offense of the scorer more)
-            if prob_stack.pop() < (0.5*offense_stats["offense"] + 1.25*scorers[idx].offense)/ (offense_stats["offense"] + defense_stats["defense"] + defense_stats["goalie"]):
+            if rng.uniform() < (0.5*offense_stats["offense"] + 1.25*scorers[idx].offense)/ (offense_stats["offense"] + defense_stats["defense"] + defense_stats["goalie"]):
                 scored = True
                 goals[idx] += 1
                 # Track goal allowed by defending goalie
@@ -604,18 +915,9 @@ class StatTracker():
                 else:
                     self.home_goalie_goals_allowed += 1
 
-                # Determine period label for scoring tracker
-                if self.in_overtime:
-                    period_label = "OT"
-                elif self.first_half:
-                    period_label = "1st half"
-                else:
-                    period_label = "2nd half"
-
-                self.scoring_tracker.append(
-                    f"{team_name}: {scorers[idx].name} scores with {GameClock.time_to_str(time_left)} in the {period_label}!"
-                )
-            elif prob_stack.pop() < 0.1:
+                if self.events is not None:
+                    self.events.append(self.period, time_left, HOME if home_posession else AWAY, idx, GOAL)
+            elif rng.uniform() < 0.1:
                 off_recovery = True
             else:
                 # Shot on goal was saved by the goalie
@@ -625,7 +927,7 @@ class StatTracker():
                     self.home_goalie_saves += 1
                 turnover = True
 
-        elif prob_stack.pop() < 0.1:
+        elif rng.uniform() < 0.1:
             off_recovery = True
             off_recov += 1
         else:
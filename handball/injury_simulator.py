@@ -19,7 +19,9 @@ Description: Chunk-based injury processing.
     team -- the incentive for the manager to re-arrange during the chunk break.
     Injury DURATION is in chunks (minor=1, moderate=2, major=3).
 
-    RNG is injected (a random.Random) so a season is reproducible.
+    RNG is injected (a random.Random) so a season is reproducible; its state can
+    be saved and restored (rng_state/restore_rng_state) so a resumed run rolls
+    the same injuries as an uninterrupted one.
 Author: design sketch
 """
 from __future__ import annotations
@@ -66,6 +68,17 @@ class InjurySimulator:
         self.rules = rules
         self.events: list[InjuryEvent] = []
 
+    # -- RNG checkpointing (see season.Checkpoint) --------------------------
+    def rng_state(self) -> list:
+        """The RNG's state as plain JSON-able lists, for a season checkpoint."""
+        version, internal, gauss_next = self.rng.getstate()
+        return [version, list(internal), gauss_next]
+
+    def restore_rng_state(self, state: list) -> None:
+        """Continue from a state captured by rng_state()."""
+        version, internal, gauss_next = state
+        self.rng.setstate((version, tuple(internal), gauss_next))
+
     # -- integration with the orchestrator --------------------------------
     def process_period_end(self, orch, team_ids, *, chunk: int) -> None:
         """Process every team's injuries for the just-finished chunk and persist+
@@ -106,6 +119,8 @@ class InjurySimulator:
                 "injury", p.id, p.name, team.id, chunk, itype, severity))
             changed = True
 
+        if changed:
+            team.invalidate_matrix()
         return changed
 
     # -- helpers -----------------------------------------------------------
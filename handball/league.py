@@ -17,6 +17,10 @@ Description: The single composition root for the redesigned stack -- the new
     engine are injected.
 
         build_production_league(...)  -> Google sheet + JSON datafiles + real sim
+        build_projection_league(...)  -> in-memory copy of any repo + the fast
+                                         SurrogateGameEngine (what-ifs)
+        LeagueSnapshot.from_postgres  -> in-memory fork of the Postgres league,
+          (league_snapshot)              real sim, nothing written back
         (offline)                     -> construct LeagueOperations directly with
                                          InMemoryTeamRepository + FakeSheetGateway
                                          + SimpleGameEngine (see tests)
@@ -25,7 +29,7 @@ Author: design sketch
 from __future__ import annotations
 
 import random
-from typing import Callable, Iterable
+from typing import TYPE_CHECKING, Callable, Iterable
 
 from handball.injury_simulator import InjurySimulator
 from handball.league_views import DEFAULT_RULES, RosterRules, TeamId
@@ -35,7 +39,12 @@ from handball.orchestration import (
     build_production_orchestrator,
 )
 from handball.postseason import Bracket, DraftPickResult, DraftService, PlayoffService
-from handball.season import Schedule, SeasonRunner
+from handball.repository import InMemoryTeamRepository, TeamRepository
+from handball.progress import ProgressPublisher
+from handball.season import CheckpointStore, Schedule, SeasonRunner
+
+if TYPE_CHECKING:
+    from handball.surrogate_engine import SurrogateModel
 
 # Mirrors the legacy OperationsHandler constants so the facade behaves the same.
 PLAYOFF_TEAMS_PER_CONFERENCE = 8
@@ -63,8 +72,32 @@ class LeagueOperations:
         conference_of: Callable[[TeamId], str] | None = None,
         teams_per_conference: int = PLAYOFF_TEAMS_PER_CONFERENCE,
         rules: RosterRules = DEFAULT_RULES,
+        season: int = 0,
+        seed: int | None = None,
+        workers: int = 1,
+        checkpoints: CheckpointStore | None = None,
+        progress: ProgressPublisher | None = None,
+        pipeline: bool = False,
+        period_batch: bool = False,
+        ranking: Callable[[], list[TeamId]] | None = None,
     ) -> None:
         self.orch = orchestrator
+        # Per-game seeds derive from (season, week, home, away, seed); see
+        # season.game_seed. No seed -> each run draws a base from np.random.
+        self.season = season
+        self.seed = seed
+        # >1 plays each week's games in a process pool (see SeasonRunner).
+        self.workers = workers
+        # Week-by-week commits + resume_period (see SeasonRunner).
+        self.checkpoints = checkpoints
+        # Live game/week/period events (see handball.progress).
+        self.progress = progress
+        # Prefetch/persist threads around each period's games (see SeasonRunner).
+        self.pipeline = pipeline
+        # Each period as one all-or-nothing transaction (see SeasonRunner).
+        self.period_batch = period_batch
+        # Best->worst team ids with full tiebreakers (see ranked_team_ids).
+        self._ranking = ranking
         self.schedule = schedule
         self.injuries = injuries
         self.rules = rules
@@ -92,7 +125,9 @@ class LeagueOperations:
             raise RuntimeError(
                 "no schedule set; call generate_schedule() or set_schedule() first"
             )
-        return SeasonRunner(self.orch, self.schedule, self.injuries)
+        return SeasonRunner(self.orch, self.schedule, self.injuries, season=self.season, seed=self.seed,
+                            workers=self.workers, checkpoints=self.checkpoints, progress=self.progress,
+                            pipeline=self.pipeline, period_batch=self.period_batch)
 
     # -- season lifecycle --------------------------------------------------
     def publish_all(self) -> None:
@@ -105,13 +140,19 @@ class LeagueOperations:
     def run_period(self, p: int) -> list[GameResult]:
         return self._runner().run_period(p)
 
+    def resume_period(self, p: int) -> list[GameResult]:
+        return self._runner().resume_period(p)
+
     def standings(self) -> list[tuple[TeamId, tuple[int, int, int]]]:
         return self.orch.standings()
 
     def ranked_team_ids(self) -> list[TeamId]:
         """Best -> worst, the order draft (reversed) and playoff seeding use.
-        Derived from the orchestrator's W-L-T standings; richer goal-differential
-        tiebreakers can be layered on via the record sink later."""
+        The injected `ranking` when there is one (the Postgres league reads the
+        goal-differential tiebreakers from team_season_standings); otherwise the
+        orchestrator's W-L-T standings."""
+        if self._ranking is not None:
+            return self._ranking()
         return [tid for tid, _ in self.orch.standings()]
 
     # -- postseason --------------------------------------------------------
@@ -147,10 +188,10 @@ def build_production_league(  # pragma: no cover - live wiring
 ) -> LeagueOperations:
     """Wire the full production facade: JSON datafiles repository + Google sheet
     gateway + the real GameSimulator, plus injuries and the postseason
-    services. `seed` makes the injury RNG reproducible."""
+    services. `seed` makes the injury RNG and every game reproducible."""
     orch = build_production_orchestrator(datafiles_dir, sheet_id, allow_tie=allow_tie)
     injuries = InjurySimulator(rng=random.Random(seed), year=year)
-    return LeagueOperations(orch, schedule=schedule, injuries=injuries)
+    return LeagueOperations(orch, schedule=schedule, injuries=injuries, season=year, seed=seed)
 
 
 def build_production_league_pg(
@@ -160,17 +201,27 @@ def build_production_league_pg(
     allow_tie: bool = False,
     seed: int | None = None,
     schedule: Schedule | None = None,
+    period_batch: bool = False,
 ) -> LeagueOperations:
     """Postgres-backed production facade -- the relational replacement for
     build_production_league. Source of truth + stats live in Postgres
     (PostgresTeamRepository + PostgresRecordSink), and there is NO SheetGateway:
     managers edit lineups/trades through the website/API, so the batch sim needs
     no inbox. `db_url` overrides $HANDBALL_DB_URL; `year` tags the season the
-    record sink writes."""
+    record sink writes. `seed` (the season's injury seed) also seeds every game,
+    and each game's derived seed is stored on its games row. Periods commit week
+    by week against the season_state checkpoint, so resume_period can pick up
+    an interrupted run, and progress is NOTIFYed for the API's stream. With
+    `period_batch` a period instead commits as one transaction, its games
+    COPY-staged (see PostgresRecordSink.period_batch): the batch-run mode. Draft
+    and playoff seeding rank from team_season_standings."""
     from handball.db import get_engine
     from handball.orchestration import GameSimulatorAdapter
     from handball.pg_record_sink import PostgresRecordSink
     from handball.pg_repository import PostgresTeamRepository
+    from handball.progress import PostgresProgressBus
+    from handball.schedule_repository import PostgresCheckpointStore
+    from handball.standings_repository import ranked_team_ids
 
     engine = get_engine(db_url)
     orch = SeasonOrchestrator(
@@ -180,7 +231,40 @@ def build_production_league_pg(
         record_sink=PostgresRecordSink(engine, season=year),
     )
     injuries = InjurySimulator(rng=random.Random(seed), year=year)
-    return LeagueOperations(orch, schedule=schedule, injuries=injuries)
+    return LeagueOperations(orch, schedule=schedule, injuries=injuries, season=year, seed=seed,
+                            checkpoints=PostgresCheckpointStore(engine, year),
+                            progress=PostgresProgressBus(engine), period_batch=period_batch,
+                            ranking=lambda: ranked_team_ids(engine, year))
+
+
+def build_projection_league(
+    source: TeamRepository,
+    *,
+    model: "SurrogateModel | None" = None,
+    year: int = 0,
+    allow_tie: bool = False,
+    seed: int | None = None,
+    schedule: Schedule | None = None,
+) -> LeagueOperations:
+    """Projection / what-if facade. Every team is snapshotted from `source` into
+    an InMemoryTeamRepository, so a projection never writes back, and games are
+    drawn by the SurrogateGameEngine (the shipped coefficients unless `model` is
+    given). `seed` makes the projection reproducible (game and injury draws)."""
+    import numpy as np
+
+    from handball.surrogate_engine import SurrogateGameEngine
+
+    repo = InMemoryTeamRepository()
+    for team in source.load_all():
+        repo.save(team)
+    rng = np.random.default_rng(seed) if seed is not None else None
+    orch = SeasonOrchestrator(
+        team_repo=repo,
+        gateway=None,
+        engine=SurrogateGameEngine(model, allow_tie=allow_tie, rng=rng),
+    )
+    injuries = InjurySimulator(rng=random.Random(seed), year=year)
+    return LeagueOperations(orch, schedule=schedule, injuries=injuries, season=year, seed=seed)
 
 
 def build_production_league_from_cred(  # pragma: no cover - live wiring
@@ -0,0 +1,116 @@
+"""
+Name: league_snapshot.py
+Description: An in-memory fork of the Postgres league for simulations that must
+    not persist -- projections, dry runs of a period, playoff previews.
+
+    LeagueSnapshot.from_postgres(engine, season) reads the whole league in a
+    handful of queries on one REPEATABLE READ connection (so every table is
+    seen at the same instant): teams, players and injuries set-based through
+    PostgresTeamRepository, then the schedule and the season_state row. The
+    teams land in an InMemoryTeamRepository; nothing afterwards touches the
+    database.
+
+    league() wires a LeagueOperations over the snapshot: InMemoryRecordSink for
+    the games, an InMemoryCheckpointStore holding the season's checkpoint, and
+    the injury RNG and game seeds the live run would use -- so replaying the
+    next period on a fresh snapshot plays the same games the workers will.
+
+    fork() clones the snapshot's team state (a deepcopy of the stored team
+    dicts, no re-serialization, no query) for independent what-if branches:
+
+        base = LeagueSnapshot.from_postgres(engine, 2026)
+        for seed in range(1000):
+            base.fork().league(seed=seed).run_period(base.periods_run + 1)
+Author: relational backend
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field, replace
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from handball import schedule_repository as sched_repo
+from handball.injury_simulator import InjurySimulator
+from handball.league import LeagueOperations
+from handball.orchestration import GameEngine, GameSimulatorAdapter, InMemoryRecordSink, SeasonOrchestrator
+from handball.pg_repository import PostgresTeamRepository
+from handball.repository import InMemoryTeamRepository
+from handball.season import Checkpoint, InMemoryCheckpointStore, Schedule
+
+
+@dataclass
+class LeagueSnapshot:
+    """The league's state for `season` at one instant. `schedule` is None before
+    the season's schedule is generated; `state` is the season_state row ({}
+    before the season is initialized)."""
+
+    season: int
+    repo: InMemoryTeamRepository
+    schedule: Schedule | None = None
+    state: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_postgres(cls, engine: Engine, season: int) -> "LeagueSnapshot":
+        repo = InMemoryTeamRepository()
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            for team in PostgresTeamRepository(engine).load_all(conn=conn):
+                repo.save(team)
+            try:
+                schedule = sched_repo.load_schedule(engine, season, conn=conn)
+            except sched_repo.ScheduleError:
+                schedule = None
+            row = conn.execute(
+                text("select periods_run, schedule_seed, injury_seed, checkpoint_week, "
+                     "injury_rng_state from season_state where season = :s"),
+                {"s": season},
+            ).mappings().first()
+        return cls(season, repo, schedule, dict(row) if row else {})
+
+    @property
+    def periods_run(self) -> int:
+        return self.state.get("periods_run") or 0
+
+    @property
+    def seed(self) -> int | None:
+        """The season's injury seed, which also seeds every game (as in
+        build_production_league_pg and the sim_jobs queue)."""
+        return self.state.get("injury_seed")
+
+    @property
+    def checkpoint(self) -> Checkpoint:
+        return Checkpoint(self.state.get("checkpoint_week") or 0, self.state.get("injury_rng_state"))
+
+    def fork(self) -> "LeagueSnapshot":
+        """An independent copy: games played on one never show in the other.
+        The schedule is immutable and shared."""
+        return replace(self, repo=self.repo.copy(), state=dict(self.state))
+
+    def league(
+        self,
+        *,
+        game_engine: GameEngine | None = None,
+        seed: int | None = None,
+        allow_tie: bool = False,
+    ) -> LeagueOperations:
+        """A LeagueOperations playing on this snapshot (games go to an
+        InMemoryRecordSink, reachable as .orch.record_sink). `seed` overrides
+        the season's seed for the games and the injury RNG; left None the run
+        reproduces the live one, injury RNG restored from the checkpoint."""
+        orch = SeasonOrchestrator(
+            team_repo=self.repo,
+            gateway=None,
+            engine=game_engine or GameSimulatorAdapter(allow_tie=allow_tie),
+            record_sink=InMemoryRecordSink(),
+        )
+        checkpoints = InMemoryCheckpointStore()
+        checkpoint = self.checkpoint
+        if seed is None:
+            seed = self.seed
+        else:                             # a what-if: the RNG starts from `seed`
+            checkpoint = Checkpoint(checkpoint.week)
+        checkpoints.save(checkpoint)
+        injuries = InjurySimulator(rng=random.Random(seed), year=self.season)
+        return LeagueOperations(orch, schedule=self.schedule, injuries=injuries, season=self.season,
+                                seed=seed, checkpoints=checkpoints)
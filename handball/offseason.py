@@ -26,6 +26,7 @@ from __future__ import annotations
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from handball.db import pipeline
 from handball.pg_repository import PLAYER_SCALAR_COLS
 from handball.repository import _player_from_dict
 from handball.simulation_vars import DRAFT_ROUNDS, RETIREMENT_CANDIDATE_AGE
@@ -87,8 +88,7 @@ def advance_season(engine: Engine, season: int, ranked_team_ids: list[str]) -> d
     with engine.begin() as conn:
         awards = _compute_awards(conn, season)
         picks = _seed_draft_order(conn, ranked_team_ids, new_season)
-        for future_season in range(new_season + 1, new_season + 11):
-            _extend_future_picks(conn, future_season)
+        _extend_future_pick_window(conn, new_season)
         aged = _age_all_players(conn)
         freed = _process_free_agency(conn)
         teams_reset = _reset_team_records(conn)
@@ -187,6 +187,16 @@ def _seed_draft_order(conn, ranked_team_ids: list[str], new_season: int) -> int:
     return len(rows)
 
 
+# Every team's placeholder rows (both rounds) for :s; existing rows are kept.
+_FUTURE_PICKS = (
+    "insert into draft_picks "
+    "(season, round, original_team_id, holder_team_id, pick_number, used) "
+    "select :s, rnd.round, t.id, t.id, null, false "
+    "from teams t cross join generate_series(1, :rounds) as rnd(round) "
+    "on conflict (season, round, original_team_id) do nothing"
+)
+
+
 def _extend_future_picks(conn, target_season: int) -> int:
     """Ensure every team has a placeholder draft_picks row (both rounds) for
     `target_season`, so far-future picks are already real DB rows and can be traded
@@ -195,17 +205,20 @@ def _extend_future_picks(conn, target_season: int) -> int:
     placeholder or has since been seeded/traded. Returns rows inserted (0 if the
     season was already fully populated)."""
     rows = conn.execute(
-        text("insert into draft_picks "
-             "(season, round, original_team_id, holder_team_id, pick_number, used) "
-             "select :s, rnd.round, t.id, t.id, null, false "
-             "from teams t cross join generate_series(1, :rounds) as rnd(round) "
-             "on conflict (season, round, original_team_id) do nothing "
-             "returning 1"),
+        text(_FUTURE_PICKS + " returning 1"),
         {"s": target_season, "rounds": DRAFT_ROUNDS},
     ).all()
     return len(rows)
 
 
+def _extend_future_pick_window(conn, new_season: int) -> None:
+    """_extend_future_picks for the ten seasons after `new_season`. The inserts
+    are independent and their counts unused, so they run under db.pipeline."""
+    with pipeline(conn):
+        for target_season in range(new_season + 1, new_season + 11):
+            conn.execute(text(_FUTURE_PICKS), {"s": target_season, "rounds": DRAFT_ROUNDS})
+
+
 # -- player aging ------------------------------------------------------------
 # Columns advance_year() mutates and we persist back (the rest are unchanged by a
 # normal year; injury-impact changes happen during the season, not here).
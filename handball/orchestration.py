@@ -22,13 +22,16 @@ Author: design sketch
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Protocol, runtime_checkable
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
 
 from handball.domain import Team
 from handball.league_views import DEFAULT_RULES, PlayerId, RosterRules, TeamId
 from handball.repository import TeamRepository
 from handball.sheet_gateway import SheetGateway
 
+if TYPE_CHECKING:
+    from handball.game_simulator import GameMetrics
+
 
 # ---------------------------------------------------------------------------
 # Game-engine seam.
@@ -45,6 +48,12 @@ class GameResult:
     # halftime-split goalie stats. Empty for engines that don't model lineups
     # (e.g. SimpleGameEngine).
     player_lines: dict[PlayerId, dict] = field(default_factory=dict)
+    # The seed the game was played from (season.game_seed), or None if it drew
+    # from the engine's own stream. Replaying it needs the same engine + teams.
+    seed: int | None = None
+    # Hot-path counters and timings (game_simulator.GameMetrics) when the engine
+    # was asked for them (GameSimulatorAdapter(metrics=True)); None otherwise.
+    metrics: GameMetrics | None = None
 
     @property
     def outcome_for_home(self) -> str:
@@ -57,14 +66,45 @@ class GameResult:
 
 @runtime_checkable
 class GameEngine(Protocol):
-    def play(self, home: Team, away: Team) -> GameResult:
+    def play(self, home: Team, away: Team, *, seed: int | None = None) -> GameResult:
         """Simulate a game. CONTRACT: mutates both teams in place -- applies the
         W/L/T result to their records and appends per-player season-log entries --
         and returns a GameResult summarizing it. The orchestrator then persists
-        and publishes; it does NOT touch records itself."""
+        and publishes; it does NOT touch records itself.
+
+        With a `seed` the game draws only from a stream seeded by it, so the same
+        teams and seed replay the same game wherever and whenever it runs; the
+        seed is echoed on the result."""
+        ...
+
+    def play_many(
+        self, pairs: list[tuple[Team, Team]], seeds: list[int] | None = None
+    ) -> list[GameResult]:
+        """Simulate several independent games; same contract as play() applied
+        to each pair (with its seed) in order. Engines that can batch
+        (BatchGameEngine) play them together; the rest just loop."""
         ...
 
 
+def game_lines_for(team: Team) -> dict[PlayerId, dict]:
+    """Per-player lines for the game a simulator has just applied to `team`.
+    The simulator has just appended this game's entry to every player's season
+    log, so the last element of each list IS this game's line -- a robust,
+    id-keyed source (no fragile name lookups, and goalie saves/goals-allowed land
+    on the right player). Non-goalies have empty saves/goals_allowed lists."""
+    out: dict[PlayerId, dict] = {}
+    for p in team.roster():
+        log = p.current_season_log
+        out[p.id] = {
+            "goals": int(log["goals"][-1]) if log["goals"] else 0,
+            "shots": int(log["shots_taken"][-1]) if log["shots_taken"] else 0,
+            "saves": int(log["saves"][-1]) if log["saves"] else 0,
+            "goals_allowed": int(log["goals_allowed"][-1]) if log["goals_allowed"] else 0,
+            "performance": float(log["performances"][-1]) if log["performances"] else 0.0,
+        }
+    return out
+
+
 class SimpleGameEngine:
     """Deterministic reference engine so the orchestrator runs end-to-end
     offline. Score = starter attack vs opponent goalie -- enough to make a
@@ -80,52 +120,50 @@ class SimpleGameEngine:
     def _keeper(team: Team) -> float:
         return team.starters["Goalie"][0].goalie_skill if team.starters["Goalie"] else 0.0
 
-    def play(self, home: Team, away: Team) -> GameResult:
+    def play(self, home: Team, away: Team, *, seed: int | None = None) -> GameResult:
         home_score = max(0, round(self._attack(home) - self._keeper(away)))
         away_score = max(0, round(self._attack(away) - self._keeper(home)))
-        result = GameResult(home.id, away.id, home_score, away_score)
+        result = GameResult(home.id, away.id, home_score, away_score, seed=seed)
         outcome = result.outcome_for_home
         home.record_result(outcome)
         away.record_result({"W": "L", "L": "W", "T": "T"}[outcome])
         return result
 
+    def play_many(
+        self, pairs: list[tuple[Team, Team]], seeds: list[int] | None = None
+    ) -> list[GameResult]:
+        seeds = seeds if seeds is not None else [None] * len(pairs)
+        return [self.play(home, away, seed=s) for (home, away), s in zip(pairs, seeds)]
+
 
 class GameSimulatorAdapter:
     """Production GameEngine: runs the real handball.game_simulator.GameSimulator
     directly on domain.Team, then maps get_game_summary() -> GameResult.
 
     The import is lazy so constructing the orchestrator with a different engine
-    (e.g. SimpleGameEngine) never pulls in the simulator / its deps."""
+    (e.g. SimpleGameEngine) never pulls in the simulator / its deps.
 
-    def __init__(self, allow_tie: bool = False):
+    kernel selects GameSimulator's possession kernel (see game_simulator.KERNELS);
+    metrics=True attaches each game's GameMetrics to its result."""
+
+    def __init__(self, allow_tie: bool = False, kernel: str = "loop", metrics: bool = False):
         self.allow_tie = allow_tie
+        self.kernel = kernel
+        self.metrics = metrics
 
-    def play(self, home: Team, away: Team) -> GameResult:
+    def play(self, home: Team, away: Team, *, seed: int | None = None) -> GameResult:
         from handball.game_simulator import GameSimulator
+        from handball.utils import RandomSource
 
-        sim = GameSimulator(home, away, allow_tie=self.allow_tie)
+        # GameResult carries no play-by-play, so skip the event log entirely.
+        rng = RandomSource(seed) if seed is not None else None
+        sim = GameSimulator(home, away, allow_tie=self.allow_tie, kernel=self.kernel,
+                            rng=rng, record_events=False, metrics=self.metrics)
         sim.simulate_game()           # runs the game, calls postgame(), appends season logs
         s = sim.get_game_summary()
 
-        # Build complete per-player lines keyed by stable PlayerId. The simulator
-        # has just appended this game's entry to every player's season log, so the
-        # last element of each list IS this game's line -- a robust, id-keyed
-        # source (no fragile name lookups, and goalie saves/goals-allowed land on
-        # the right player). Non-goalies have empty saves/goals_allowed lists.
-        def lines_for(team: Team) -> dict[PlayerId, dict]:
-            out: dict[PlayerId, dict] = {}
-            for p in team.roster():
-                log = p.current_season_log
-                out[p.id] = {
-                    "goals": int(log["goals"][-1]) if log["goals"] else 0,
-                    "shots": int(log["shots_taken"][-1]) if log["shots_taken"] else 0,
-                    "saves": int(log["saves"][-1]) if log["saves"] else 0,
-                    "goals_allowed": int(log["goals_allowed"][-1]) if log["goals_allowed"] else 0,
-                    "performance": float(log["performances"][-1]) if log["performances"] else 0.0,
-                }
-            return out
-
-        lines = {**lines_for(home), **lines_for(away)}
+        # Complete per-player lines keyed by stable PlayerId (see game_lines_for).
+        lines = {**game_lines_for(home), **game_lines_for(away)}
 
         return GameResult(
             home_id=home.id,
@@ -134,8 +172,16 @@ class GameSimulatorAdapter:
             away_score=int(s["away_score"]),
             went_to_overtime=bool(s.get("went_to_overtime", False)),
             player_lines=lines,
+            seed=seed,
+            metrics=sim.metrics,
         )
 
+    def play_many(
+        self, pairs: list[tuple[Team, Team]], seeds: list[int] | None = None
+    ) -> list[GameResult]:
+        seeds = seeds if seeds is not None else [None] * len(pairs)
+        return [self.play(home, away, seed=s) for (home, away), s in zip(pairs, seeds)]
+
 
 # ---------------------------------------------------------------------------
 # Record sink seam (where finished games are persisted for stats).
@@ -200,24 +246,32 @@ class SeasonOrchestrator:
         return True
 
     def simulate_matchup(
-        self, home_id: TeamId, away_id: TeamId, *, week: int | None = None
+        self, home_id: TeamId, away_id: TeamId, *, week: int | None = None,
+        seed: int | None = None,
     ) -> GameResult:
         home = self.team_repo.load(home_id)
         away = self.team_repo.load(away_id)
-        result = self.engine.play(home, away)   # mutates records + season logs
+        result = self.engine.play(home, away, seed=seed)   # mutates records + season logs
+        self.persist_game(home, away, result, week=week)
+        return result
 
+    def persist_game(
+        self, home: Team, away: Team, result: GameResult, *, week: int | None = None
+    ) -> None:
+        """Save + republish both teams as the game left them and record the
+        result. simulate_matchup's second half, public so a game played
+        elsewhere (e.g. in a SeasonRunner worker process) lands the same way."""
         for team in (home, away):
             self.team_repo.save(team)
             if self.gateway is not None:
                 self.gateway.publish(team.public_view())
         self.record_sink.record_game(result, week=week)
-        return result
 
     def standings(self) -> list[tuple[TeamId, tuple[int, int, int]]]:
-        """Current league table from the repo, sorted by wins desc then losses
-        asc. Includes every team (unplayed teams show 0-0-0)."""
-        teams = self.team_repo.load_all()
-        return sorted(((t.id, t.record) for t in teams), key=lambda x: (-x[1][0], x[1][1]))
+        """Current league table from the repo's records (no team is loaded),
+        sorted by wins desc then losses asc. Includes every team (unplayed
+        teams show 0-0-0)."""
+        return sort_standings(self.team_repo.records())
 
     def run_period(self, matchups: list[tuple[TeamId, TeamId]]) -> list[GameResult]:
         """One period: first pull every team's manager lineup edits, then play
@@ -228,6 +282,13 @@ class SeasonOrchestrator:
         return [self.simulate_matchup(h, a) for h, a in matchups]
 
 
+def sort_standings(
+    records: dict[TeamId, tuple[int, int, int]],
+) -> list[tuple[TeamId, tuple[int, int, int]]]:
+    """(team, W-L-T) best first: wins desc, then losses asc, then team id."""
+    return sorted(records.items(), key=lambda x: (-x[1][0], x[1][1], x[0]))
+
+
 # ---------------------------------------------------------------------------
 # Production wiring (one place; everything else is injected).
 # ---------------------------------------------------------------------------
@@ -0,0 +1,184 @@
+"""
+Name: period_session.py
+Description: Unit of work for one period. SeasonOrchestrator.simulate_matchup
+    loads both teams, saves both and records the game -- against Postgres that
+    is dozens of round trips per game, with every team reloaded and re-saved
+    about 11 times a period.
+
+    A PeriodSession instead loads each participating team once and keeps it in
+    an identity map: load() hands back the same live Team for the whole period,
+    save() only marks it dirty, and record_game() buffers the result. It stands
+    in as BOTH the TeamRepository and the RecordSink of a session-bound
+    orchestrator (PeriodSession.orch), so lineup pulls, games and the
+    InjurySimulator's period-end step all run unchanged, purely in memory.
+    flush() then writes each dirty team and every buffered game -- in one
+    transaction when the repository and sink share a SQL engine (the Postgres
+    pair), otherwise one save per dirty team and one record per game.
+
+    Nothing reaches the backing stores before flush(): a period that raises
+    part-way leaves them as they were.
+
+    detach() is flush() split in two: it takes a snapshot of the dirty teams
+    and the buffered games out of the session as PendingWrites, which can be
+    written later -- on another thread -- while the live teams play on (see
+    week_pipeline).
+Author: design sketch
+"""
+from __future__ import annotations
+
+from copy import deepcopy
+from typing import Callable, Iterable
+
+from handball.db import transaction
+from handball.domain import Team
+from handball.league_views import TeamId
+from handball.orchestration import GameResult, RecordSink, SeasonOrchestrator
+from handball.repository import TeamRepository
+
+
+class PeriodSession:
+    """Identity-mapped TeamRepository + buffering RecordSink over `orchestrator`'s
+    stores. Use as a context manager (flushes on a clean exit) or call flush()."""
+
+    def __init__(self, orchestrator: SeasonOrchestrator) -> None:
+        self.repo: TeamRepository = orchestrator.team_repo
+        self.sink: RecordSink = orchestrator.record_sink
+        self.orch = SeasonOrchestrator(self, orchestrator.gateway, orchestrator.engine,
+                                       self, orchestrator.rules)
+        self._teams: dict[TeamId, Team] = {}
+        self._dirty: set[TeamId] = set()
+        self._games: list[tuple[GameResult, int | None]] = []
+
+    def __enter__(self) -> "PeriodSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def preload(self, team_ids) -> None:
+        """Load every team the period touches up front, in one load_many."""
+        self.load_many(team_ids)
+
+    def adopt(self, team: Team) -> None:
+        """Take in a team loaded elsewhere (a prefetch), unless the session
+        already holds that team -- its live copy may be ahead of the store."""
+        self._teams.setdefault(team.id, team)
+
+    # -- TeamRepository ----------------------------------------------------
+    def load(self, team_id: TeamId) -> Team:
+        team = self._teams.get(team_id)
+        if team is None:
+            team = self._teams[team_id] = self.repo.load(team_id)
+        return team
+
+    def save(self, team: Team) -> None:
+        self._teams[team.id] = team
+        self._dirty.add(team.id)
+
+    def all_team_ids(self) -> list[TeamId]:
+        return self.repo.all_team_ids()
+
+    def load_all(self) -> list[Team]:
+        return self.load_many(self.all_team_ids())
+
+    def load_many(self, team_ids: Iterable[TeamId]) -> list[Team]:
+        """The session's teams for `team_ids`, fetching the ones it does not
+        hold yet from the store in one load_many."""
+        team_ids = list(team_ids)
+        missing = list(dict.fromkeys(t for t in team_ids if t not in self._teams))
+        if missing:
+            for team in self.repo.load_many(missing):
+                self._teams[team.id] = team
+        return [self._teams[t] for t in team_ids]
+
+    def records(self) -> dict[TeamId, tuple[int, int, int]]:
+        """The store's records, with the session's live teams (which may be
+        ahead of it) in place of their stored ones."""
+        records = self.repo.records()
+        for tid, team in self._teams.items():
+            records[tid] = team.record
+        return records
+
+    # -- RecordSink --------------------------------------------------------
+    def record_game(self, result: GameResult, *, week: int | None = None) -> None:
+        self._games.append((result, week))
+
+    # -- unit of work ------------------------------------------------------
+    @property
+    def dirty(self) -> list[TeamId]:
+        return sorted(self._dirty)
+
+    def flush(self, then: Callable[..., None] | None = None, *, conn=None) -> None:
+        """Write every dirty team, then every buffered game. See
+        PendingWrites.write for `then` and `conn`."""
+        self._take(copy=False).write(then, conn=conn)
+
+    def detach(self) -> "PendingWrites":
+        """Take the dirty teams (as snapshots) and buffered games out of the
+        session, for writing later; the session carries on clean."""
+        return self._take(copy=True)
+
+    def _take(self, *, copy: bool) -> "PendingWrites":
+        teams = [self._teams[t] for t in self.dirty]
+        if copy:
+            teams = [deepcopy(t) for t in teams]
+        pending = PendingWrites(self.repo, self.sink, teams, list(self._games))
+        self._dirty.clear()
+        self._games.clear()
+        return pending
+
+
+class PendingWrites:
+    """Teams and games taken out of a PeriodSession, bound for its stores."""
+
+    def __init__(self, repo: TeamRepository, sink: RecordSink, teams: list[Team],
+                 games: list[tuple[GameResult, int | None]]) -> None:
+        self.repo = repo
+        self.sink = sink
+        self.teams = teams
+        self.games = games
+
+    def write(self, then: Callable[..., None] | None = None, *, conn=None) -> None:
+        """Write the teams, then the games (teams first: the Postgres sink
+        resolves each line's team from the saved players). `then`, if given,
+        runs last -- as then(conn=conn) inside the same transaction when there
+        is one, else as then() -- so a caller can commit its own bookkeeping
+        (e.g. a season Checkpoint) atomically with the data. Given `conn`
+        (shared-engine stores only), write inside that open transaction
+        instead of beginning one; the caller commits it. Without `conn`, a
+        sink inside PostgresRecordSink.period_batch() lends its transaction
+        (batch_conn), so the whole period commits as one."""
+        engine = _shared_engine(self.repo, self.sink)
+        if conn is not None and engine is None:
+            raise ValueError("flush(conn=...) needs a repository and sink on one SQL engine")
+        if engine is not None:
+            if conn is None:
+                conn = getattr(self.sink, "batch_conn", None)
+            with transaction(engine, conn) as conn:
+                for team in self.teams:
+                    self.repo.save(team, conn=conn)
+                record_games = getattr(self.sink, "record_games", None)
+                if record_games is not None:
+                    record_games(self.games, conn=conn)   # COPY-staged when large
+                else:
+                    for result, week in self.games:
+                        self.sink.record_game(result, week=week, conn=conn)
+                if then is not None:
+                    then(conn=conn)
+        else:
+            for team in self.teams:
+                self.repo.save(team)
+            for result, week in self.games:
+                self.sink.record_game(result, week=week)
+            if then is not None:
+                then()
+
+
+def _shared_engine(repo, sink):
+    """The SQL engine behind both stores if they share one (so a flush can be a
+    single transaction), else None."""
+    engine = getattr(repo, "engine", None)
+    if engine is not None and getattr(sink, "engine", None) is engine:
+        return engine
+    return None
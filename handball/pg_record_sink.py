@@ -7,17 +7,38 @@ Description: Postgres-backed RecordSink. Each finished game becomes one `games`
     are then queried from the player_season_stats view, never recomputed in app.
 
     Season is fixed per sink (a batch run simulates one season); week is optional.
+    The game's seed (GameResult.seed) is stored so it can be re-simulated alone.
     Each line's team_id is resolved from the players table, which the orchestrator
     has already saved before calling record_game (see SeasonOrchestrator.
     simulate_matchup), so home/away need not be threaded through GameResult.
+
+    A game costs two statements once the sink has seen its teams and players:
+    the games insert with every line in one multi-row insert (a CTE), then the
+    standings upsert -- one round trip under db.pipeline. Team and player uuids
+    are looked up set-based on first sight and cached for the sink's lifetime.
+
+    The same transaction also folds the game into team_season_standings (see
+    standings_repository), so the league table never disagrees with `games`.
+
+    Batches -- record_games(), as PeriodSession.flush and BufferedRecordSink
+    use it, or a period_batch() block -- of COPY_MIN_GAMES games or more are
+    streamed with COPY ... FROM STDIN into temporary staging tables and merged
+    set-based: a whole period's ~150 games and ~6,000 lines in a handful of
+    statements. period_batch() also holds the period's team saves and
+    checkpoints in the same transaction, so the period commits atomically.
 Author: relational backend
 """
 from __future__ import annotations
 
+from contextlib import contextmanager
+from functools import lru_cache
+from uuid import uuid4
+
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
-from handball.db import get_engine
+from handball import standings_repository
+from handball.db import get_engine, pipeline, transaction
 from handball.orchestration import GameResult
 
 
@@ -25,44 +46,208 @@ class PostgresRecordSink:
     def __init__(self, engine: Engine | None = None, *, season: int = 0):
         self.engine = engine or get_engine()
         self.season = season
+        # slug -> teams.id and legacy_id -> players.id, kept for the sink's
+        # lifetime: both are immutable surrogate keys, so an entry never goes
+        # stale (a player's *team* is not cached -- see _insert_game).
+        self._team_ids: dict = {}
+        self._player_ids: dict = {}
+
+        # Open period_batch(): its queued games and its transaction (batch_conn)
+        self._batch: list[tuple[GameResult, int | None]] | None = None
+        self.batch_conn = None
+
+    def record_game(self, result: GameResult, *, week: int | None = None, conn=None) -> None:
+        """Insert the game and its lines. Given `conn`, write inside that open
+        transaction (see period_session.PeriodSession.flush); otherwise in a
+        transaction of its own. Inside period_batch() the game is only queued
+        (unless `conn` is some other transaction, which it joins as usual)."""
+        if self._queues(conn):
+            self._batch.append((result, week))
+            return
+        with transaction(self.engine, conn) as conn:
+            self._record(conn, result, week)
+
+    def record_games(self, games: list[tuple[GameResult, int | None]], *, conn=None) -> None:
+        """Record several (result, week) pairs in one transaction (or inside
+        `conn`, as record_game). From COPY_MIN_GAMES games on they are COPY-staged
+        and merged set-based (see _copy_games); fewer go one by one. Queued
+        inside period_batch(), as record_game."""
+        if self._queues(conn):
+            self._batch.extend(games)
+            return
+        if not games:
+            return
+        with transaction(self.engine, conn) as conn:
+            if len(games) >= COPY_MIN_GAMES:
+                self._copy_games(conn, games)
+            else:
+                for result, week in games:
+                    self._record(conn, result, week)
+
+    @contextmanager
+    def period_batch(self, *, conn=None):
+        """Run the block as ONE transaction (`conn`, or a fresh one) that
+        commits the whole period or none of it. The transaction is lent out as
+        batch_conn: PeriodSession flushes write their team saves, checkpoint
+        and progress events on it, and every game recorded in the block is
+        queued, then COPY-staged and merged -- standings included -- as the
+        block exits cleanly. If the block or that final write raises, it all
+        rolls back together. SeasonRunner(period_batch=True) runs each period
+        this way.
+
+            with sink.period_batch():
+                runner.run_period(p)
+        """
+        if self._batch is not None:
+            raise RuntimeError("period_batch() is already open on this sink")
+        with transaction(self.engine, conn) as conn:
+            batch = self._batch = []
+            self.batch_conn = conn
+            try:
+                yield self
+            finally:
+                self._batch = self.batch_conn = None
+            self.record_games(batch, conn=conn)
+
+    def _queues(self, conn) -> bool:
+        """A write the open period_batch() takes over: one on no connection or
+        on the batch's own."""
+        return self._batch is not None and (conn is None or conn is self.batch_conn)
+
+    def _record(self, conn, result: GameResult, week: int | None) -> None:
+        home, away = self._team_uuids(conn, result.home_id, result.away_id)
+        players = self._player_uuids(conn, result.player_lines)
+        lines = [(players[lid], line) for lid, line in result.player_lines.items() if lid in players]
+        params = {"season": self.season, "week": week, "home": home, "away": away,
+                  "hs": result.home_score, "as_": result.away_score,
+                  "ot": result.went_to_overtime, "seed": result.seed}
+        for i, (puid, line) in enumerate(lines):
+            params.update({
+                f"p{i}": puid, f"goals{i}": line.get("goals", 0), f"shots{i}": line.get("shots", 0),
+                f"saves{i}": line.get("saves", 0), f"ga{i}": line.get("goals_allowed", 0),
+                f"perf{i}": line.get("performance"),
+            })
+        with pipeline(conn):                       # both writes in one round trip when on
+            conn.execute(_insert_game(len(lines)), params)
+            standings_repository.record_game(
+                conn, self.season, week, home, away, result.home_score, result.away_score
+            )
+
+    def _copy_games(self, conn, games: list[tuple[GameResult, int | None]]) -> None:
+        """COPY the games and their lines into temporary staging tables, then
+        move them into games/player_game_lines with one insert ... select each
+        and add them to the standings in one upsert. Game ids are drawn here so
+        the lines can be staged against them."""
+        slugs = sorted({s for result, _ in games for s in (result.home_id, result.away_id)})
+        teams = dict(zip(slugs, self._team_uuids(conn, *slugs)))
+        players = self._player_uuids(conn, {lid for result, _ in games for lid in result.player_lines})
+        game_rows, line_rows = [], []
+        for result, week in games:
+            game_id = uuid4()
+            game_rows.append((game_id, week, teams[result.home_id], teams[result.away_id],
+                              result.home_score, result.away_score, result.went_to_overtime,
+                              result.seed))
+            line_rows.extend(
+                (game_id, players[lid], line.get("goals", 0), line.get("shots", 0),
+                 line.get("saves", 0), line.get("goals_allowed", 0), line.get("performance"))
+                for lid, line in result.player_lines.items() if lid in players
+            )
+
+        conn.exec_driver_sql(_STAGING)
+        with conn.connection.driver_connection.cursor() as cur:
+            with cur.copy("copy staged_games (id, week, home_team_id, away_team_id, home_score, "
+                          "away_score, went_to_overtime, seed) from stdin") as copy:
+                for row in game_rows:
+                    copy.write_row(row)
+            with cur.copy("copy staged_game_lines (game_id, player_id, goals, shots, saves, "
+                          "goals_allowed, performance) from stdin") as copy:
+                for row in line_rows:
+                    copy.write_row(row)
+        with pipeline(conn):                       # the merge; COPY cannot be pipelined
+            conn.execute(
+                text("insert into games (id, season, week, home_team_id, away_team_id, "
+                     "home_score, away_score, went_to_overtime, seed) "
+                     "select id, :season, week, home_team_id, away_team_id, home_score, away_score, "
+                     "went_to_overtime, seed from staged_games"),
+                {"season": self.season},
+            )
+            conn.execute(
+                text("insert into player_game_lines (game_id, player_id, team_id, season, "
+                     "goals, shots, saves, goals_allowed, performance) "
+                     "select l.game_id, p.id, p.team_id, :season, l.goals, l.shots, l.saves, "
+                     "l.goals_allowed, l.performance "
+                     "from staged_game_lines l join players p on p.id = l.player_id"),
+                {"season": self.season},
+            )
+        standings_repository.record_games(conn, self.season, [row[0] for row in game_rows])
+
+    def _team_uuids(self, conn, *slugs: str) -> list:
+        missing = [s for s in slugs if s not in self._team_ids]
+        if missing:
+            self._team_ids.update(conn.execute(
+                text("select slug, id from teams where slug = any(:s)"), {"s": missing}
+            ).all())
+        for slug in slugs:
+            if slug not in self._team_ids:
+                raise KeyError(f"no team {slug!r} in database")
+        return [self._team_ids[s] for s in slugs]
+
+    def _player_uuids(self, conn, legacy_ids) -> dict:
+        """legacy_id -> players.id for every known player in `legacy_ids`; unknown
+        ones (e.g. a reference engine with no DB rows) are left out, and asked
+        for again next game."""
+        missing = [lid for lid in legacy_ids if lid not in self._player_ids]
+        if missing:
+            self._player_ids.update(conn.execute(
+                text("select legacy_id, id from players where legacy_id = any(:ids)"),
+                {"ids": missing},
+            ).all())
+        return {lid: self._player_ids[lid] for lid in legacy_ids if lid in self._player_ids}
+
+
+# Batches this large are COPY-staged: below it the staging tables and the two
+# COPYs cost more round trips than the per-game statements they replace.
+COPY_MIN_GAMES = 8
+
+# Session-private staging for _copy_games, dropped with the transaction (so it
+# also works behind a transaction-mode pooler); emptied in case an earlier
+# batch in the same transaction left rows.
+_STAGING = """
+create temp table if not exists staged_games (
+    id uuid, week int, home_team_id uuid, away_team_id uuid,
+    home_score int, away_score int, went_to_overtime boolean, seed bigint
+) on commit drop;
+create temp table if not exists staged_game_lines (
+    game_id uuid, player_id uuid, goals int, shots int, saves int,
+    goals_allowed int, performance double precision
+) on commit drop;
+truncate staged_games, staged_game_lines;
+"""
+
+_LINE_VALUES = (
+    "(cast(:p{i} as uuid), cast(:goals{i} as integer), cast(:shots{i} as integer), "
+    "cast(:saves{i} as integer), cast(:ga{i} as integer), cast(:perf{i} as double precision))"
+)
+
 
-    def record_game(self, result: GameResult, *, week: int | None = None) -> None:
-        with self.engine.begin() as conn:
-            home = self._team_uuid(conn, result.home_id)
-            away = self._team_uuid(conn, result.away_id)
-            game_id = conn.execute(
-                text(
-                    "insert into games (season, week, home_team_id, away_team_id, "
-                    "home_score, away_score, went_to_overtime) "
-                    "values (:season, :week, :home, :away, :hs, :as_, :ot) returning id"
-                ),
-                {"season": self.season, "week": week, "home": home, "away": away,
-                 "hs": result.home_score, "as_": result.away_score,
-                 "ot": result.went_to_overtime},
-            ).scalar_one()
-
-            for legacy_id, line in result.player_lines.items():
-                prow = conn.execute(
-                    text("select id, team_id from players where legacy_id = :lid"),
-                    {"lid": legacy_id},
-                ).first()
-                if prow is None:
-                    continue  # unknown player (e.g. reference engine with no DB rows)
-                conn.execute(
-                    text(
-                        "insert into player_game_lines (game_id, player_id, team_id, season, "
-                        "goals, shots, saves, goals_allowed, performance) "
-                        "values (:g, :p, :tm, :season, :goals, :shots, :saves, :ga, :perf)"
-                    ),
-                    {"g": game_id, "p": prow[0], "tm": prow[1], "season": self.season,
-                     "goals": line.get("goals", 0), "shots": line.get("shots", 0),
-                     "saves": line.get("saves", 0), "ga": line.get("goals_allowed", 0),
-                     "perf": line.get("performance")},
-                )
-
-    @staticmethod
-    def _team_uuid(conn, slug: str):
-        row = conn.execute(text("select id from teams where slug = :s"), {"s": slug}).first()
-        if row is None:
-            raise KeyError(f"no team {slug!r} in database")
-        return row[0]
+@lru_cache(maxsize=None)
+def _insert_game(n_lines: int):
+    """The games row and its `n_lines` player lines as one statement. Each
+    line's team_id is read from players inside the insert, so it is the team the
+    player is on right now -- a trade needs no cache invalidation here."""
+    game = (
+        "insert into games (season, week, home_team_id, away_team_id, "
+        "home_score, away_score, went_to_overtime, seed) "
+        "values (:season, :week, :home, :away, :hs, :as_, :ot, :seed)"
+    )
+    if not n_lines:
+        return text(game)
+    values = ", ".join(_LINE_VALUES.format(i=i) for i in range(n_lines))
+    return text(
+        f"with g as ({game} returning id) "
+        "insert into player_game_lines (game_id, player_id, team_id, season, "
+        "goals, shots, saves, goals_allowed, performance) "
+        "select g.id, p.id, p.team_id, :season, v.goals, v.shots, v.saves, v.ga, v.perf "
+        f"from g, (values {values}) as v(player_id, goals, shots, saves, ga, perf) "
+        "join players p on p.id = v.player_id"
+    )
@@ -22,14 +22,24 @@ Description: Postgres-backed TeamRepository -- the relational twin of
 
     save() persists the team's CURRENT roster. Moving a player between teams is a
     transactional concern owned by trade_service, not by save().
+
+    save() is dirty-tracked: the repository remembers each team's rows as it
+    last read or committed them and writes only the difference -- after a game,
+    just the W-L-T. A write made outside the repository (trade_service, the
+    offseason) is picked up by the next load(); a Team loaded before it and
+    saved after it writes only its own changes. Its independent writes run
+    inside db.pipeline, so with pipeline mode on they share a round trip.
 Author: relational backend
 """
 from __future__ import annotations
 
-from sqlalchemy import text
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from sqlalchemy import event, text
 from sqlalchemy.engine import Engine
 
-from handball.db import get_engine
+from handball.db import get_engine, pipeline
 from handball.domain import Team
 from handball.league_views import TeamId
 from handball.repository import SCHEMA_VERSION, RepositoryError, team_from_dict
@@ -55,6 +65,11 @@ class PostgresTeamRepository:
 
     def __init__(self, engine: Engine | None = None):
         self.engine = engine or get_engine()
+        # Each team's rows as this repository last read or committed them: the
+        # base save() diffs against. Writes inside a still-open transaction wait
+        # in _staged until it commits (dropped if it rolls back).
+        self._persisted: dict[TeamId, _Persisted] = {}
+        self._staged: dict = {}
 
     # -- reads -------------------------------------------------------------
     def load(self, team_id: TeamId) -> Team:
@@ -66,88 +81,78 @@ class PostgresTeamRepository:
             rows = conn.execute(text("select slug from teams order by slug")).all()
         return [r[0] for r in rows]
 
-    def load_all(self) -> list[Team]:
+    def load_all(self, *, conn=None) -> list[Team]:
+        """Every team, by slug, in three queries however many teams there are
+        (see _load_teams). Given `conn`, read on it (see league_snapshot)."""
+        if conn is not None:
+            return self._load_teams(conn)
+        with self.engine.connect() as conn:
+            return self._load_teams(conn)
+
+    def load_many(self, team_ids: Iterable[TeamId], *, conn=None) -> list[Team]:
+        """`team_ids`' teams in the order given, in the same three queries as
+        load_all -- e.g. one week's participants. KeyError names any unknown id."""
+        team_ids = list(team_ids)
+        if not team_ids:
+            return []
+        if conn is None:
+            with self.engine.connect() as conn:
+                return self.load_many(team_ids, conn=conn)
+        teams = {t.id: t for t in self._load_teams(conn, list(dict.fromkeys(team_ids)))}
+        missing = [t for t in team_ids if t not in teams]
+        if missing:
+            raise KeyError(f"no team(s) {missing!r} in database")
+        return [teams[t] for t in team_ids]
+
+    def records(self) -> dict[TeamId, tuple[int, int, int]]:
+        """W-L-T straight off the teams rows -- no players/injuries read."""
         with self.engine.connect() as conn:
-            ids = [r[0] for r in conn.execute(text("select slug from teams order by slug")).all()]
-            return [self._load(conn, tid) for tid in ids]
+            rows = conn.execute(text("select slug, wins, losses, ties from teams order by slug")).all()
+        return {slug: (w, l, t) for slug, w, l, t in rows}
 
     def _load(self, conn, team_id: TeamId) -> Team:
-        trow = conn.execute(
-            text("select id, slug, name, coaches, wins, losses, ties from teams where slug = :s"),
-            {"s": team_id},
-        ).mappings().first()
-        if trow is None:
+        teams = self._load_teams(conn, [team_id])
+        if not teams:
             raise KeyError(f"no team {team_id!r} in database")
+        return teams[0]
+
+    def _load_teams(self, conn, team_ids: list[TeamId] | None = None) -> list[Team]:
+        """Hydrate `team_ids` (every team when None), sorted by slug, in three
+        set-based queries -- teams, their players, those players' injuries --
+        however many teams there are. Unknown ids are skipped."""
+        sql = "select id, slug, name, coaches, wins, losses, ties from teams"
+        params: dict = {}
+        if team_ids is not None:
+            sql += " where slug = any(:slugs)"
+            params["slugs"] = list(team_ids)
+        trows = conn.execute(text(sql + " order by slug"), params).mappings().all()
+        if not trows:
+            return []
 
         prows = conn.execute(
             text(
-                "select id, legacy_id, position, slot_group, slot_position, slot_order, "
+                "select id, team_id, legacy_id, position, slot_group, slot_position, slot_order, "
                 + ", ".join(PLAYER_SCALAR_COLS)
-                + " from players where team_id = :tid "
-                "order by slot_group, slot_position, slot_order"
+                + " from players where team_id = any(:tids) "
+                "order by team_id, slot_group, slot_position, slot_order"
             ),
-            {"tid": trow["id"]},
+            {"tids": [t["id"] for t in trows]},
         ).mappings().all()
+        by_team: dict = {}
+        for p in prows:
+            by_team.setdefault(p["team_id"], []).append(p)
 
-        uuids = [p["id"] for p in prows]
         injuries = self._child_map(conn, "injuries",
                                    "year, injury_type, duration, games_remaining, is_current",
-                                   uuids)
-        # awards are league-assigned data (written by the offseason), NOT part of the
-        # roster snapshot -- they're read by the frontend straight from the awards
-        # table. Keeping them off the domain object means a roster save() can't wipe
-        # them (see _replace_children).
-
-        # Build the team_from_dict-shaped snapshot, reusing the existing
-        # Player/InjuryReport reconstruction + validate-on-load.
-        players_dict: dict = {}
-        starters: dict[str, list[str]] = {}
-        bench: dict[str, list[str]] = {}
-        reserves: list[tuple[int, str]] = []
-        for p in prows:
-            pid = p["legacy_id"]
-            inj_rows = injuries.get(p["id"], [])
-            injuries_list = [
-                [r["year"], r["injury_type"], r["duration"], r["games_remaining"], r["is_current"]]
-                for r in inj_rows
-            ]
-            players_dict[pid] = {
-                "id": pid,
-                **{c: p[c] for c in PLAYER_SCALAR_COLS},
-                "injury_log": {
-                    "active_injury": any(r["is_current"] for r in inj_rows),
-                    "injuries": injuries_list,
-                },
-                "awards_won": [],  # decoupled from the repo; see awards note above
-                # current_season_log intentionally omitted -> Player default (empty)
-            }
-            group = p["slot_group"]
-            if group == "starters":
-                starters.setdefault(p["slot_position"], []).append(pid)
-            elif group == "bench":
-                bench.setdefault(p["slot_position"], []).append(pid)
-            elif group == "reserves":
-                reserves.append((p["slot_order"], pid))
-
-        snapshot = {
-            "schema_version": SCHEMA_VERSION,
-            "id": trow["slug"],
-            "name": trow["name"],
-            "coaches": list(trow["coaches"]),
-            "record": [trow["wins"], trow["losses"], trow["ties"]],
-            "arrangement": {
-                "starters": starters,
-                "bench": bench,
-                "reserves": [pid for _, pid in sorted(reserves)],
-            },
-            "players": players_dict,
-        }
-        try:
-            return team_from_dict(snapshot)
-        except RepositoryError:
-            raise
-        except Exception as e:  # pragma: no cover - defensive
-            raise RepositoryError(f"team {team_id!r}: failed to assemble from rows: {e}") from e
+                                   [p["id"] for p in prows])
+        teams = []
+        for t in trows:
+            rows = by_team.get(t["id"], [])
+            team = _assemble(t, rows, injuries)
+            self._persisted[team.id] = _Persisted.of(
+                team, t["id"], {p["legacy_id"]: p["id"] for p in rows})
+            teams.append(team)
+        return teams
 
     @staticmethod
     def _child_map(conn, table: str, cols: str, player_uuids: list) -> dict:
@@ -165,83 +170,250 @@ class PostgresTeamRepository:
         return out
 
     # -- writes ------------------------------------------------------------
-    def save(self, team: Team) -> None:
+    def save(self, team: Team, *, conn=None) -> None:
+        """Write what changed in the team since this repository last read or
+        wrote it (see _save). Given `conn`, write inside that open transaction
+        (see period_session.PeriodSession.flush); otherwise in a transaction of
+        its own."""
+        if conn is not None:
+            self._save(conn, team)
+            return
         with self.engine.begin() as conn:
-            tid = conn.execute(
-                text(
-                    "insert into teams (slug, name, coaches, wins, losses, ties) "
-                    "values (:slug, :name, :coaches, :w, :l, :t) "
-                    "on conflict (slug) do update set "
-                    "name = excluded.name, coaches = excluded.coaches, "
-                    "wins = excluded.wins, losses = excluded.losses, ties = excluded.ties "
-                    "returning id"
-                ),
-                {"slug": team.id, "name": team.name, "coaches": list(team.coaches),
-                 "w": team.record[0], "l": team.record[1], "t": team.record[2]},
-            ).scalar_one()
-
-            # Clear this team's slots first so per-row slot upserts can't collide
-            # on the (team_id, slot_group, slot_position, slot_order) unique index
-            # while players are being reordered. NULL slots are mutually distinct.
-            conn.execute(
-                text("update players set slot_group = null, slot_position = null, "
-                     "slot_order = null where team_id = :tid"),
-                {"tid": tid},
-            )
-
-            for slot_group, slot_position, slot_order, player in _iter_slots(team):
-                puid = self._upsert_player(conn, tid, slot_group, slot_position, slot_order, player)
-                self._replace_children(conn, puid, player)
-
-    def _upsert_player(self, conn, tid, slot_group, slot_position, slot_order, player) -> object:
-        cols = ["legacy_id", "team_id", "slot_group", "slot_position", "slot_order",
-                *PLAYER_SCALAR_COLS, "updated_at"]
-        params = {
-            "legacy_id": player.id,
-            "team_id": tid,
-            "slot_group": slot_group,
-            "slot_position": slot_position,
-            "slot_order": slot_order,
-            **{c: getattr(player, c) for c in PLAYER_SCALAR_COLS},
-        }
+            self._save(conn, team)
+
+    def _save(self, conn, team: Team) -> None:
+        """Dirty-tracked save. Against the last known rows (_Persisted) only the
+        changed parts are written: the W-L-T, the players whose slot or columns
+        changed (one executemany upsert), the injury logs that changed. After
+        a game, where only the record moves, that is one UPDATE. A team this
+        repository has not seen is written in full, in six statements."""
+        before = self._known(conn, team.id)
+        after = _Persisted.of(team, None, {})
+        players = after.players
+
+        if before is not None and after.team != before.team:
+            if after.team[:2] != before.team[:2]:
+                conn.execute(_UPSERT_TEAM, _team_params(team))
+            elif conn.execute(                              # only the record moved
+                text("update teams set wins = :w, losses = :l, ties = :t where id = :id"),
+                {"id": before.uuid, "w": team.record[0], "l": team.record[1], "t": team.record[2]},
+            ).rowcount == 0:
+                before = None                              # the row is gone: write it anew
+
+        clear = None
+        if before is None:
+            tid = conn.execute(_UPSERT_TEAM, _team_params(team)).scalar_one()
+            # Clear this team's slots first so the slot upserts can't collide
+            # on the (team_id, slot_group, slot_position, slot_order) unique
+            # index while players are being reordered. NULL slots are distinct.
+            clear = (text("update players set slot_group = null, slot_position = null, "
+                          "slot_order = null where team_id = :tid"),
+                     {"tid": tid})
+            upsert, injured, uuids = list(players), list(players), {}
+        else:
+            tid, uuids = before.uuid, dict(before.uuids)
+            upsert = [pid for pid, st in players.items()
+                      if pid not in before.players or st[:2] != before.players[pid][:2]]
+            injured = [pid for pid, st in players.items()
+                       if pid not in before.players or st[2] != before.players[pid][2]]
+            # slots about to move (or be vacated by players who left) are cleared
+            # first, for the same unique-index reason as the full write above
+            moving = [uuids[pid] for pid in before.players
+                      if pid not in players or (pid in upsert and players[pid][0] != before.players[pid][0])]
+            if moving:
+                clear = (text("update players set slot_group = null, slot_position = null, "
+                              "slot_order = null where id = any(:ids)"),
+                         {"ids": moving})
+
+        roster = {p.id: p for p in team.roster()}
+        with pipeline(conn):                       # the clear and the upserts, unanswered
+            if clear is not None:
+                conn.execute(*clear)
+            if upsert:
+                conn.execute(_UPSERT_PLAYER, [
+                    {"legacy_id": pid, "team_id": tid,
+                     **dict(zip(("slot_group", "slot_position", "slot_order"), players[pid][0])),
+                     **{c: getattr(roster[pid], c) for c in PLAYER_SCALAR_COLS}}
+                    for pid in upsert
+                ])
+        unknown = [pid for pid in players if pid not in uuids]
+        if unknown:
+            uuids.update(conn.execute(
+                text("select legacy_id, id from players where legacy_id = any(:ids)"),
+                {"ids": unknown},
+            ).all())
+        if injured:
+            self._replace_injuries(conn, [(uuids[pid], roster[pid]) for pid in injured])
 
-        def placeholder(c: str) -> str:
-            if c == "updated_at":
-                return "now()"
-            if c == "team_id":
-                return "cast(:team_id as uuid)"
-            if c == "slot_group":
-                return "cast(:slot_group as roster_group)"
-            if c in ("position", "slot_position"):
-                return f"cast(:{c} as player_position)"
-            return f":{c}"
-
-        insert_cols = ", ".join(cols)
-        insert_vals = ", ".join(placeholder(c) for c in cols)
-        update_set = ", ".join(
-            f"{c} = excluded.{c}" for c in cols if c != "legacy_id"
-        )
-        sql = (
-            f"insert into players ({insert_cols}) values ({insert_vals}) "
-            f"on conflict (legacy_id) do update set {update_set} returning id"
-        )
-        return conn.execute(text(sql), params).scalar_one()
+        after.uuid, after.uuids = tid, {pid: uuids[pid] for pid in players}
+        self._stage(conn, team.id, after)
 
     @staticmethod
-    def _replace_children(conn, puid, player) -> None:
+    def _replace_injuries(conn, players) -> None:
         # Injuries belong to the roster snapshot and round-trip through save(); awards
         # do NOT -- they're league-assigned and managed by the offseason, so a routine
         # roster save() must not touch (and wipe) them.
-        conn.execute(text("delete from injuries where player_id = :p"), {"p": puid})
-        for ord_, rec in enumerate(player.injury_log.injuries):
-            year, itype, duration, remaining, current = rec
-            conn.execute(
-                text("insert into injuries (player_id, year, injury_type, duration, "
-                     "games_remaining, is_current, ord) "
-                     "values (:p, :y, :it, :d, :gr, :cur, :o)"),
-                {"p": puid, "y": year, "it": itype, "d": duration, "gr": remaining,
-                 "cur": bool(current), "o": ord_},
-            )
+        rows = [
+            {"p": puid, "y": year, "it": itype, "d": duration, "gr": remaining,
+             "cur": bool(current), "o": ord_}
+            for puid, player in players
+            for ord_, (year, itype, duration, remaining, current) in enumerate(player.injury_log.injuries)
+        ]
+        with pipeline(conn):
+            conn.execute(text("delete from injuries where player_id = any(:ids)"),
+                         {"ids": [puid for puid, _ in players]})
+            if rows:
+                conn.execute(
+                    text("insert into injuries (player_id, year, injury_type, duration, "
+                         "games_remaining, is_current, ord) "
+                         "values (:p, :y, :it, :d, :gr, :cur, :o)"),
+                    rows,
+                )
+
+    # -- dirty-tracking base -----------------------------------------------
+    def _known(self, conn, team_id: TeamId) -> "_Persisted | None":
+        staged = self._staged.get(conn, {})
+        return staged.get(team_id) or self._persisted.get(team_id)
+
+    def _stage(self, conn, team_id: TeamId, persisted: "_Persisted") -> None:
+        """Hold `persisted` until `conn`'s transaction ends: on commit it becomes
+        the team's diff base, on rollback it is dropped (the rows never changed)."""
+        staged = self._staged.get(conn)
+        if staged is None:
+            staged = self._staged[conn] = {}
+            event.listen(conn, "commit", self._committed, once=True)
+            event.listen(conn, "rollback", self._rolled_back, once=True)
+        staged[team_id] = persisted
+
+    def _committed(self, conn) -> None:
+        self._persisted.update(self._staged.pop(conn, {}))
+
+    def _rolled_back(self, conn) -> None:
+        self._staged.pop(conn, None)
+
+
+_UPSERT_TEAM = text(
+    "insert into teams (slug, name, coaches, wins, losses, ties) "
+    "values (:slug, :name, :coaches, :w, :l, :t) "
+    "on conflict (slug) do update set "
+    "name = excluded.name, coaches = excluded.coaches, "
+    "wins = excluded.wins, losses = excluded.losses, ties = excluded.ties "
+    "returning id"
+)
+
+
+def _team_params(team: Team) -> dict:
+    return {"slug": team.id, "name": team.name, "coaches": list(team.coaches),
+            "w": team.record[0], "l": team.record[1], "t": team.record[2]}
+
+
+def _player_upsert_sql() -> str:
+    cols = ["legacy_id", "team_id", "slot_group", "slot_position", "slot_order",
+            *PLAYER_SCALAR_COLS, "updated_at"]
+
+    def placeholder(c: str) -> str:
+        if c == "updated_at":
+            return "now()"
+        if c == "team_id":
+            return "cast(:team_id as uuid)"
+        if c == "slot_group":
+            return "cast(:slot_group as roster_group)"
+        if c in ("position", "slot_position"):
+            return f"cast(:{c} as player_position)"
+        return f":{c}"
+
+    insert_cols = ", ".join(cols)
+    insert_vals = ", ".join(placeholder(c) for c in cols)
+    update_set = ", ".join(f"{c} = excluded.{c}" for c in cols if c != "legacy_id")
+    return (f"insert into players ({insert_cols}) values ({insert_vals}) "
+            f"on conflict (legacy_id) do update set {update_set}")
+
+
+# Built once; save() runs it as one executemany over the changed players.
+_UPSERT_PLAYER = text(_player_upsert_sql())
+
+
+@dataclass
+class _Persisted:
+    """A team's stored rows as comparable values: `team` is (name, coaches,
+    record); `players` maps each rostered player to (slot, columns, injuries).
+    `uuid`/`uuids` are the teams/players row ids."""
+
+    uuid: object
+    team: tuple
+    players: dict
+    uuids: dict = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, team: Team, uuid, uuids: dict) -> "_Persisted":
+        players = {
+            p.id: ((group, position, order),
+                   tuple(getattr(p, c) for c in PLAYER_SCALAR_COLS),
+                   tuple(tuple(rec) for rec in p.injury_log.injuries))
+            for group, position, order, p in _iter_slots(team)
+        }
+        return cls(uuid, (team.name, tuple(team.coaches), tuple(team.record)), players, uuids)
+
+
+def _assemble(trow, prows, injuries: dict) -> Team:
+    """Build one Team from its teams row, its players rows (slot order) and the
+    injuries map (player uuid -> rows), through team_from_dict so every load
+    path validates the same way."""
+    # awards are league-assigned data (written by the offseason), NOT part of the
+    # roster snapshot -- they're read by the frontend straight from the awards
+    # table. Keeping them off the domain object means a roster save() can't wipe
+    # them (see _replace_children).
+
+    # Build the team_from_dict-shaped snapshot, reusing the existing
+    # Player/InjuryReport reconstruction + validate-on-load.
+    players_dict: dict = {}
+    starters: dict[str, list[str]] = {}
+    bench: dict[str, list[str]] = {}
+    reserves: list[tuple[int, str]] = []
+    for p in prows:
+        pid = p["legacy_id"]
+        inj_rows = injuries.get(p["id"], [])
+        injuries_list = [
+            [r["year"], r["injury_type"], r["duration"], r["games_remaining"], r["is_current"]]
+            for r in inj_rows
+        ]
+        players_dict[pid] = {
+            "id": pid,
+            **{c: p[c] for c in PLAYER_SCALAR_COLS},
+            "injury_log": {
+                "active_injury": any(r["is_current"] for r in inj_rows),
+                "injuries": injuries_list,
+            },
+            "awards_won": [],  # decoupled from the repo; see awards note above
+            # current_season_log intentionally omitted -> Player default (empty)
+        }
+        group = p["slot_group"]
+        if group == "starters":
+            starters.setdefault(p["slot_position"], []).append(pid)
+        elif group == "bench":
+            bench.setdefault(p["slot_position"], []).append(pid)
+        elif group == "reserves":
+            reserves.append((p["slot_order"], pid))
+
+    snapshot = {
+        "schema_version": SCHEMA_VERSION,
+        "id": trow["slug"],
+        "name": trow["name"],
+        "coaches": list(trow["coaches"]),
+        "record": [trow["wins"], trow["losses"], trow["ties"]],
+        "arrangement": {
+            "starters": starters,
+            "bench": bench,
+            "reserves": [pid for _, pid in sorted(reserves)],
+        },
+        "players": players_dict,
+    }
+    try:
+        return team_from_dict(snapshot)
+    except RepositoryError:
+        raise
+    except Exception as e:  # pragma: no cover - defensive
+        raise RepositoryError(f"team {trow['slug']!r}: failed to assemble from rows: {e}") from e
 
 
 def _iter_slots(team: Team):
@@ -0,0 +1,148 @@
+"""
+Name: possession_chain.py
+Description: Exact outcome tables for the possession loop, treated as an
+    absorbing Markov chain over a discretised ball_position grid.
+
+    Between two "events" a possession is a walk: at position x the offense
+    shoots with odds_of_taking_shot(x), otherwise passes; a completed pass moves
+    the ball to min(40, x + N(4, 1.5)), a failed one is a turnover. The walk is
+    absorbed by the first shot or failed pass. On a grid of GRID_STEP metres the
+    pass move is a fixed matrix P, so with ratio r the chance of completing k
+    passes from bin i and then standing at bin j is
+
+        r^k * (A^k)[i, j],    A = diag(1 - shot_odds) @ P,
+
+    and the segment ends there with a shot (shot_odds[j]) or a failed pass
+    ((1 - shot_odds[j]) * (1 - r)). Elapsed clock is 2k + TIME_PER_SHOT or
+    2k + TIME_PER_PASS. A PossessionTable lays all (k, end bin, ending) outcomes
+    out as one CDF per start bin, so a whole segment is one uniform draw.
+
+    A^k does not depend on either team and is computed once per process. The
+    ratio-dependent tables sit on a RATIO_STEP grid: init_stats draws a fresh
+    ratio for each side every game, which possession_table() rounds
+    stochastically (unbiased, so the expected ratio is unchanged) to one of the
+    two nearest grid points. Every game of a period -- and of the season --
+    therefore reuses the same few dozen tables; each is built once per process.
+Author: Oliver Hvidsten (oliverhvidsten@gmail.com)
+"""
+import math
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+
+import numpy as np
+
+from handball.simulation_vars import TIME_PER_PASS, TIME_PER_SHOT
+
+GRID_STEP = 0.5
+GRID = np.arange(0, 40 + GRID_STEP / 2, GRID_STEP)   # bin centres 0.0 .. 40.0
+N_BINS = len(GRID)
+_GRID_POSITIONS = GRID.tolist()
+
+# Paths with less probability mass than this are dropped from the tables.
+TAIL_MASS = 1e-12
+# Tables exist for ratios on this grid (see possession_table).
+RATIO_STEP = 0.01
+
+SHOT, FAILED_PASS = 0, 1
+
+
+def snap(ball_position):
+    """Index of the grid bin nearest to a (continuous) ball position."""
+    return min(N_BINS - 1, max(0, int(ball_position / GRID_STEP + 0.5)))
+
+
+def _normal_cdf(z):
+    return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+
+@lru_cache(maxsize=1)
+def _chain_powers():
+    """(shot_odds per bin, A^k stacked for k = 0..max_passes). Team-independent."""
+    shot_odds = 1 / (1 + np.exp(-0.3 * (GRID - 34)))
+
+    # P[i, j]: a completed pass from bin i lands in bin j. Landing beyond 40 is
+    # capped at 40 (the last bin), a (rare) backwards pass below 0 at 0.
+    edges = np.concatenate(([-np.inf], GRID[:-1] + GRID_STEP / 2, [np.inf]))
+    cdf = np.vectorize(_normal_cdf)((edges[None, :] - GRID[:, None] - 4) / 1.5)
+    P = np.diff(cdf, axis=1)
+
+    A = (1 - shot_odds)[:, None] * P
+    powers = [np.eye(N_BINS)]
+    while powers[-1].sum(axis=1).max() >= TAIL_MASS:
+        powers.append(powers[-1] @ A)
+    return shot_odds, np.stack(powers)
+
+
+def max_passes():
+    """Longest pass run a table covers. Clock time for it is the chain's
+    horizon: with less than 2 * max_passes() seconds left the clock could expire
+    mid-segment, so callers must fall back to the per-pass loop."""
+    return len(_chain_powers()[1]) - 1
+
+
+class PossessionTable:
+    """Segment outcome distribution for one pass-completion ratio."""
+
+    def __init__(self, ratio):
+        self.ratio = float(ratio)
+        shot_odds, powers = _chain_powers()
+        n_k = len(powers)
+
+        walk = powers * (self.ratio ** np.arange(n_k))[:, None, None]     # [k, i, j]
+        ending = np.stack([shot_odds, (1 - shot_odds) * (1 - self.ratio)], axis=-1)
+        mass = walk[..., None] * ending                                   # [k, i, j, end]
+
+        # One CDF per start bin over the flattened (k, j, end) outcomes, kept
+        # as flat C doubles that bisect reads directly (a possession is only a
+        # couple of segments long, so per-draw numpy dispatch would dominate)
+        # and only over the outcomes a row can actually reach.
+        flat = mass.transpose(1, 0, 2, 3).reshape(N_BINS, -1)
+        flat /= flat.sum(axis=1, keepdims=True)
+        outcomes = _outcomes(n_k)
+        self.rows = []
+        for row in flat:
+            reachable = np.flatnonzero(row >= TAIL_MASS)
+            cdf = np.cumsum(row[reachable])
+            cdf /= cdf[-1]
+            cdf[-1] = 1.0
+            self.rows.append((array("d", cdf.tolist()), [outcomes[o] for o in reachable.tolist()]))
+
+    def sample(self, start_bin, u):
+        """Map a uniform draw to (completed passes, end position, SHOT|FAILED_PASS)."""
+        cdf, outcomes = self.rows[start_bin]
+        return outcomes[bisect_right(cdf, u)][:3]
+
+    def draw(self, ball_position, u):
+        """sample() from the bin nearest `ball_position` (snap, inlined), with the
+        segment's elapsed() time appended."""
+        cdf, outcomes = self.rows[min(N_BINS - 1, max(0, int(ball_position / GRID_STEP + 0.5)))]
+        return outcomes[bisect_right(cdf, u)]
+
+    @staticmethod
+    def elapsed(passes, ending):
+        """Clock time a sampled segment consumes."""
+        return TIME_PER_PASS * passes + (TIME_PER_SHOT if ending == SHOT else TIME_PER_PASS)
+
+
+@lru_cache(maxsize=1)
+def _outcomes(n_k):
+    """(passes, end position, ending, elapsed) for each flattened (k, j, end) index."""
+    return [(k, _GRID_POSITIONS[j], end, PossessionTable.elapsed(k, end))
+            for k in range(n_k) for j in range(N_BINS) for end in (SHOT, FAILED_PASS)]
+
+
+def possession_table(ratio, u):
+    """The table for `ratio` rounded to the RATIO_STEP grid: up with probability
+    equal to the fractional part (`u` is a uniform draw), else down."""
+    steps = ratio / RATIO_STEP
+    i = math.floor(steps)
+    if u < steps - i:
+        i += 1
+    return _grid_table(i)
+
+
+@lru_cache(maxsize=None)
+def _grid_table(i):
+    """One table per grid point; at most 1 / RATIO_STEP + 1 of them."""
+    return PossessionTable(i * RATIO_STEP)
@@ -19,8 +19,8 @@ Description: The draft and playoff phases of OperationsHandler, ported onto the
 
     Ranking is injected (a best->worst list of team ids), not computed here: the
     orchestrator already owns standings, and richer tiebreakers (goal
-    differential) belong with the record sink. Keeping ranking out makes both
-    services pure functions of their inputs.
+    differential) live in the record sink's team_season_standings. Keeping
+    ranking out makes both services pure functions of their inputs.
 Author: design sketch
 """
 from __future__ import annotations
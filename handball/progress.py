@@ -0,0 +1,203 @@
+"""
+Name: progress.py
+Description: Live progress of a period run. SeasonRunner and the sim_jobs
+    workers publish a ProgressEvent as each game finishes, each week commits,
+    the period's injuries are processed and the period completes; anything
+    that wants to watch (the API's /periods/progress stream) subscribes.
+
+    ProgressBus is the in-process pub/sub: publish() fans an event out to every
+    Subscription's bounded queue and never blocks -- a subscriber that falls
+    behind loses its oldest events rather than slowing the simulation down.
+
+    PostgresProgressBus is the same bus across processes and machines:
+    publish() is a pg_notify on one channel and a listener thread (started with
+    the first subscription) LISTENs on it and delivers to the local
+    subscribers. Given `conn`, the notify rides the caller's transaction, so
+    Postgres delivers it only if that transaction commits -- a worker's "game
+    finished" is never heard for a game that rolled back.
+Author: season-run wiring
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Protocol
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from handball.league_views import TeamId
+
+# ProgressEvent.kind
+GAME_FINISHED = "game"
+WEEK_COMMITTED = "week"
+INJURIES_PROCESSED = "injuries"
+PERIOD_DONE = "period"
+
+CHANNEL = "sim_progress"
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    kind: str
+    season: int
+    period: int | None = None
+    week: int | None = None
+    home: TeamId | None = None          # GAME_FINISHED only
+    away: TeamId | None = None
+    home_score: int | None = None
+    away_score: int | None = None
+    at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ProgressEvent":
+        return cls(**json.loads(payload))
+
+
+class ProgressPublisher(Protocol):
+    def publish(self, event: ProgressEvent, *, conn=None) -> None: ...
+
+
+class Subscription:
+    """One subscriber's view of a ProgressBus. Close it (or use it as a context
+    manager) when done, or the bus keeps filling its queue."""
+
+    def __init__(self, bus: "ProgressBus", maxsize: int) -> None:
+        self._bus = bus
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def get(self, timeout: float | None = None) -> ProgressEvent | None:
+        """The next event, or None if none arrives within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def _offer(self, event: ProgressEvent) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()  # drop the oldest
+                except queue.Empty:
+                    pass
+
+
+class ProgressBus:
+    """In-process pub/sub for ProgressEvents."""
+
+    def __init__(self, *, maxsize: int = 1000) -> None:
+        self.maxsize = maxsize
+        self._subscribers: list[Subscription] = []
+        self._lock = threading.Lock()
+
+    def publish(self, event: ProgressEvent, *, conn=None) -> None:
+        """Deliver `event` to every current subscriber. `conn` is accepted for
+        the ProgressPublisher protocol and ignored: nothing here is transactional."""
+        self._deliver(event)
+
+    def subscribe(self) -> Subscription:
+        sub = Subscription(self, self.maxsize)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _deliver(self, event: ProgressEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub._offer(event)
+
+
+class PostgresProgressBus(ProgressBus):
+    """ProgressBus over Postgres LISTEN/NOTIFY on `channel`. Local subscribers
+    hear every process's events, this one's included (through the listener,
+    so nothing is delivered twice)."""
+
+    def __init__(self, engine: Engine, *, channel: str = CHANNEL, maxsize: int = 1000) -> None:
+        super().__init__(maxsize=maxsize)
+        self.engine = engine
+        self.channel = channel
+        self._listener: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def publish(self, event: ProgressEvent, *, conn=None) -> None:
+        """NOTIFY `event`; given `conn`, as part of its open transaction."""
+        if conn is not None:
+            self._notify(conn, event)
+            return
+        with self.engine.begin() as conn:
+            self._notify(conn, event)
+
+    def _notify(self, conn, event: ProgressEvent) -> None:
+        conn.execute(text("select pg_notify(:c, :p)"), {"c": self.channel, "p": event.to_json()})
+
+    def subscribe(self) -> Subscription:
+        sub = super().subscribe()
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name="PostgresProgressBus", daemon=True)
+                self._listener.start()
+        return sub
+
+    def close(self) -> None:
+        """Stop the listener thread (it exits within a second)."""
+        self._stop.set()
+
+    def _listen(self) -> None:
+        """LISTEN and hand each notification to the local subscribers; reconnect
+        (after a pause) if the connection drops."""
+        while not self._stop.is_set():
+            try:
+                raw = self.engine.raw_connection()
+                try:
+                    pg = raw.driver_connection
+                    pg.autocommit = True
+                    pg.execute(f'listen "{self.channel}"')
+                    while not self._stop.is_set():
+                        for note in pg.notifies(timeout=1.0):
+                            self._deliver(ProgressEvent.from_json(note.payload))
+                finally:
+                    raw.invalidate()  # the LISTEN must not go back into the pool
+            except Exception:  # noqa: BLE001 - a watcher must outlive a DB blip
+                self._stop.wait(5.0)
+
+
+class GameRate:
+    """Games per second over the last `window` seconds of GAME_FINISHED events."""
+
+    def __init__(self, window: float = 10.0) -> None:
+        self.window = window
+        self._times: deque[float] = deque()
+
+    def add(self, at: float) -> float:
+        """Count a game finished at `at`; returns the current rate."""
+        self._times.append(at)
+        while self._times[0] < at - self.window:
+            self._times.popleft()
+        span = at - self._times[0]
+        return (len(self._times) - 1) / span if span > 0 else 0.0
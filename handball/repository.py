@@ -14,14 +14,19 @@ Description: Persistence layer for the domain model -- the SINGLE source of trut
     InMemoryTeamRepository is the offline/test twin. JsonTeamRepository is the
     file-backed implementation. Neither imports anything sheet- or google-
     related.
+
+    records() is the cheap read behind standings: every team's W-L-T without
+    hydrating a single Team (a dict scan in memory, a manifest read for JSON,
+    one small query for Postgres).
 Author: design sketch
 """
 from __future__ import annotations
 
+import copy
 import json
 from dataclasses import asdict
 from pathlib import Path
-from typing import Protocol, runtime_checkable
+from typing import Iterable, Protocol, runtime_checkable
 
 from handball.domain import Player, Team, validate
 from handball.league_views import PlayerId, TeamArrangement, TeamId
@@ -40,6 +45,8 @@ class TeamRepository(Protocol):
     def save(self, team: Team) -> None: ...
     def all_team_ids(self) -> list[TeamId]: ...
     def load_all(self) -> list[Team]: ...
+    def load_many(self, team_ids: Iterable[TeamId]) -> list[Team]: ...
+    def records(self) -> dict[TeamId, tuple[int, int, int]]: ...
 
 
 # ---------------------------------------------------------------------------
@@ -145,13 +152,34 @@ class InMemoryTeamRepository:
     def load_all(self) -> list[Team]:
         return [self.load(t) for t in self.all_team_ids()]
 
+    def load_many(self, team_ids: Iterable[TeamId]) -> list[Team]:
+        return [self.load(t) for t in team_ids]
+
+    def records(self) -> dict[TeamId, tuple[int, int, int]]:
+        return {tid: tuple(self._store[tid]["record"]) for tid in self.all_team_ids()}
+
+    def copy(self) -> "InMemoryTeamRepository":
+        """An independent repository holding the same snapshots -- no team is
+        re-serialized, and saves to either never show in the other."""
+        clone = InMemoryTeamRepository()
+        clone._store = copy.deepcopy(self._store)
+        return clone
+
 
 # ---------------------------------------------------------------------------
 # File-backed implementation.
 # ---------------------------------------------------------------------------
 class JsonTeamRepository:
     """One JSON file per team under `datafiles_dir`. Self-contained: no sheet
-    access needed to load a team."""
+    access needed to load a team.
+
+    Alongside the team files, save() keeps a records manifest (team file ->
+    id, record and the file's mtime) so records() can answer from one small
+    file. An entry whose mtime no longer matches (a file written by something
+    else, or a crash between the two writes) is read from its team file
+    instead; records() never writes, only save() updates the manifest."""
+
+    MANIFEST = "records.manifest"
 
     def __init__(self, datafiles_dir: Path | str):
         self.dir = Path(datafiles_dir)
@@ -173,6 +201,9 @@ class JsonTeamRepository:
         # never leaves a half-written team file.
         tmp.write_text(json.dumps(team_to_dict(team), indent=2))
         tmp.replace(path)
+        manifest = self._read_manifest()
+        manifest[path.name] = self._manifest_entry(path, team.id, team.record)
+        self._write_manifest(manifest)
 
     def load(self, team_id: TeamId) -> Team:
         path = self._path(team_id)
@@ -188,3 +219,34 @@ class JsonTeamRepository:
 
     def load_all(self) -> list[Team]:
         return [self.load(t) for t in self.all_team_ids()]
+
+    def load_many(self, team_ids: Iterable[TeamId]) -> list[Team]:
+        return [self.load(t) for t in team_ids]
+
+    def records(self) -> dict[TeamId, tuple[int, int, int]]:
+        manifest = self._read_manifest()
+        out: dict = {}
+        for path in self.dir.glob("*.json"):
+            entry = manifest.get(path.name)
+            if entry is None or entry["mtime_ns"] != path.stat().st_mtime_ns:
+                d = json.loads(path.read_text())
+                entry = {"id": d["id"], "record": d["record"]}
+            out[entry["id"]] = tuple(entry["record"])
+        return dict(sorted(out.items()))
+
+    @staticmethod
+    def _manifest_entry(path: Path, team_id: TeamId, record) -> dict:
+        return {"id": team_id, "record": list(record), "mtime_ns": path.stat().st_mtime_ns}
+
+    def _read_manifest(self) -> dict:
+        path = self.dir / self.MANIFEST
+        try:
+            return json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}  # records() falls back to the team files
+
+    def _write_manifest(self, manifest: dict) -> None:
+        path = self.dir / self.MANIFEST
+        tmp = path.with_suffix(".manifest.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        tmp.replace(path)
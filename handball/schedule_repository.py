@@ -6,7 +6,9 @@ Description: Persistence for the fixture list and the season-run cursor -- the
 
     Two concerns, both keyed by season year:
       - the schedule  (schedule_games rows)  <-> a season.Schedule value object
-      - the run cursor (season_state row)    -- periods_run + reproducibility seeds
+      - the run cursor (season_state row)    -- periods_run + reproducibility seeds,
+                                                plus the in-period checkpoint
+                                                (PostgresCheckpointStore)
 
     Team identity: domain TeamId == teams.slug (see pg_repository). The OR-Tools
     ScheduleGenerator keys matchups by the same team names, so its team1/team2 ARE
@@ -16,10 +18,12 @@ Author: season-run wiring
 """
 from __future__ import annotations
 
+import json
+
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
-from handball.season import Schedule
+from handball.season import Checkpoint, Schedule
 
 
 class ScheduleError(RuntimeError):
@@ -80,21 +84,24 @@ def save_schedule(engine: Engine, season: int, generator_dict: dict) -> int:
     return len(rows)
 
 
-def load_schedule(engine: Engine, season: int) -> Schedule:
+def load_schedule(engine: Engine, season: int, *, conn=None) -> Schedule:
     """Rebuild a season.Schedule from the persisted fixtures for `season`. Weeks are
-    1-indexed and contiguous in schedule_games; gaps would surface as empty weeks."""
-    with engine.connect() as conn:
-        rows = conn.execute(
-            text(
-                "select sg.week, th.slug as home, ta.slug as away "
-                "from schedule_games sg "
-                "join teams th on th.id = sg.home_team_id "
-                "join teams ta on ta.id = sg.away_team_id "
-                "where sg.season = :s "
-                "order by sg.week"
-            ),
-            {"s": season},
-        ).mappings().all()
+    1-indexed and contiguous in schedule_games; gaps would surface as empty weeks.
+    Given `conn`, read on that connection (see league_snapshot)."""
+    if conn is None:
+        with engine.connect() as conn:
+            return load_schedule(engine, season, conn=conn)
+    rows = conn.execute(
+        text(
+            "select sg.week, th.slug as home, ta.slug as away "
+            "from schedule_games sg "
+            "join teams th on th.id = sg.home_team_id "
+            "join teams ta on ta.id = sg.away_team_id "
+            "where sg.season = :s "
+            "order by sg.week"
+        ),
+        {"s": season},
+    ).mappings().all()
 
     if not rows:
         raise ScheduleError(f"no persisted schedule for season {season}")
@@ -113,7 +120,7 @@ def get_season_state(engine: Engine, season: int) -> dict | None:
         row = conn.execute(
             text(
                 "select season, periods_run, schedule_seed, injury_seed, "
-                "schedule_generated, run_status, run_period, run_error, "
+                "schedule_generated, run_status, run_period, run_error, checkpoint_week, "
                 "extract(epoch from (now() - updated_at))::int as run_age_seconds "
                 "from season_state where season = :s"
             ),
@@ -197,15 +204,70 @@ def bump_periods_run(engine: Engine, season: int) -> int:
     return int(row[0])
 
 
+def finish_period(conn, season: int, period: int) -> None:
+    """A queued period's last job: advance the cursor past `period` and mark the
+    run done, inside the job's transaction (see worker)."""
+    conn.execute(
+        text(
+            "update season_state set periods_run = periods_run + 1, run_status = 'done', "
+            "run_period = :p, run_error = null, updated_at = now() where season = :s"
+        ),
+        {"s": season, "p": period},
+    )
+
+
+class PostgresCheckpointStore:
+    """season.CheckpointStore over season_state.checkpoint_week/injury_rng_state.
+    A season without a season_state row reads as the empty Checkpoint, and saving
+    to it is a no-op."""
+
+    def __init__(self, engine: Engine, season: int):
+        self.engine = engine
+        self.season = season
+
+    def load(self) -> Checkpoint:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text("select checkpoint_week, injury_rng_state from season_state where season = :s"),
+                {"s": self.season},
+            ).first()
+        if row is None:
+            return Checkpoint()
+        return Checkpoint(row[0] or 0, row[1])
+
+    def save(self, checkpoint: Checkpoint, *, conn=None) -> None:
+        """Record the checkpoint; given `conn`, inside that open transaction (the
+        week's PeriodSession flush), so it commits with the week's games."""
+        if conn is None:
+            with self.engine.begin() as conn:
+                self._save(conn, checkpoint)
+        else:
+            self._save(conn, checkpoint)
+
+    def _save(self, conn, checkpoint: Checkpoint) -> None:
+        state = None if checkpoint.injury_rng_state is None else json.dumps(checkpoint.injury_rng_state)
+        conn.execute(
+            text(
+                "update season_state set checkpoint_week = :w, "
+                "injury_rng_state = cast(:st as jsonb), updated_at = now() where season = :s"
+            ),
+            {"s": self.season, "w": checkpoint.week, "st": state},
+        )
+
+
 def reset_run(engine: Engine, season: int, period: int | None) -> int:
     """Recover from an interrupted/failed period run. Rolls back the partial data of
     `period` so a retry is clean: deletes that period's games (player_game_lines
     cascade) and EXACTLY undoes the W-L-T those games added to each team's record
     (derived from the deleted games' own scores, so no dependence on a recomputed
-    baseline). Then clears run_status back to idle. Returns games rolled back.
+    baseline), along with their team_season_standings rows (standings_repository).
+    Then drops the period's sim_jobs, clears run_status back to idle
+    and moves the checkpoint back to the end of the previous period. Returns
+    games rolled back.
 
     Run inside one transaction. `period` None (run died before a period was tagged)
     just clears the status with nothing to roll back."""
+    from handball import sim_jobs, standings_repository
     from handball.season import WEEKS_PER_PERIOD
 
     with engine.begin() as conn:
@@ -215,7 +277,7 @@ def reset_run(engine: Engine, season: int, period: int | None) -> int:
             hi = period * WEEKS_PER_PERIOD
             games = conn.execute(
                 text(
-                    "select id, home_team_id, away_team_id, home_score, away_score "
+                    "select id, week, home_team_id, away_team_id, home_score, away_score "
                     "from games where season = :s and week between :lo and :hi"
                 ),
                 {"s": season, "lo": lo, "hi": hi},
@@ -233,11 +295,21 @@ def reset_run(engine: Engine, season: int, period: int | None) -> int:
                 else:
                     _dec(conn, g["home_team_id"], "ties")
                     _dec(conn, g["away_team_id"], "ties")
+            touched = standings_repository.reverse_games(conn, season, games)
             conn.execute(
                 text("delete from games where season = :s and week between :lo and :hi"),
                 {"s": season, "lo": lo, "hi": hi},
             )
+            standings_repository.refresh_streaks(conn, season, touched)
             rolled = len(games)
+            sim_jobs.delete_period(conn, season, period)
+            conn.execute(
+                text(
+                    "update season_state set checkpoint_week = least(checkpoint_week, :w) "
+                    "where season = :s"
+                ),
+                {"s": season, "w": lo - 1},
+            )
         conn.execute(
             text(
                 "update season_state set run_status = 'idle', run_period = null, "
@@ -17,6 +17,24 @@ Description: Season structure for the redesigned stack -- the part of
                    weeks. Injuries are handled by an injected InjurySimulator
                    (optional), so the runner stays a thin coordinator.
 
+    Every scheduled game is played from its own seed, game_seed(season, week,
+    home, away, base seed), so a game's result depends on nothing but its
+    matchup and the season's seed: games can be played in any order or on any
+    worker, and any one of them re-simulated alone from the seed stored with it.
+
+    With workers > 1 the runner plays each week's games in a process pool: a team
+    plays at most once a week, so a week's games are independent. Each worker
+    gets the two serialized teams and the game's seed and sends back the result
+    and both teams as the game left them; the parent persists them in schedule
+    order, so a parallel run is identical to a serial one.
+
+    Given a CheckpointStore, a period commits week by week: each week's teams,
+    games and a Checkpoint (last committed week + the injury RNG state) are
+    written together, the period-end injury step with the last week. A run that
+    dies mid-period is continued with resume_period, which skips the committed
+    weeks; per-game seeds make the resumed weeks exactly the ones that would
+    have been played.
+
     The legacy run_period_simulation mixed all of this with sheet writes, record
     persistence, report generation, and archiving. Those are separate concerns
     (RecordSink/the orchestrator's publish path already cover persistence); this
@@ -25,13 +43,26 @@ Author: design sketch
 """
 from __future__ import annotations
 
+import operator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from functools import reduce
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
+
+import numpy as np
 
 from handball.league_views import TeamId
-from handball.orchestration import GameResult, SeasonOrchestrator
+from handball.orchestration import GameEngine, GameResult, SeasonOrchestrator
+from handball.period_session import PeriodSession
+from handball.progress import (
+    GAME_FINISHED, INJURIES_PROCESSED, PERIOD_DONE, WEEK_COMMITTED, ProgressEvent, ProgressPublisher,
+)
+from handball.repository import team_from_dict, team_to_dict
+from handball.week_pipeline import PipelineStats, WeekPipeline
 
 if TYPE_CHECKING:
+    from handball.game_simulator import GameMetrics
     from handball.injury_simulator import InjurySimulator
 
 Matchup = tuple[TeamId, TeamId]
@@ -110,20 +141,119 @@ class Schedule:
         return out
 
 
+def game_seed(season: int, week: int | None, home_id: TeamId, away_id: TeamId, base_seed: int) -> int:
+    """The seed one scheduled game is simulated from: a numpy SeedSequence over
+    (season, week, home, away, base_seed), reduced to 63 bits so it fits the
+    games.seed bigint column. Team ids enter as their UTF-8 bytes."""
+    entropy = [season, week or 0, _id_entropy(home_id), _id_entropy(away_id), base_seed % 2**64]
+    return int(np.random.SeedSequence(entropy).generate_state(1, np.uint64)[0] >> np.uint64(1))
+
+
+def _id_entropy(team_id: TeamId) -> int:
+    return int.from_bytes(str(team_id).encode("utf-8"), "big")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """How far a season run has durably got: every game of weeks 1..week is
+    committed (and, when `week` closes a period, that period's injuries), and
+    injury_rng_state is the InjurySimulator's RNG at that point (rng_state())."""
+
+    week: int = 0
+    injury_rng_state: list | None = None
+
+
+@runtime_checkable
+class CheckpointStore(Protocol):
+    def load(self) -> Checkpoint: ...
+    def save(self, checkpoint: Checkpoint, *, conn=None) -> None: ...
+
+
+class InMemoryCheckpointStore:
+    """Offline twin of schedule_repository.PostgresCheckpointStore."""
+
+    def __init__(self) -> None:
+        self.checkpoint = Checkpoint()
+
+    def load(self) -> Checkpoint:
+        return self.checkpoint
+
+    def save(self, checkpoint: Checkpoint, *, conn=None) -> None:
+        self.checkpoint = checkpoint
+
+
 class SeasonRunner:
     """Coordinates a SeasonOrchestrator across the season's period/week
     structure. Persistence, publishing, and record-keeping live in the
-    orchestrator; injuries (if any) in the injected InjurySimulator."""
+    orchestrator; injuries (if any) in the injected InjurySimulator.
+
+    `season` and `seed` feed game_seed for every game played. The league uses the
+    season's injury seed; without one a base seed is drawn from the global
+    np.random state (so np.random.seed(...) still reproduces a run).
+
+    When the engine reports GameMetrics, run_period sums them into
+    period_metrics[p].
+
+    `workers` > 1 plays each week's games in that many processes (the engine
+    must pickle); 1 plays them one after another in this process.
+
+    A record sink with flush() (BufferedRecordSink) is flushed at the end of
+    every run_week/run_period, so a failed background write raises there.
+
+    `checkpoints` makes run_period commit (and record a Checkpoint) after every
+    week and restore the injury RNG from the last checkpoint; resume_period
+    needs it.
+
+    `progress` receives a ProgressEvent as each game is played, each week is
+    written (with the write, so WEEK_COMMITTED never runs ahead of the data:
+    per week under checkpoints or pipeline, all at once when the period's
+    single write lands otherwise), the injuries are processed and the period
+    completes.
+
+    `pipeline` runs a period through a WeekPipeline: teams are prefetched a
+    week ahead and each week is written (with its checkpoint, if any) on a
+    background thread while the next one plays, so a period commits week by
+    week even without checkpoints. Each period's per-stage busy time lands in
+    pipeline_stats[p].
+
+    `period_batch` runs each period inside the record sink's period_batch()
+    (PostgresRecordSink): the period's team saves, checkpoints, progress
+    events and COPY-staged games commit as one transaction, so a failed
+    period leaves nothing behind (resume_period then replays it whole). It
+    replaces the pipeline's per-week writes, so the two do not combine."""
 
     def __init__(
         self,
         orchestrator: SeasonOrchestrator,
         schedule: Schedule,
         injuries: "InjurySimulator | None" = None,
+        *,
+        season: int = 0,
+        seed: int | None = None,
+        workers: int = 1,
+        checkpoints: CheckpointStore | None = None,
+        progress: ProgressPublisher | None = None,
+        pipeline: bool = False,
+        period_batch: bool = False,
     ) -> None:
+        if period_batch and pipeline:
+            raise ValueError("period_batch and pipeline cannot be combined")
+        if period_batch and not hasattr(orchestrator.record_sink, "period_batch"):
+            raise ValueError("period_batch needs a record sink with period_batch() (PostgresRecordSink)")
         self.orch = orchestrator
         self.schedule = schedule
         self.injuries = injuries
+        self.season = season
+        self.seed = seed if seed is not None else int(np.random.randint(0, 2**63, dtype=np.int64))
+        self.period_metrics: dict[int, GameMetrics] = {}
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        self.workers = workers
+        self.checkpoints = checkpoints
+        self.progress = progress
+        self.pipeline = pipeline
+        self.pipeline_stats: dict[int, PipelineStats] = {}
+        self.period_batch = period_batch
 
     def run_week(self, n: int) -> list[GameResult]:
         """Pull lineups for the week's teams, then play each game. Injuries are a
@@ -131,33 +261,205 @@ class SeasonRunner:
         matchups = list(self.schedule.week(n))
         for tid in sorted({t for pair in matchups for t in pair}):
             self.orch.apply_manager_lineup(tid)
-        results = []
-        for home, away in matchups:
-            results.append(self._play_game(home, away, week=n))
+        with self._pool() as pool:
+            results = self._play_week(n, matchups, pool)
+        self._flush_records()
+        self._emit(WEEK_COMMITTED, n)
         return results
 
     def run_period(self, p: int) -> list[GameResult]:
         """Pull every participating team's lineup once at the start of the
         period (the mailbox cadence: managers edit between periods), play every
         game across the period's weeks in order, then -- once the whole chunk is
-        done -- roll and apply injuries for the period."""
+        done -- roll and apply injuries for the period.
+
+        All of it runs against a PeriodSession: each participating team is
+        loaded once, and the dirty teams and the period's games are written
+        together when the period is over (after every week, with checkpoints)."""
+        return self._run_period(p, resume=False)
+
+    def resume_period(self, p: int) -> list[GameResult]:
+        """Continue period `p` after an interrupted run: weeks the checkpoint
+        already covers are skipped (their games are committed), the injury RNG
+        is restored, and play picks up at the next week. Returns only the games
+        played now -- none if the period was already complete."""
+        if self.checkpoints is None:
+            raise ValueError("resume_period needs a SeasonRunner with checkpoints")
+        return self._run_period(p, resume=True)
+
+    def _run_period(self, p: int, *, resume: bool) -> list[GameResult]:
         weeks_per_period = WEEKS_PER_PERIOD
         start = (p - 1) * weeks_per_period + 1
         end = min(p * weeks_per_period, self.schedule.num_weeks)
 
+        first = start
+        if self.checkpoints is not None:
+            checkpoint = self.checkpoints.load()
+            if self.injuries is not None and checkpoint.injury_rng_state is not None:
+                self.injuries.restore_rng_state(checkpoint.injury_rng_state)
+            if resume:
+                first = max(start, checkpoint.week + 1)
+                if first > end:
+                    return []
+
         all_matchups = self.schedule.period(p)
         team_ids = sorted({t for pair in all_matchups for t in pair})
-        for tid in team_ids:
-            self.orch.apply_manager_lineup(tid)
 
         results: list[GameResult] = []
-        for w in range(start, end + 1):
-            for home, away in self.schedule.week(w):
-                results.append(self._play_game(home, away, week=w))
+        batch = self.orch.record_sink.period_batch() if self.period_batch else nullcontext()
+        with batch, PeriodSession(self.orch) as session:
+            pipeline = None
+            if self.pipeline:
+                weeks = [(w, sorted({t for pair in self.schedule.week(w) for t in pair}))
+                         for w in range(first, end + 1)]
+                pipeline = WeekPipeline(self.orch.team_repo, weeks)
+            else:
+                session.preload(team_ids)
+            orch = session.orch
+            try:
+                if first == start:
+                    # Lineups are pulled once, as the period starts; a resumed
+                    # period keeps the ones its committed weeks were played with.
+                    for tid in team_ids:
+                        orch.apply_manager_lineup(tid)
+
+                with self._pool() as pool:
+                    for w in range(first, end + 1):
+                        if pipeline is not None:
+                            for team in pipeline.teams_for(w):
+                                session.adopt(team)
+                        results.extend(self._play_week(w, self.schedule.week(w), pool, orch))
+                        if w == end and self.injuries is not None:
+                            self.injuries.process_period_end(orch, team_ids, chunk=p)
+                            self._emit(INJURIES_PROCESSED, w)
+                        if pipeline is not None:
+                            pipeline.persist(session.detach(), self._week_committed(w))
+                        elif self.checkpoints is not None:
+                            session.flush(then=self._week_committed(w))
+                if pipeline is None and self.checkpoints is None:
+                    # One write for the whole period: its weeks are reported
+                    # with it, like every other mode reports a week with its write.
+                    session.flush(then=self._week_committed(*range(first, end + 1)))
+            except BaseException:
+                if pipeline is not None:
+                    pipeline.close(check=False)  # finish the queued weeks; the error in hand wins
+                raise
+            if pipeline is not None:
+                self.pipeline_stats[p] = pipeline.close()
+        self._flush_records()
+        self._emit(PERIOD_DONE, period=p)
 
-        if self.injuries is not None:
-            self.injuries.process_period_end(self.orch, team_ids, chunk=p)
+        metrics = [r.metrics for r in results if r.metrics is not None]
+        if metrics:
+            self.period_metrics[p] = reduce(operator.add, metrics)
         return results
 
-    def _play_game(self, home: TeamId, away: TeamId, week: int) -> GameResult:
-        return self.orch.simulate_matchup(home, away, week=week)
+    def _play_game(
+        self, home: TeamId, away: TeamId, week: int, orch: SeasonOrchestrator | None = None
+    ) -> GameResult:
+        seed = game_seed(self.season, week, home, away, self.seed)
+        result = (orch or self.orch).simulate_matchup(home, away, week=week, seed=seed)
+        self._emit(GAME_FINISHED, week, result=result)
+        return result
+
+    def _week_committed(self, *weeks: int):
+        """The `then` for writing the teams and games of `weeks`: saves the
+        checkpoint that covers them (as of now -- the injury RNG may move on
+        before the write runs) and reports each week, in the write's
+        transaction."""
+        checkpoint = None
+        if self.checkpoints is not None:
+            checkpoint = Checkpoint(weeks[-1], self.injuries.rng_state() if self.injuries is not None else None)
+
+        def committed(conn=None) -> None:
+            if checkpoint is not None:
+                self.checkpoints.save(checkpoint, conn=conn)
+            for week in weeks:
+                self._emit(WEEK_COMMITTED, week, conn=conn)
+
+        return committed
+
+    def _emit(
+        self, kind: str, week: int | None = None, *, period: int | None = None,
+        result: GameResult | None = None, conn=None,
+    ) -> None:
+        if self.progress is None:
+            return
+        if period is None:
+            period = (week - 1) // WEEKS_PER_PERIOD + 1
+        scores = {} if result is None else {
+            "home": result.home_id, "away": result.away_id,
+            "home_score": result.home_score, "away_score": result.away_score}
+        self.progress.publish(ProgressEvent(kind, self.season, period, week, **scores), conn=conn)
+
+    def _flush_records(self) -> None:
+        """Wait for a write-behind record sink (BufferedRecordSink) to catch up,
+        so a failed background write surfaces here, at the end of the run."""
+        flush = getattr(self.orch.record_sink, "flush", None)
+        if flush is not None:
+            flush()
+
+    def _pool(self) -> Executor | _Serial:
+        if self.workers == 1:
+            return _Serial()
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.orch.engine,))
+
+    def _play_week(
+        self, week: int, matchups, pool: Executor | _Serial, orch: SeasonOrchestrator | None = None
+    ) -> list[GameResult]:
+        """Play one week's games through `orch` (default: the runner's): in this
+        process, or fanned out to the pool and persisted in schedule order as
+        they come back."""
+        orch = orch or self.orch
+        if isinstance(pool, _Serial):
+            return [self._play_game(home, away, week, orch) for home, away in matchups]
+
+        seen: set[TeamId] = set()
+        for pair in matchups:
+            if seen & set(pair):
+                raise ValueError(f"week {week}: a team plays twice, so its games are not independent")
+            seen.update(pair)
+
+        repo = orch.team_repo
+        futures = [
+            pool.submit(_play_remote, team_to_dict(repo.load(home)), team_to_dict(repo.load(away)),
+                        game_seed(self.season, week, home, away, self.seed))
+            for home, away in matchups
+        ]
+        results = []
+        for future in futures:
+            result, home, away = future.result()
+            home = team_from_dict(home, validate_on_load=False)
+            away = team_from_dict(away, validate_on_load=False)
+            orch.persist_game(home, away, result, week=week)
+            self._emit(GAME_FINISHED, week, result=result)
+            results.append(result)
+        return results
+
+
+class _Serial:
+    """Stand-in for the pool when games run in this process."""
+
+    def __enter__(self) -> "_Serial":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+# Worker-process state: the engine, handed over once when the pool starts.
+_worker_engine: GameEngine | None = None
+
+
+def _init_worker(engine: GameEngine) -> None:
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _play_remote(home: dict, away: dict, seed: int) -> tuple[GameResult, dict, dict]:
+    """Play one game in a worker: (result, home, away), teams serialized as the
+    game left them (records, season logs) for the parent to persist."""
+    home_team = team_from_dict(home, validate_on_load=False)
+    away_team = team_from_dict(away, validate_on_load=False)
+    result = _worker_engine.play(home_team, away_team, seed=seed)
+    return result, team_to_dict(home_team), team_to_dict(away_team)
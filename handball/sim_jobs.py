@@ -0,0 +1,182 @@
+"""
+Name: sim_jobs.py
+Description: Postgres work queue for period simulation (the sim_jobs table).
+    The API used to play a whole period inside its own web process; now it only
+    enqueues the period here and reports progress, and any number of
+    `python -m handball.worker` processes -- on any machine that can reach the
+    database -- drain the queue.
+
+    A period becomes one 'game' job per fixture plus one 'period_end' job (the
+    injury step and the cursor bump). Each job carries a `stage`: its week for a
+    game, the period's last week + 1 for period_end. claim() only hands out a
+    job once every earlier stage of its period is done, so a week's games run
+    in parallel across workers while weeks still run in order (a team plays at
+    most once a week, so two games of one week never touch the same team).
+
+    Claiming is `SELECT ... FOR UPDATE SKIP LOCKED` inside the transaction that
+    then plays the job, writes its teams and game and marks it done. A worker
+    that dies mid-job simply rolls back: the row unlocks, still 'queued', and
+    the next worker picks it up. A job that raises is marked 'failed' (see
+    fail()); its stage then blocks the rest of the period until the operator
+    resumes (requeue_failed) or resets (delete_period) the run.
+Author: season-run wiring
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from handball.league_views import TeamId
+from handball.season import WEEKS_PER_PERIOD, Schedule, game_seed
+
+GAME = "game"
+PERIOD_END = "period_end"
+
+
+@dataclass(frozen=True)
+class Job:
+    id: int
+    season: int
+    period: int
+    stage: int
+    kind: str                      # GAME | PERIOD_END
+    week: int | None = None        # game jobs only
+    home: TeamId | None = None
+    away: TeamId | None = None
+    seed: int | None = None
+
+
+def period_weeks(schedule: Schedule, period: int) -> tuple[int, int]:
+    """First and last week of `period` (1-indexed, inclusive), as SeasonRunner
+    plays them."""
+    start = (period - 1) * WEEKS_PER_PERIOD + 1
+    return start, min(period * WEEKS_PER_PERIOD, schedule.num_weeks)
+
+
+def enqueue_period(
+    conn,
+    season: int,
+    period: int,
+    schedule: Schedule,
+    base_seed: int | None,
+    *,
+    after_week: int = 0,
+) -> int:
+    """Queue `period`'s games (those after `after_week`, for a resumed run) and
+    its period_end job, inside the caller's transaction. Each game's seed is
+    season.game_seed, so a queued season replays exactly like SeasonRunner's.
+    Returns the number of jobs queued."""
+    start, end = period_weeks(schedule, period)
+    rows = []
+    for w in range(max(start, after_week + 1), end + 1):
+        for home, away in schedule.week(w):
+            seed = None if base_seed is None else game_seed(season, w, home, away, base_seed)
+            rows.append({"season": season, "period": period, "stage": w, "kind": GAME,
+                         "week": w, "home": home, "away": away, "seed": seed})
+    rows.append({"season": season, "period": period, "stage": end + 1, "kind": PERIOD_END,
+                 "week": None, "home": None, "away": None, "seed": None})
+    conn.execute(
+        text(
+            "insert into sim_jobs (season, period, stage, kind, week, home_slug, away_slug, seed) "
+            "values (:season, :period, :stage, :kind, :week, :home, :away, :seed)"
+        ),
+        rows,
+    )
+    return len(rows)
+
+
+def claim(conn) -> Job | None:
+    """Lock the next runnable job for the rest of `conn`'s transaction, skipping
+    rows other workers hold. None when nothing is runnable right now."""
+    row = conn.execute(
+        text(
+            "select id, season, period, stage, kind, week, home_slug, away_slug, seed "
+            "from sim_jobs j where j.status = 'queued' "
+            "and not exists (select 1 from sim_jobs e where e.season = j.season "
+            "and e.period = j.period and e.stage < j.stage and e.status <> 'done') "
+            "order by j.season, j.period, j.stage, j.id "
+            "limit 1 for update skip locked"
+        )
+    ).first()
+    if row is None:
+        return None
+    return Job(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8])
+
+
+def complete(conn, job: Job) -> None:
+    """Mark `job` done and heartbeat the run, in the job's own transaction."""
+    conn.execute(
+        text("update sim_jobs set status = 'done', error = null, finished_at = now() where id = :id"),
+        {"id": job.id},
+    )
+    conn.execute(
+        text("update season_state set updated_at = now() "
+             "where season = :s and run_status = 'running'"),
+        {"s": job.season},
+    )
+
+
+def fail(engine: Engine, job: Job, error: str) -> None:
+    """Record a job that raised: the job is 'failed' and the run goes to 'error'
+    with the message, for the Commissioner page to show."""
+    with engine.begin() as conn:
+        conn.execute(
+            text("update sim_jobs set status = 'failed', error = :e, finished_at = now() "
+                 "where id = :id"),
+            {"id": job.id, "e": error},
+        )
+        conn.execute(
+            text("update season_state set run_status = 'error', run_period = :p, "
+                 "run_error = :e, updated_at = now() where season = :s"),
+            {"s": job.season, "p": job.period, "e": error},
+        )
+
+
+def stage_done(engine: Engine, job: Job) -> bool:
+    """Whether every job sharing `job`'s stage (its week's games) is done."""
+    with engine.connect() as conn:
+        return not conn.execute(
+            text("select exists (select 1 from sim_jobs where season = :s and period = :p "
+                 "and stage = :st and status <> 'done')"),
+            {"s": job.season, "p": job.period, "st": job.stage},
+        ).scalar_one()
+
+
+def requeue_failed(conn, season: int, period: int) -> int:
+    """Put `period`'s failed jobs back in the queue; returns how many."""
+    return conn.execute(
+        text("update sim_jobs set status = 'queued', error = null, finished_at = null "
+             "where season = :s and period = :p and status = 'failed'"),
+        {"s": season, "p": period},
+    ).rowcount
+
+
+def has_jobs(conn, season: int, period: int) -> bool:
+    return conn.execute(
+        text("select exists (select 1 from sim_jobs where season = :s and period = :p)"),
+        {"s": season, "p": period},
+    ).scalar_one()
+
+
+def delete_period(conn, season: int, period: int) -> None:
+    """Drop every job of `period` (a reset starts the period over)."""
+    conn.execute(
+        text("delete from sim_jobs where season = :s and period = :p"),
+        {"s": season, "p": period},
+    )
+
+
+def progress(engine: Engine, season: int, period: int) -> dict:
+    """Job counts for `period`: {"total", "done", "queued", "failed"}. 'queued'
+    includes jobs a worker is playing right now."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("select status, count(*) from sim_jobs "
+                 "where season = :s and period = :p group by status"),
+            {"s": season, "p": period},
+        ).all()
+    counts = {"done": 0, "queued": 0, "failed": 0}
+    counts.update({status: int(n) for status, n in rows})
+    return {"total": sum(counts.values()), **counts}
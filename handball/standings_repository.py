@@ -0,0 +1,294 @@
+"""
+Name: standings_repository.py
+Description: The team_season_standings table -- the league table, kept up to date
+    one game at a time instead of aggregated from `games` on every read.
+
+    PostgresRecordSink calls record_game() for each game it inserts, on the same
+    connection, so a game and its standings change commit (or roll back)
+    together; a COPY-staged batch of games is added set-based by
+    record_games(). schedule_repository.reset_run undoes a period with
+    reverse_games() and, once the games are deleted, refresh_streaks(). Every
+    writer takes an open `conn`; none opens a transaction of its own.
+
+    Division/conference splits follow the fixture's schedule_games.matchup_type
+    ('division_rival'/'division_non_rival' count as division AND conference
+    games, 'conference' as conference only). A game with no fixture counts only
+    toward the overall and home/away columns.
+
+    standings()/ranked_team_ids() are the tiebreaker ranking that draft and
+    playoff seeding use: wins desc, losses asc, goal differential desc, goals
+    for desc, then slug. Every team is listed; one without a game this season
+    ranks as 0-0-0.
+Author: relational backend
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from handball.league_views import TeamId
+
+_DIVISION = ("division_rival", "division_non_rival")
+_CONFERENCE = _DIVISION + ("conference",)
+_SIDE = ("w", "l", "t", "gf", "ga", "hw", "hl", "ht", "aw", "al", "at", "res")
+
+
+def _values_row(team: str, prefix: str) -> str:
+    cols = ", ".join(f"cast(:{prefix}{c} as integer)" for c in _SIDE)
+    return f"(cast(:{team} as uuid), {cols})"
+
+
+_FIXTURE = (
+    "left join schedule_games sg on sg.season = g.season and sg.week = g.week "
+    "and sg.home_team_id = g.home_team_id and sg.away_team_id = g.away_team_id "
+)
+_SCORED = "and g.home_score is not null and g.away_score is not null "
+
+# Adds the proposed row's counts to the existing one (the streak is set apart).
+_ADD = (
+    "wins = s.wins + excluded.wins, losses = s.losses + excluded.losses, "
+    "ties = s.ties + excluded.ties, goals_for = s.goals_for + excluded.goals_for, "
+    "goals_against = s.goals_against + excluded.goals_against, "
+    "home_wins = s.home_wins + excluded.home_wins, "
+    "home_losses = s.home_losses + excluded.home_losses, "
+    "home_ties = s.home_ties + excluded.home_ties, "
+    "away_wins = s.away_wins + excluded.away_wins, "
+    "away_losses = s.away_losses + excluded.away_losses, "
+    "away_ties = s.away_ties + excluded.away_ties, "
+    "div_wins = s.div_wins + excluded.div_wins, div_losses = s.div_losses + excluded.div_losses, "
+    "div_ties = s.div_ties + excluded.div_ties, "
+    "conf_wins = s.conf_wins + excluded.conf_wins, "
+    "conf_losses = s.conf_losses + excluded.conf_losses, "
+    "conf_ties = s.conf_ties + excluded.conf_ties, "
+)
+
+# record_game: both teams' deltas in one statement. The fixture's matchup_type
+# (m) turns the W-L-T deltas into the division/conference ones in SQL, so the
+# lookup costs no round trip of its own.
+_UPSERT = text(
+    "with m as (select "
+    "coalesce(max(case when matchup_type in ('division_rival', 'division_non_rival') "
+    "then 1 else 0 end), 0) as div, "
+    "coalesce(max(case when matchup_type in ('division_rival', 'division_non_rival', 'conference') "
+    "then 1 else 0 end), 0) as conf "
+    "from schedule_games where season = :season and week = :week "
+    "and home_team_id = :home and away_team_id = :away) "
+    "insert into team_season_standings as s (season, team_id, wins, losses, ties, "
+    "goals_for, goals_against, home_wins, home_losses, home_ties, "
+    "away_wins, away_losses, away_ties, div_wins, div_losses, div_ties, "
+    "conf_wins, conf_losses, conf_ties, streak) "
+    "select :season, v.team, v.w, v.l, v.t, v.gf, v.ga, v.hw, v.hl, v.ht, v.aw, v.al, v.at, "
+    "v.w * m.div, v.l * m.div, v.t * m.div, v.w * m.conf, v.l * m.conf, v.t * m.conf, v.res "
+    "from m, (values "
+    + _values_row("home", "h_") + ", " + _values_row("away", "a_") +
+    ") as v(team, w, l, t, gf, ga, hw, hl, ht, aw, al, at, res) "
+    "on conflict (season, team_id) do update set " + _ADD +
+    "streak = case when excluded.streak > 0 then greatest(s.streak, 0) + 1 "
+    "              when excluded.streak < 0 then least(s.streak, 0) - 1 else 0 end, "
+    "updated_at = now()"
+)
+
+# record_games: the given games' sides, summed per team, added in one upsert.
+_UPSERT_GAMES = text(
+    "with sides as ("
+    "select g.home_team_id as team_id, true as home, g.home_score as gf, g.away_score as ga, "
+    "sg.matchup_type from games g " + _FIXTURE + "where g.id = any(:ids) " + _SCORED +
+    "union all "
+    "select g.away_team_id, false, g.away_score, g.home_score, sg.matchup_type from games g "
+    + _FIXTURE + "where g.id = any(:ids) " + _SCORED +
+    "), r as ("
+    "select *, sign(gf - ga)::int as res, "
+    "coalesce(matchup_type in ('division_rival', 'division_non_rival'), false) as div, "
+    "coalesce(matchup_type in ('division_rival', 'division_non_rival', 'conference'), false) as conf "
+    "from sides) "
+    "insert into team_season_standings as s (season, team_id, wins, losses, ties, "
+    "goals_for, goals_against, home_wins, home_losses, home_ties, "
+    "away_wins, away_losses, away_ties, div_wins, div_losses, div_ties, "
+    "conf_wins, conf_losses, conf_ties) "
+    "select :season, team_id, "
+    "count(*) filter (where res > 0), count(*) filter (where res < 0), "
+    "count(*) filter (where res = 0), sum(gf), sum(ga), "
+    "count(*) filter (where home and res > 0), count(*) filter (where home and res < 0), "
+    "count(*) filter (where home and res = 0), "
+    "count(*) filter (where not home and res > 0), count(*) filter (where not home and res < 0), "
+    "count(*) filter (where not home and res = 0), "
+    "count(*) filter (where div and res > 0), count(*) filter (where div and res < 0), "
+    "count(*) filter (where div and res = 0), "
+    "count(*) filter (where conf and res > 0), count(*) filter (where conf and res < 0), "
+    "count(*) filter (where conf and res = 0) "
+    "from r where team_id is not null group by team_id "
+    "on conflict (season, team_id) do update set " + _ADD + "updated_at = now() "
+    "returning team_id"
+)
+
+# refresh_streaks: each listed team's run of equal results, counted back from
+# its latest remaining game (as in migration 0008's backfill); 0 with no games.
+_STREAKS = text(
+    "with sides as ("
+    "select home_team_id as team_id, week, played_at, home_score - away_score as diff "
+    "from games g where season = :s and home_team_id = any(:t) " + _SCORED +
+    "union all "
+    "select away_team_id, week, played_at, away_score - home_score "
+    "from games g where season = :s and away_team_id = any(:t) " + _SCORED +
+    "), r as ("
+    "select team_id, sign(diff)::int as res, row_number() over ("
+    "partition by team_id order by week desc nulls last, played_at desc) as rn from sides"
+    "), streaks as ("
+    "select h.team_id, h.res * coalesce(min(r.rn) filter (where r.res <> h.res) - 1, count(*)) as streak "
+    "from r h join r on r.team_id = h.team_id where h.rn = 1 group by h.team_id, h.res"
+    ") "
+    "update team_season_standings s set streak = coalesce(st.streak, 0) "
+    "from unnest(cast(:t as uuid[])) as t(team_id) left join streaks st on st.team_id = t.team_id "
+    "where s.season = :s and s.team_id = t.team_id"
+)
+
+# reverse_games: subtract one game's deltas (never below zero, like reset_run's
+# W-L-T undo). The streak is recomputed afterwards, from the games that remain.
+_SUBTRACT = text(
+    "update team_season_standings set "
+    "wins = greatest(wins - :w, 0), losses = greatest(losses - :l, 0), "
+    "ties = greatest(ties - :t, 0), goals_for = greatest(goals_for - :gf, 0), "
+    "goals_against = greatest(goals_against - :ga, 0), "
+    "home_wins = greatest(home_wins - :hw, 0), home_losses = greatest(home_losses - :hl, 0), "
+    "home_ties = greatest(home_ties - :ht, 0), "
+    "away_wins = greatest(away_wins - :aw, 0), away_losses = greatest(away_losses - :al, 0), "
+    "away_ties = greatest(away_ties - :at, 0), "
+    "div_wins = greatest(div_wins - :dw, 0), div_losses = greatest(div_losses - :dl, 0), "
+    "div_ties = greatest(div_ties - :dt, 0), "
+    "conf_wins = greatest(conf_wins - :cw, 0), conf_losses = greatest(conf_losses - :cl, 0), "
+    "conf_ties = greatest(conf_ties - :ct, 0), updated_at = now() "
+    "where season = :season and team_id = :team"
+)
+
+
+@dataclass(frozen=True)
+class Standing:
+    team: TeamId
+    wins: int = 0
+    losses: int = 0
+    ties: int = 0
+    goals_for: int = 0
+    goals_against: int = 0
+    home: tuple[int, int, int] = (0, 0, 0)
+    away: tuple[int, int, int] = (0, 0, 0)
+    division: tuple[int, int, int] = (0, 0, 0)
+    conference: tuple[int, int, int] = (0, 0, 0)
+    streak: int = 0                # +n: n straight wins, -n: losses, 0 after a tie
+
+    @property
+    def record(self) -> tuple[int, int, int]:
+        return (self.wins, self.losses, self.ties)
+
+    @property
+    def goal_diff(self) -> int:
+        return self.goals_for - self.goals_against
+
+
+def record_game(
+    conn, season: int, week: int | None, home, away, home_score: int, away_score: int
+) -> None:
+    """Add one game to both teams' rows, in one statement (`home`/`away` are
+    teams.id uuids)."""
+    params = {"season": season, "week": week, "home": home, "away": away}
+    for prefix, deltas in (("h_", _deltas(season, home, home_score, away_score, True, None)),
+                           ("a_", _deltas(season, away, away_score, home_score, False, None))):
+        params.update({prefix + k: deltas[k] for k in _SIDE})
+    conn.execute(_UPSERT, params)
+
+
+def record_games(conn, season: int, game_ids) -> None:
+    """Add many `season` games, already inserted into `games` on `conn`, in one
+    set-based upsert; the touched teams' streaks are then recomputed from
+    `games` (a batch may hold several games per team)."""
+    game_ids = list(game_ids)
+    if not game_ids:
+        return
+    touched = conn.execute(_UPSERT_GAMES, {"season": season, "ids": game_ids}).scalars().all()
+    refresh_streaks(conn, season, touched)
+
+
+def reverse_games(conn, season: int, games) -> set:
+    """Take `games` (mappings with week, home_team_id, away_team_id, home_score,
+    away_score) back out of the table, before they are deleted. Returns the
+    team ids touched -- pass them to refresh_streaks once the games are gone."""
+    teams = set()
+    for g in games:
+        hs, as_ = g["home_score"], g["away_score"]
+        if hs is None or as_ is None:
+            continue  # unscored row: never counted
+        home, away = g["home_team_id"], g["away_team_id"]
+        mtype = _matchup_type(conn, season, g["week"], home, away)
+        conn.execute(_SUBTRACT, [
+            _deltas(season, home, hs, as_, True, mtype),
+            _deltas(season, away, as_, hs, False, mtype),
+        ])
+        teams.update((home, away))
+    return teams
+
+
+def refresh_streaks(conn, season: int, team_ids) -> None:
+    """Recompute each team's streak from its remaining `season` games, in one
+    statement."""
+    team_ids = list(team_ids)
+    if team_ids:
+        conn.execute(_STREAKS, {"s": season, "t": team_ids})
+
+
+def standings(engine: Engine, season: int) -> list[Standing]:
+    """The `season` table, best first (see the module docstring for the order)."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "select t.slug, coalesce(s.wins, 0), coalesce(s.losses, 0), coalesce(s.ties, 0), "
+                "coalesce(s.goals_for, 0), coalesce(s.goals_against, 0), "
+                "coalesce(s.home_wins, 0), coalesce(s.home_losses, 0), coalesce(s.home_ties, 0), "
+                "coalesce(s.away_wins, 0), coalesce(s.away_losses, 0), coalesce(s.away_ties, 0), "
+                "coalesce(s.div_wins, 0), coalesce(s.div_losses, 0), coalesce(s.div_ties, 0), "
+                "coalesce(s.conf_wins, 0), coalesce(s.conf_losses, 0), coalesce(s.conf_ties, 0), "
+                "coalesce(s.streak, 0) "
+                "from teams t left join team_season_standings s "
+                "on s.team_id = t.id and s.season = :s "
+                "order by coalesce(s.wins, 0) desc, coalesce(s.losses, 0), "
+                "coalesce(s.goal_diff, 0) desc, coalesce(s.goals_for, 0) desc, t.slug"
+            ),
+            {"s": season},
+        ).all()
+    return [
+        Standing(r[0], r[1], r[2], r[3], r[4], r[5], tuple(r[6:9]), tuple(r[9:12]),
+                 tuple(r[12:15]), tuple(r[15:18]), r[18])
+        for r in rows
+    ]
+
+
+def ranked_team_ids(engine: Engine, season: int) -> list[TeamId]:
+    """Best -> worst, the order draft (reversed) and playoff seeding use."""
+    return [s.team for s in standings(engine, season)]
+
+
+def _matchup_type(conn, season: int, week: int | None, home, away) -> str | None:
+    if week is None:
+        return None
+    return conn.execute(
+        text("select matchup_type from schedule_games where season = :s and week = :w "
+             "and home_team_id = :h and away_team_id = :a limit 1"),
+        {"s": season, "w": week, "h": home, "a": away},
+    ).scalar()
+
+
+def _deltas(season: int, team, gf: int, ga: int, home: bool, mtype: str | None) -> dict:
+    """One side of a game as column deltas; `res` (+1/-1/0) drives the streak."""
+    res = (gf > ga) - (gf < ga)
+    w, l, t = int(res > 0), int(res < 0), int(res == 0)
+    div = mtype in _DIVISION
+    conf = mtype in _CONFERENCE
+    return {
+        "season": season, "team": team, "w": w, "l": l, "t": t, "gf": gf, "ga": ga,
+        "hw": w * home, "hl": l * home, "ht": t * home,
+        "aw": w * (not home), "al": l * (not home), "at": t * (not home),
+        "dw": w * div, "dl": l * div, "dt": t * div,
+        "cw": w * conf, "cl": l * conf, "ct": t * conf,
+        "res": res,
+    }
+
@@ -0,0 +1,338 @@
+"""
+Name: surrogate_engine.py
+Description: A calibrated score model standing in for play-by-play, for what-if
+    and projection workloads that need score distributions, not possessions.
+
+    SurrogateGameEngine samples each team's stats exactly like
+    GameSimulator.init_stats (calculate_team_stats), turns them into a few
+    features, and draws the game from a fitted count model:
+
+      - goals, missed shots and opposing-goalie saves per side are log-linear in
+        the features (Poisson regressions fitted by IRLS), each with a fitted
+        dispersion (variance = dispersion * mean);
+      - the two sides' goal residuals are correlated (they share one clock), so
+        goals are drawn as a correlated pair; the count is the rounded Gaussian
+        approximation of the quasi-Poisson, which is accurate at league scoring
+        levels (hundreds of goals a game);
+      - a tie with allow_tie=False goes to sudden-death overtime, won by each side
+        in proportion to its goal rate, adding the one winning goal;
+      - goals and shots are split over the 10 scorers with StatTracker's shot
+        shares (goals additionally weighted by each scorer's finishing odds).
+
+    The result is applied to the teams like GameSimulator.postgame and returned
+    as the same GameResult GameSimulatorAdapter builds, so the engine plugs into
+    SeasonOrchestrator / LeagueOperations (see league.build_projection_league).
+
+    Coefficients live in a versioned JSON file (DEFAULT_COEFFICIENTS), written by
+    the calibrate command, which runs the real GameSimulator over the
+    datafiles_v2 teams.
+
+Usage:
+    python -m handball.surrogate_engine calibrate                 # 400 games, flat kernel
+    python -m handball.surrogate_engine calibrate --games 1000 --seed 7 --kernel loop
+Author: Oliver Hvidsten (oliverhvidsten@gmail.com)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from handball.domain import Team
+from handball.game_simulator import KERNELS, GameSimulator, calculate_team_stats, scorer_likelihood
+from handball.orchestration import GameResult, game_lines_for
+from handball.simulation_vars import REGULATION_TIME
+from handball.utils import RandomSource
+
+SURROGATE_VERSION = 2
+DEFAULT_COEFFICIENTS = Path(__file__).parent / "surrogate_coefficients.json"
+DEFAULT_DATAFILES = Path(__file__).parent / "datafiles_v2"
+
+FEATURES = (
+    "intercept",
+    "log_ratio", "log_opp_ratio",            # pass completion, this side / the other
+    "log_finish", "log_opp_finish",          # offense vs defense + goalie
+    "log_shooter", "log_opp_shooter",        # shot-share-weighted scorer offense
+)
+TARGETS = ("goals", "misses", "saves")       # saves == by the OTHER side's goalie
+
+
+def shooter_strength(scorers) -> float:
+    """Expected offense rating of the player taking a shot."""
+    return float(np.dot(scorer_likelihood(scorers), [p.offense for p in scorers]))
+
+
+def side_features(own: dict, other: dict, own_shooter: float, other_shooter: float) -> np.ndarray:
+    """Feature row for one side, from init_stats-style stats dicts
+    ({"offense", "defense", "ratio", "goalie"})."""
+    def finish(a, d):
+        return a["offense"] / (a["offense"] + d["defense"] + d["goalie"])
+
+    return np.array([
+        1.0,
+        np.log(own["ratio"]), np.log(other["ratio"]),
+        np.log(finish(own, other)), np.log(finish(other, own)),
+        np.log(own_shooter), np.log(other_shooter),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# The fitted model.
+# ---------------------------------------------------------------------------
+@dataclass
+class SurrogateModel:
+    coefficients: dict[str, list[float]]
+    dispersion: dict[str, float]
+    goal_correlation: float
+    version: int = SURROGATE_VERSION
+    features: tuple[str, ...] = FEATURES
+    calibration: dict = field(default_factory=dict)   # provenance: games, seed, kernel, ...
+
+    def means(self, x: np.ndarray) -> dict[str, float]:
+        return {t: float(np.exp(x @ np.asarray(self.coefficients[t]))) for t in TARGETS}
+
+    # -- persistence -------------------------------------------------------
+    def save(self, path: Path | str = DEFAULT_COEFFICIENTS) -> None:
+        d = asdict(self)
+        d["features"] = list(self.features)
+        Path(path).write_text(json.dumps(d, indent=2))
+
+    @classmethod
+    def load(cls, path: Path | str = DEFAULT_COEFFICIENTS) -> "SurrogateModel":
+        d = json.loads(Path(path).read_text())
+        if d.get("version") != SURROGATE_VERSION:
+            raise ValueError(
+                f"{path}: surrogate coefficients version {d.get('version')!r}, "
+                f"expected {SURROGATE_VERSION}; rerun `python -m handball.surrogate_engine calibrate`"
+            )
+        if tuple(d["features"]) != FEATURES:
+            raise ValueError(f"{path}: feature set {d['features']} does not match {list(FEATURES)}")
+        d["features"] = tuple(d["features"])
+        return cls(**d)
+
+    # -- fitting -----------------------------------------------------------
+    @classmethod
+    def fit(cls, X: np.ndarray, Y: dict[str, np.ndarray], calibration: dict | None = None) -> "SurrogateModel":
+        """Fit from per-side rows: X is (2n, len(FEATURES)) with each game's home
+        row at 2i and away row at 2i+1; Y maps each target to a (2n,) array."""
+        coefficients, dispersion, residuals = {}, {}, {}
+        for t in TARGETS:
+            beta = _fit_poisson(X, Y[t])
+            mu = np.exp(X @ beta)
+            pearson = (Y[t] - mu) / np.sqrt(mu)
+            coefficients[t] = beta.tolist()
+            dispersion[t] = float(np.sum(pearson ** 2) / (len(mu) - X.shape[1]))
+            residuals[t] = pearson
+        r = residuals["goals"]
+        return cls(
+            coefficients=coefficients,
+            dispersion=dispersion,
+            goal_correlation=float(np.corrcoef(r[0::2], r[1::2])[0, 1]),
+            calibration=dict(calibration or {}),
+        )
+
+
+def _fit_poisson(X: np.ndarray, y: np.ndarray, iterations: int = 50, tol: float = 1e-10) -> np.ndarray:
+    """Poisson regression with a log link by iteratively reweighted least squares."""
+    beta = np.zeros(X.shape[1])
+    beta[0] = np.log(max(y.mean(), 1e-9))
+    for _ in range(iterations):
+        eta = X @ beta
+        mu = np.exp(eta)
+        z = eta + (y - mu) / mu
+        XtW = X.T * mu
+        new = np.linalg.solve(XtW @ X, XtW @ z)
+        if np.max(np.abs(new - beta)) < tol:
+            return new
+        beta = new
+    return beta
+
+
+# ---------------------------------------------------------------------------
+# The engine.
+# ---------------------------------------------------------------------------
+class SurrogateGameEngine:
+    """GameEngine drawing whole games from a fitted SurrogateModel. Loads the
+    shipped coefficients by default."""
+
+    def __init__(
+        self,
+        model: SurrogateModel | None = None,
+        allow_tie: bool = False,
+        rng: np.random.Generator | None = None,
+    ):
+        self.model = model or SurrogateModel.load()
+        self.allow_tie = allow_tie
+        # Seed from the global legacy RNG by default so np.random.seed(...) makes
+        # runs reproducible, as with the simulators.
+        self.rng = rng if rng is not None else np.random.default_rng(np.random.randint(0, 2**32, dtype=np.uint64))
+        self._draws = RandomSource(self.rng)
+
+    def _count(self, mean: float, target: str, z: float) -> int:
+        sd = np.sqrt(self.model.dispersion[target] * mean)
+        return max(0, int(round(mean + sd * z)))
+
+    def play(self, home: Team, away: Team, *, seed: int | None = None) -> GameResult:
+        # A seeded game draws from its own stream; otherwise from the engine's.
+        if seed is not None:
+            rng = np.random.default_rng(seed)
+            draws = RandomSource(rng)
+        else:
+            rng, draws = self.rng, self._draws
+        h_off, h_def, h_goalie, _, h_scorers = calculate_team_stats(home, draws)
+        a_off, a_def, a_goalie, _, a_scorers = calculate_team_stats(away, draws)
+        h_stats = {"offense": h_off, "defense": h_def, "goalie": h_goalie, "ratio": h_off / (h_off + a_def)}
+        a_stats = {"offense": a_off, "defense": a_def, "goalie": a_goalie, "ratio": a_off / (a_off + h_def)}
+        h_shooter, a_shooter = shooter_strength(h_scorers), shooter_strength(a_scorers)
+
+        h_mean = self.model.means(side_features(h_stats, a_stats, h_shooter, a_shooter))
+        a_mean = self.model.means(side_features(a_stats, h_stats, a_shooter, h_shooter))
+
+        rho = self.model.goal_correlation
+        z1, z2 = rng.standard_normal(2)
+        h_goals = self._count(h_mean["goals"], "goals", z1)
+        a_goals = self._count(a_mean["goals"], "goals", rho * z1 + np.sqrt(1 - rho ** 2) * z2)
+
+        went_to_overtime = False
+        if h_goals == a_goals and not self.allow_tie:
+            went_to_overtime = True
+            if rng.random() < h_mean["goals"] / (h_mean["goals"] + a_mean["goals"]):
+                h_goals += 1
+            else:
+                a_goals += 1
+
+        h_misses = self._count(h_mean["misses"], "misses", rng.standard_normal())
+        a_misses = self._count(a_mean["misses"], "misses", rng.standard_normal())
+        # saves[side] are made by that side's goalie, on the other side's misses
+        h_saves = min(a_misses, self._count(a_mean["saves"], "saves", rng.standard_normal()))
+        a_saves = min(h_misses, self._count(h_mean["saves"], "saves", rng.standard_normal()))
+
+        h_goal_split, h_shots = self._split(rng, h_scorers, h_stats, h_goals, h_misses)
+        a_goal_split, a_shots = self._split(rng, a_scorers, a_stats, a_goals, a_misses)
+
+        # Apply to the teams exactly like GameSimulator.postgame.
+        if h_goals > a_goals:
+            home.record_result("W")
+            away.record_result("L")
+        elif a_goals > h_goals:
+            home.record_result("L")
+            away.record_result("W")
+        else:
+            home.record_result("T")
+            away.record_result("T")
+        home.update_offensive_stats(goals_scored=h_goal_split, shots_taken=h_shots)
+        away.update_offensive_stats(goals_scored=a_goal_split, shots_taken=a_shots)
+        home.update_goalie_stats(saves=h_saves, goals_allowed=a_goals)
+        away.update_goalie_stats(saves=a_saves, goals_allowed=h_goals)
+
+        return GameResult(
+            home_id=home.id,
+            away_id=away.id,
+            home_score=h_goals,
+            away_score=a_goals,
+            went_to_overtime=went_to_overtime,
+            player_lines={**game_lines_for(home), **game_lines_for(away)},
+            seed=seed,
+        )
+
+    def play_many(
+        self, pairs: Sequence[tuple[Team, Team]], seeds: Sequence[int] | None = None
+    ) -> list[GameResult]:
+        seeds = seeds if seeds is not None else [None] * len(pairs)
+        return [self.play(home, away, seed=s) for (home, away), s in zip(pairs, seeds)]
+
+    @staticmethod
+    def _split(rng, scorers, own: dict, goals: int, misses: int):
+        """Per-scorer (goals, shots). Shots follow StatTracker's shot shares;
+        goals lean further toward scorers with the better finishing odds."""
+        share = scorer_likelihood(scorers)
+        rating = np.array([p.offense for p in scorers])
+        finishing = share * rating * (0.5 * own["offense"] + 1.25 * rating)
+        goal_split = rng.multinomial(goals, finishing / finishing.sum())
+        shots = goal_split + rng.multinomial(misses, share)
+        return goal_split, shots
+
+
+# ---------------------------------------------------------------------------
+# Calibration against the real simulator.
+# ---------------------------------------------------------------------------
+def collect(teams: list[Team], games: int, kernel: str = "flat", progress=None):
+    """Play `games` random pairings of `teams` on the real GameSimulator (seed the
+    global np.random first for reproducibility) and return (X, Y) per-side
+    samples for SurrogateModel.fit. Mutates the in-memory teams' season logs;
+    callers should not persist them."""
+    rows, targets = [], {t: [] for t in TARGETS}
+    for g in range(games):
+        i, j = np.random.choice(len(teams), size=2, replace=False)
+        home, away = teams[i], teams[j]
+        sim = GameSimulator(home, away, kernel=kernel, record_events=False)
+        h_shooter = shooter_strength(sim.stat_tracker.home_scorers)
+        a_shooter = shooter_strength(sim.stat_tracker.away_scorers)
+        h_stats, a_stats = dict(sim.home_stats), dict(sim.away_stats)   # before the halftime swaps
+        sim.simulate_game()
+        st = sim.stat_tracker
+
+        # Overtime goals are the surrogate's OT rule, not part of the fitted rate.
+        h_goals = int(st.home_goals.sum()) - (st.in_overtime and sim.home_score > sim.away_score)
+        a_goals = int(st.away_goals.sum()) - (st.in_overtime and sim.away_score > sim.home_score)
+        rows.append(side_features(h_stats, a_stats, h_shooter, a_shooter))
+        rows.append(side_features(a_stats, h_stats, a_shooter, h_shooter))
+        targets["goals"] += [h_goals, a_goals]
+        targets["misses"] += [int(st.home_shots.sum()) - int(st.home_goals.sum()),
+                              int(st.away_shots.sum()) - int(st.away_goals.sum())]
+        targets["saves"] += [st.away_goalie_saves, st.home_goalie_saves]
+        if progress:
+            progress(g + 1, games)
+    return np.array(rows), {t: np.array(v, dtype=float) for t, v in targets.items()}
+
+
+def calibrate(datafiles_dir=DEFAULT_DATAFILES, games: int = 400, seed: int = 0,
+              kernel: str = "flat", progress=None) -> SurrogateModel:
+    from handball.repository import JsonTeamRepository
+
+    teams = JsonTeamRepository(datafiles_dir).load_all()
+    np.random.seed(seed)
+    started = time.time()
+    X, Y = collect(teams, games, kernel=kernel, progress=progress)
+    return SurrogateModel.fit(X, Y, calibration={
+        "games": games,
+        "seed": seed,
+        "kernel": kernel,
+        "teams": len(teams),
+        "regulation_time": REGULATION_TIME,
+        "seconds": round(time.time() - started, 1),
+        # Regulation goals per side in the calibration games, for sanity checks.
+        "mean_goals": float(Y["goals"].mean()),
+        "sd_goals": float(Y["goals"].std()),
+    })
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Surrogate game engine tools.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate", help="fit coefficients against the real GameSimulator")
+    cal.add_argument("--datafiles", default=str(DEFAULT_DATAFILES))
+    cal.add_argument("--games", type=int, default=400)
+    cal.add_argument("--seed", type=int, default=0)
+    cal.add_argument("--kernel", choices=KERNELS, default="flat")
+    cal.add_argument("--out", default=str(DEFAULT_COEFFICIENTS))
+    args = ap.parse_args()
+
+    def progress(done, total):
+        if done % 25 == 0 or done == total:
+            print(f"  {done}/{total} games", flush=True)
+
+    model = calibrate(args.datafiles, games=args.games, seed=args.seed, kernel=args.kernel, progress=progress)
+    model.save(args.out)
+    print(f"wrote surrogate v{model.version} coefficients to {args.out}")
+    print(f"  dispersion {model.dispersion}, goal correlation {model.goal_correlation:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -28,7 +28,7 @@ from typing import Iterable
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
-from handball.db import get_engine
+from handball.db import get_engine, pipeline
 from handball.domain import ArrangementError, Player, Team, validate
 from handball.league_views import DEFAULT_RULES, RosterRules
 from handball.pg_repository import _iter_slots
@@ -123,20 +123,22 @@ def approve_trade(engine: Engine, trade_id: str, rules: RosterRules = DEFAULT_RU
             {"id": trade_id},
         ).mappings().all()
 
-        # 1. move assets. Players land unplaced (slots cleared) on the destination.
-        for a in assets:
-            dest = to_id if a["direction"] == "to_to" else from_id
-            if a["player_id"] is not None:
-                conn.execute(
-                    text("update players set team_id = :d, slot_group = null, "
-                         "slot_position = null, slot_order = null where id = :p"),
-                    {"d": dest, "p": a["player_id"]},
-                )
-            else:
-                conn.execute(
-                    text("update draft_picks set holder_team_id = :d where id = :p"),
-                    {"d": dest, "p": a["draft_pick_id"]},
-                )
+        # 1. move assets. Players land unplaced (slots cleared) on the destination;
+        # the moves are independent, so they go out pipelined (see db.pipeline).
+        with pipeline(conn):
+            for a in assets:
+                dest = to_id if a["direction"] == "to_to" else from_id
+                if a["player_id"] is not None:
+                    conn.execute(
+                        text("update players set team_id = :d, slot_group = null, "
+                             "slot_position = null, slot_order = null where id = :p"),
+                        {"d": dest, "p": a["player_id"]},
+                    )
+                else:
+                    conn.execute(
+                        text("update draft_picks set holder_team_id = :d where id = :p"),
+                        {"d": dest, "p": a["draft_pick_id"]},
+                    )
 
         # 2. rebuild + validate + persist a legal lineup for both teams.
         _rearrange_team(conn, from_id, rules)
@@ -194,13 +196,14 @@ def _rearrange_team(conn, team_uuid, rules: RosterRules) -> None:
     ]
     team = _canonical_team(players, rules)
     validate(team.arrangement(), team, rules)        # safety net; rolls back on failure
-    for slot_group, slot_position, slot_order, player in _iter_slots(team):
-        conn.execute(
-            text("update players set slot_group = cast(:g as roster_group), "
-                 "slot_position = cast(:p as player_position), slot_order = :o "
-                 "where legacy_id = :lid"),
-            {"g": slot_group, "p": slot_position, "o": slot_order, "lid": player.id},
-        )
+    with pipeline(conn):                       # one update per player, unanswered
+        for slot_group, slot_position, slot_order, player in _iter_slots(team):
+            conn.execute(
+                text("update players set slot_group = cast(:g as roster_group), "
+                     "slot_position = cast(:p as player_position), slot_order = :o "
+                     "where legacy_id = :lid"),
+                {"g": slot_group, "p": slot_position, "o": slot_order, "lid": player.id},
+            )
 
 
 def _canonical_team(players: list[Player], rules: RosterRules) -> Team:
@@ -38,27 +38,116 @@ def print_roster(dictionary):
     return '\n'.join(str_list)
 
 
-class ProbabilityStack():
+class RandomSource():
     """
-    Defines a class that will hold probability values between 0 and 1 to be referenced during the simulation
-    Preallocates for speed and will generate new values when first list runs out
+    Every random draw a game needs, from one numpy Generator owned by the game (no
+    global np.random state). Uniforms and standard normals are generated in large
+    blocks and handed out by index; a block is regenerated only once it is used up.
+    Scalars come out as Python floats, which keeps the per-draw cost of the hot loop
+    to a list lookup.
     """
 
-    def __init__(self, length=1000):
-        """ Initialize stack """
-        self.backing_array = np.random.random(length)
-        self.index = 0
-
-    def pop(self):
-        """ Get value from array, regenerate if necessary """
-        self.index +=1
-        try:
-            return self.backing_array[self.index-1]
-        except IndexError:
-            self._regen_stack()
-            return self.backing_array[self.index-1]
-        
-    def _regen_stack(self):
-        """ Regenerate the backing array with new probability values """
-        self.backing_array = np.random.random(len(self.backing_array))
-        self.index=1    
\ No newline at end of file
+    def __init__(self, seed=None, block_size=4096):
+        """ `seed` is anything np.random.default_rng accepts, or a Generator to share """
+        self.generator = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.block_size = block_size
+        self._uniforms, self._u_index = [], 0
+        self._normals, self._n_index = [], 0
+        # Draws handed out from blocks already replaced (see draws)
+        self._spent = 0
+
+    @classmethod
+    def from_global(cls, block_size=4096):
+        """ A source seeded from the global np.random state, so np.random.seed(...)
+        still makes a run reproducible """
+        return cls(int(np.random.randint(0, 2**32, dtype=np.uint64)), block_size)
+
+    @property
+    def draws(self):
+        """ Uniforms and normals handed out so far, counted per draw (a carried-over
+        normals() tail only counts once it is handed out) """
+        return self._spent + self._u_index + self._n_index
+
+    def uniform(self):
+        """ One draw from U[0, 1) """
+        i = self._u_index
+        if i == len(self._uniforms):
+            self._spent += i
+            self._uniforms, i = self.generator.random(self.block_size).tolist(), 0
+        self._u_index = i + 1
+        return self._uniforms[i]
+
+    def normal(self, loc=0.0, scale=1.0):
+        """ One draw from N(loc, scale) """
+        i = self._n_index
+        if i == len(self._normals):
+            self._spent += i
+            self._normals, i = self.generator.standard_normal(self.block_size).tolist(), 0
+        self._n_index = i + 1
+        return loc + scale * self._normals[i]
+
+    def normals(self, loc, scale):
+        """ Vector of normals, one per (loc, scale) pair. Taken from the same block as
+        normal(), so one call consumes exactly what len(loc) normal() calls would """
+        loc = np.asarray(loc)
+        n = loc.size
+        i = self._n_index
+        if i + n > len(self._normals):
+            self._spent += i
+            self._normals, i = self._normals[i:], 0
+            while len(self._normals) < n:
+                self._normals += self.generator.standard_normal(self.block_size).tolist()
+        self._n_index = i + n
+        return loc + np.asarray(scale) * np.reshape(self._normals[i:i + n], loc.shape)
+
+
+class AliasTable():
+    """
+    Walker/Vose alias table: O(1) draws from a fixed discrete distribution with a single
+    uniform (its integer part picks a column, its fractional part decides between the
+    column and its alias). Built once; every draw is a couple of list lookups.
+    """
+
+    def __init__(self, weights):
+        p = np.asarray(weights, dtype=float)
+        n = len(p)
+        scaled = (p / p.sum() * n).tolist()
+        prob, alias = [1.0] * n, list(range(n))
+        small = [i for i, v in enumerate(scaled) if v < 1.0]
+        large = [i for i, v in enumerate(scaled) if v >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 up to rounding error: always keep the column
+        self.n = n
+        self._prob, self._alias = prob, alias
+        self.prob, self.alias = np.array(prob), np.array(alias)
+
+    def draw(self, u):
+        """ One index from one uniform in [0, 1) """
+        x = u * self.n
+        i = int(x)
+        return i if x - i < self._prob[i] else self._alias[i]
+
+    def draw_many(self, u):
+        """ One index per uniform in the array u """
+        return self.draw_rows(np.broadcast_to(self.prob, (len(u), self.n)),
+                              np.broadcast_to(self.alias, (len(u), self.n)), u)
+
+    @staticmethod
+    def draw_rows(prob, alias, u):
+        """ Batched draws where row k has its own table: prob/alias are (m, n) stacks
+        of tables (see stack) and u holds one uniform per row """
+        n = prob.shape[-1]
+        x = np.asarray(u) * n
+        col = np.minimum(x.astype(np.int64), n - 1)
+        rows = np.arange(len(col))
+        keep = (x - col) < prob[rows, col]
+        return np.where(keep, col, alias[rows, col])
+
+    @staticmethod
+    def stack(tables):
+        """ (prob, alias) arrays for draw_rows from equally sized tables """
+        return np.stack([t.prob for t in tables]), np.stack([t.alias for t in tables])
@@ -0,0 +1,184 @@
+"""
+Name: week_pipeline.py
+Description: Pipelined period execution for SeasonRunner(pipeline=True). A
+    plain run_period loads every team, plays the weeks and writes them, one
+    after another on one thread, so the simulation sits idle through every
+    database round trip. WeekPipeline splits the period into three stages
+    joined by bounded queues:
+
+      prefetch  -- a thread loading, a week ahead, the teams that week brings
+                   into the period for the first time;
+      simulate  -- the caller's thread: plays the week on the PeriodSession's
+                   live teams and detaches its writes (team snapshots + games);
+      persist   -- a thread writing each detached week, in week order, while
+                   the next one plays.
+
+    A team's state from week w is what week w+1 plays with: the live copy in
+    the session's identity map, never a reload. Prefetch only ever loads teams
+    the period has not touched yet (and PeriodSession.adopt keeps a live copy
+    over a prefetched one), and the one persist thread writes weeks in order,
+    so the store sees week w's save before week w+1's.
+
+    Each stage's busy time is kept; stats (a PipelineStats) reports them as a
+    share of the period's wall time -- the stage nearest 1.0 is the
+    bottleneck. Simulate is busy whenever the caller is not waiting on the
+    other two.
+
+    A failed write stops the persist stage; later weeks are dropped and the
+    error is raised on the caller's next persist() or at close(), chained to
+    the original (compare BufferedRecordSink).
+Author: design sketch
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from handball.domain import Team
+from handball.league_views import TeamId
+from handball.period_session import PendingWrites
+from handball.repository import TeamRepository
+
+PREFETCH = "prefetch"
+SIMULATE = "simulate"
+PERSIST = "persist"
+
+_STOP = object()
+
+
+class PipelineError(RuntimeError):
+    """A pipeline stage thread failed."""
+
+
+@dataclass
+class PipelineStats:
+    """Busy seconds per stage over one period's `wall_seconds`."""
+
+    wall_seconds: float = 0.0
+    busy_seconds: dict[str, float] = field(default_factory=dict)
+
+    def utilisation(self) -> dict[str, float]:
+        """Each stage's busy time as a share of the wall time."""
+        if self.wall_seconds <= 0:
+            return {stage: 0.0 for stage in self.busy_seconds}
+        return {stage: busy / self.wall_seconds for stage, busy in self.busy_seconds.items()}
+
+    @property
+    def bottleneck(self) -> str:
+        return max(self.busy_seconds, key=self.busy_seconds.get)
+
+
+class WeekPipeline:
+    """Prefetch + persist threads around the caller's simulate stage. `weeks`
+    lists each week of the run with the teams it plays, in order. `depth` is
+    how many weeks each queue may run ahead."""
+
+    def __init__(
+        self, repo: TeamRepository, weeks: list[tuple[int, list[TeamId]]], *, depth: int = 1
+    ) -> None:
+        self.repo = repo
+        self.weeks = weeks
+        self._started = time.perf_counter()
+        self._waiting = 0.0                  # the caller's time blocked on the other stages
+        self._busy = {PREFETCH: 0.0, PERSIST: 0.0}
+        self._error: BaseException | None = None
+        self._stop = threading.Event()
+        self._loaded: queue.Queue = queue.Queue(maxsize=depth)
+        self._pending: queue.Queue = queue.Queue(maxsize=depth)
+        self._prefetcher = threading.Thread(target=self._prefetch, name="WeekPipeline-prefetch", daemon=True)
+        self._persister = threading.Thread(target=self._persist, name="WeekPipeline-persist", daemon=True)
+        self._prefetcher.start()
+        self._persister.start()
+        self.stats: PipelineStats | None = None
+
+    # -- the simulate stage's side -----------------------------------------
+    def teams_for(self, week: int) -> list[Team]:
+        """The teams `week` loads for the first time (blocks until prefetched)."""
+        started = time.perf_counter()
+        item = self._loaded.get()
+        self._waiting += time.perf_counter() - started
+        if isinstance(item, BaseException):
+            raise PipelineError(f"prefetching week {week} failed: {item!r}") from item
+        loaded_week, teams = item
+        if loaded_week != week:
+            raise PipelineError(f"expected week {week} from prefetch, got week {loaded_week}")
+        return teams
+
+    def persist(self, pending: PendingWrites, then: Callable[..., None] | None = None) -> None:
+        """Queue a week's detached writes (blocks while the persist queue is full)."""
+        self._raise_if_failed()
+        started = time.perf_counter()
+        self._pending.put((pending, then))
+        self._waiting += time.perf_counter() - started
+
+    def close(self, *, check: bool = True) -> PipelineStats:
+        """Stop prefetching, wait for every queued write, and record stats.
+        Raises PipelineError if a write failed (unless `check` is False)."""
+        self._stop.set()
+        while True:                          # unblock a prefetcher waiting on a full queue
+            try:
+                self._loaded.get_nowait()
+            except queue.Empty:
+                break
+        self._prefetcher.join()
+        started = time.perf_counter()
+        self._pending.put(_STOP)
+        self._persister.join()
+        self._waiting += time.perf_counter() - started
+
+        wall = time.perf_counter() - self._started
+        self.stats = PipelineStats(wall, {
+            PREFETCH: self._busy[PREFETCH],
+            SIMULATE: max(0.0, wall - self._waiting),
+            PERSIST: self._busy[PERSIST],
+        })
+        if check:
+            self._raise_if_failed()
+        return self.stats
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise PipelineError(f"persisting a week failed: {self._error!r}") from self._error
+
+    # -- stage threads -----------------------------------------------------
+    def _prefetch(self) -> None:
+        seen: set[TeamId] = set()
+        for week, team_ids in self.weeks:
+            new = [t for t in team_ids if t not in seen]
+            seen.update(new)
+            started = time.perf_counter()
+            try:
+                item = (week, self.repo.load_many(new))
+            except Exception as e:  # noqa: BLE001 - handed to the simulate stage
+                item = e
+            self._busy[PREFETCH] += time.perf_counter() - started
+            if not self._offer(item) or isinstance(item, BaseException):
+                return
+
+    def _offer(self, item) -> bool:
+        """Put `item` on the loaded queue unless the pipeline is closing."""
+        while not self._stop.is_set():
+            try:
+                self._loaded.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _persist(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is _STOP:
+                return
+            if self._error is not None:
+                continue                     # already failed: drop later weeks
+            pending, then = item
+            started = time.perf_counter()
+            try:
+                pending.write(then)
+            except Exception as e:  # noqa: BLE001 - handed to the simulate stage
+                self._error = e
+            self._busy[PERSIST] += time.perf_counter() - started
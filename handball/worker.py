@@ -0,0 +1,177 @@
+"""
+Name: worker.py
+Description: Simulation worker: drains the sim_jobs queue (see sim_jobs). Run as
+    many as you like, on one machine or several -- each needs only
+    $HANDBALL_DB_URL:
+
+        python -m handball.worker              # poll forever
+        python -m handball.worker --drain      # exit once nothing is runnable
+
+    Each job runs in ONE transaction that claims it, plays it and writes it:
+      - a 'game' job loads both teams, plays the fixture with its queued seed and
+        writes both teams and the game row (a PeriodSession flushed into the
+        claim's transaction), then advances the season checkpoint to the week
+        before -- every earlier week is done, or the job would not have been
+        claimable;
+      - a 'period_end' job runs the InjurySimulator over the period's teams
+        (its RNG restored from the season checkpoint, as SeasonRunner does),
+        saves the checkpoint at the period's last week and advances the cursor.
+    Either commits together with the job's 'done' mark or not at all.
+
+    Progress goes out on a PostgresProgressBus: a game's event (and a
+    period_end's injuries and period events) is NOTIFYed inside the job's
+    transaction. Which game completes a week is only known after commit, so
+    the week event is sent then -- twice, at worst, if the week's last two
+    games finish together.
+Author: season-run wiring
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from handball import schedule_repository as sched_repo
+from handball import sim_jobs
+from handball.db import get_engine
+from handball.injury_simulator import InjurySimulator
+from handball.orchestration import GameEngine, GameSimulatorAdapter, SeasonOrchestrator
+from handball.period_session import PeriodSession
+from handball.pg_record_sink import PostgresRecordSink
+from handball.pg_repository import PostgresTeamRepository
+from handball.progress import (
+    GAME_FINISHED, INJURIES_PROCESSED, PERIOD_DONE, WEEK_COMMITTED, PostgresProgressBus, ProgressEvent,
+    ProgressPublisher,
+)
+from handball.season import Checkpoint
+from handball.sim_jobs import Job
+
+DEFAULT_POLL_SECONDS = 2.0
+
+
+class Worker:
+    """Claims and runs sim_jobs against `engine` (the SQL engine, not the game
+    engine -- that is `game_engine`, the production GameSimulatorAdapter by
+    default)."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        game_engine: GameEngine | None = None,
+        progress: ProgressPublisher | None = None,
+    ) -> None:
+        self.engine = engine
+        self.repo = PostgresTeamRepository(engine)
+        self.game_engine = game_engine or GameSimulatorAdapter(allow_tie=False)
+        self.progress = progress if progress is not None else PostgresProgressBus(engine)
+        self._sinks: dict[int, PostgresRecordSink] = {}   # per season; keeps its id caches warm
+
+    def run_once(self) -> bool:
+        """Run one job if one is runnable. False when the queue had nothing to
+        hand out. A job that raises is recorded as failed (sim_jobs.fail), not
+        re-raised."""
+        job = None
+        try:
+            with self.engine.begin() as conn:
+                job = sim_jobs.claim(conn)
+                if job is None:
+                    return False
+                if job.kind == sim_jobs.GAME:
+                    self._play_game(conn, job)
+                else:
+                    self._end_period(conn, job)
+                sim_jobs.complete(conn, job)
+        except Exception as e:  # noqa: BLE001 - surfaced on the job + season_state
+            if job is None:
+                raise
+            sim_jobs.fail(self.engine, job, f"{_describe(job)}: {e}")
+            return True
+        if job.kind == sim_jobs.GAME and sim_jobs.stage_done(self.engine, job):
+            self.progress.publish(ProgressEvent(WEEK_COMMITTED, job.season, job.period, job.week))
+        return True
+
+    def drain(self) -> int:
+        """Run jobs until none is runnable; returns how many ran."""
+        n = 0
+        while self.run_once():
+            n += 1
+        return n
+
+    def serve(self, poll_seconds: float = DEFAULT_POLL_SECONDS) -> None:
+        """Run jobs forever, sleeping `poll_seconds` whenever the queue is idle."""
+        while True:
+            if not self.run_once():
+                time.sleep(poll_seconds)
+
+    # -- job kinds ---------------------------------------------------------
+    def _orchestrator(self, season: int) -> SeasonOrchestrator:
+        return SeasonOrchestrator(
+            team_repo=self.repo,
+            gateway=None,
+            engine=self.game_engine,
+            record_sink=self._sinks.setdefault(season, PostgresRecordSink(self.engine, season=season)),
+        )
+
+    def _play_game(self, conn, job: Job) -> None:
+        session = PeriodSession(self._orchestrator(job.season))
+        result = session.orch.simulate_matchup(job.home, job.away, week=job.week, seed=job.seed)
+        session.flush(conn=conn)
+        self.progress.publish(
+            ProgressEvent(GAME_FINISHED, job.season, job.period, job.week, job.home, job.away,
+                          result.home_score, result.away_score),
+            conn=conn,
+        )
+        conn.execute(
+            text("update season_state set checkpoint_week = greatest(checkpoint_week, :w) "
+                 "where season = :s"),
+            {"s": job.season, "w": job.week - 1},
+        )
+
+    def _end_period(self, conn, job: Job) -> None:
+        schedule = sched_repo.load_schedule(self.engine, job.season)
+        _, end = sim_jobs.period_weeks(schedule, job.period)
+        store = sched_repo.PostgresCheckpointStore(self.engine, job.season)
+        checkpoint = store.load()
+        if checkpoint.week < end:      # else the injuries already committed (a resumed run)
+            state = sched_repo.get_season_state(self.engine, job.season) or {}
+            injuries = InjurySimulator(rng=random.Random(state.get("injury_seed")), year=job.season)
+            if checkpoint.injury_rng_state is not None:
+                injuries.restore_rng_state(checkpoint.injury_rng_state)
+            team_ids = sorted({t for pair in schedule.period(job.period) for t in pair})
+            session = PeriodSession(self._orchestrator(job.season))
+            injuries.process_period_end(session.orch, team_ids, chunk=job.period)
+            session.flush(conn=conn)
+            store.save(Checkpoint(end, injuries.rng_state()), conn=conn)
+            self.progress.publish(ProgressEvent(INJURIES_PROCESSED, job.season, job.period, end), conn=conn)
+        sched_repo.finish_period(conn, job.season, job.period)
+        self.progress.publish(ProgressEvent(PERIOD_DONE, job.season, job.period), conn=conn)
+
+
+def _describe(job: Job) -> str:
+    if job.kind == sim_jobs.GAME:
+        return f"week {job.week} {job.home} vs {job.away}"
+    return f"period {job.period} end"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Drain the sim_jobs queue.")
+    ap.add_argument("--db-url", default=None, help="overrides $HANDBALL_DB_URL")
+    ap.add_argument("--drain", action="store_true", help="exit once no job is runnable")
+    ap.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS,
+                    help="seconds to sleep while the queue is idle")
+    args = ap.parse_args()
+
+    worker = Worker(get_engine(args.db_url))
+    if args.drain:
+        print(f"ran {worker.drain()} job(s)")
+        return 0
+    worker.serve(args.poll)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""
+Time full-length games on each GameSimulator possession kernel and report the
+per-game cost against the "loop" kernel. Every kernel plays the same random
+pairings of the datafiles_v2 teams from the same per-game seeds, so "flat" (which
+replays "loop" draw for draw) must also report identical total goals.
+
+    python -m scripts.bench_kernels                        # 20 games per kernel
+    python -m scripts.bench_kernels --games 100 --kernels loop flat
+    python -m scripts.bench_kernels --repeat 3             # best of 3 per kernel
+
+Runs after the first in a process see warm per-process caches (e.g. the chain
+kernel's possession tables), as every game after the first few of a season does.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from handball.game_simulator import KERNELS, GameSimulator
+from handball.repository import JsonTeamRepository
+from handball.surrogate_engine import DEFAULT_DATAFILES
+from handball.utils import RandomSource
+
+
+def bench(kernel: str, pairs, seeds) -> tuple[float, int]:
+    """(seconds per game, total goals) for one kernel over the given games."""
+    goals = 0
+    start = time.perf_counter()
+    for (home, away), seed in zip(pairs, seeds):
+        sim = GameSimulator(home, away, kernel=kernel, rng=RandomSource(seed), record_events=False)
+        sim.simulate_game()
+        goals += sim.home_score + sim.away_score
+    return (time.perf_counter() - start) / len(pairs), goals
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kernels", nargs="+", choices=KERNELS, default=list(KERNELS))
+    parser.add_argument("--repeat", type=int, default=1, help="report the best of this many runs")
+    args = parser.parse_args(argv)
+
+    teams = JsonTeamRepository(DEFAULT_DATAFILES).load_all()
+    rng = np.random.default_rng(args.seed)
+    picks = [rng.choice(len(teams), 2, replace=False) for _ in range(args.games)]
+    seeds = rng.integers(0, 2**32, args.games).tolist()
+
+    baseline = None
+    for kernel in args.kernels:
+        runs = []
+        for _ in range(args.repeat):
+            # Fresh teams per run so season logs do not grow across runs
+            fresh = JsonTeamRepository(DEFAULT_DATAFILES).load_all()
+            pairs = [(fresh[h], fresh[a]) for h, a in picks]
+            runs.append(bench(kernel, pairs, seeds))
+        per_game, goals = min(runs)
+        baseline = baseline or (per_game if kernel == "loop" else None)
+        speedup = f"  {baseline / per_game:5.2f}x vs loop" if baseline else ""
+        print(f"{kernel:>6}: {per_game * 1e3:8.1f} ms/game  goals={goals}{speedup}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,169 @@
+"""
+Measure what db.pipeline saves on a slow link. A local TCP proxy in front of the
+dev Postgres adds a fixed one-way delay to every packet (a netem/toxiproxy
+stand-in, no root needed) and counts round trips -- each time the client starts
+sending again after the server has answered. Every write path that uses
+db.pipeline then runs twice, with pipeline mode off and on:
+
+    save      PostgresTeamRepository.save of a team it has not seen (full write)
+    game      PostgresRecordSink.record_game of one simulated game
+    trade     trade_service._rearrange_team (the lineup rebuild approve_trade does)
+    rollover  offseason._extend_future_pick_window (advance_season's pick window)
+
+Each run happens inside a transaction that is rolled back, so the database is
+left as it was; it still refuses anything but a local Postgres. Run:
+
+    python -m scripts.bench_pipeline                     # 20 ms each way
+    python -m scripts.bench_pipeline --latency-ms 40 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import queue
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+from handball import offseason, trade_service
+from handball.db import db_url, get_engine, is_local_db
+from handball.league_views import DEFAULT_RULES
+from handball.orchestration import GameSimulatorAdapter
+from handball.pg_record_sink import PostgresRecordSink
+from handball.pg_repository import PostgresTeamRepository
+
+
+class LatencyProxy:
+    """Forward 127.0.0.1:<port> to `target`, delaying every chunk by `delay`
+    seconds in each direction, and count the client's round trips."""
+
+    def __init__(self, target: tuple[str, int], delay: float) -> None:
+        self.target = target
+        self.delay = delay
+        self.round_trips = 0
+        self._sending = False          # the client spoke last
+        self._lock = threading.Lock()
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            client, _ = self._listener.accept()
+            upstream = socket.create_connection(self.target)
+            for sock in (client, upstream):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._pipe(client, upstream, upstream=True)
+            self._pipe(upstream, client, upstream=False)
+
+    def _pipe(self, src: socket.socket, dst: socket.socket, *, upstream: bool) -> None:
+        """A reader stamps each chunk with its due time; a writer sends it then,
+        so back-to-back chunks share the delay instead of queueing behind it."""
+        chunks: queue.Queue = queue.Queue()
+
+        def read() -> None:
+            while True:
+                data = src.recv(65536)
+                with self._lock:
+                    if data and upstream and not self._sending:
+                        self.round_trips += 1
+                    self._sending = upstream
+                chunks.put((time.monotonic() + self.delay, data))
+                if not data:
+                    return
+
+        def write() -> None:
+            while True:
+                due, data = chunks.get()
+                time.sleep(max(0.0, due - time.monotonic()))
+                if not data:
+                    dst.shutdown(socket.SHUT_WR)
+                    return
+                dst.sendall(data)
+
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
+
+
+def measure(engine, proxy: LatencyProxy, work) -> tuple[int, int, float]:
+    """(statements, round trips, seconds) for `work(conn)`, run in a
+    transaction that is rolled back afterwards."""
+    statements = 0
+
+    def count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    with engine.connect() as conn:
+        conn.execute(text("select 1"))         # connect + session setup, not counted
+        conn.rollback()
+        event.listen(engine, "before_cursor_execute", count)
+        trips, start = proxy.round_trips, time.perf_counter()
+        try:
+            work(conn)                         # autobegins the transaction
+            elapsed = time.perf_counter() - start
+            trips = proxy.round_trips - trips
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+            conn.rollback()
+    return statements, trips, elapsed
+
+
+def workloads(engine):
+    """name -> work(conn), each repeatable on a rolled-back transaction."""
+    repo = PostgresTeamRepository(engine)
+    slugs = repo.all_team_ids()
+    if len(slugs) < 2:
+        raise SystemExit("need at least two teams in the database (run migrate_json_to_pg)")
+    home, away = repo.load(slugs[0]), repo.load(slugs[1])
+    np.random.seed(0)
+    result = GameSimulatorAdapter().play(home, away)
+    with engine.connect() as conn:
+        team_uuid = conn.execute(text("select id from teams where slug = :s"),
+                                 {"s": slugs[0]}).scalar_one()
+        season = conn.execute(text("select coalesce(max(season), 2026) from season_state")).scalar_one()
+    sink = PostgresRecordSink(engine, season=season)
+
+    return {
+        "save": lambda conn: PostgresTeamRepository(engine).save(home, conn=conn),
+        "game": lambda conn: sink.record_game(result, week=1, conn=conn),
+        "trade": lambda conn: trade_service._rearrange_team(conn, team_uuid, DEFAULT_RULES),
+        "rollover": lambda conn: offseason._extend_future_pick_window(conn, season + 50),
+    }
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="one-way delay")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    url = make_url(db_url())
+    if not is_local_db(str(url)):
+        print("refusing to run against a non-local database", file=sys.stderr)
+        return 2
+    proxy = LatencyProxy((url.host or "localhost", url.port or 5432), args.latency_ms / 1e3)
+    proxied = url.set(host="127.0.0.1", port=proxy.port).render_as_string(hide_password=False)
+    modes = {"off": get_engine(proxied).execution_options(pipeline=False),
+             "on": get_engine(proxied).execution_options(pipeline=True)}
+
+    print(f"one-way latency {args.latency_ms:g} ms, best of {args.repeat}")
+    print(f"{'':>9} {'stmts':>6} {'trips off':>10} {'trips on':>9} {'ms off':>8} {'ms on':>8}")
+    work = workloads(modes["off"])
+    for name, fn in work.items():
+        row = {}
+        for mode, engine in modes.items():
+            runs = [measure(engine, proxy, fn) for _ in range(args.repeat)]
+            row[mode] = min(runs, key=lambda r: r[2])
+        (stmts, trips_off, t_off), (_, trips_on, t_on) = row["off"], row["on"]
+        print(f"{name:>9} {stmts:>6} {trips_off:>10} {trips_on:>9} "
+              f"{t_off * 1e3:>8.1f} {t_on * 1e3:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -9,7 +9,7 @@ setup(
     install_requires=[
         "numpy>=1.26",          # used by handball.players / domain (core import path)
         "sqlalchemy>=2",
-        "psycopg[binary]>=3",
+        "psycopg[binary]>=3.2",  # notifies(timeout=...) in progress.PostgresProgressBus
         "alembic>=1.13",
     ],
     extras_require={
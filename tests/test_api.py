@@ -189,6 +189,7 @@ def test_multi_team_owner_can_edit_each_owned_team(client, two_teams):
 
 # -- season simulation endpoints -------------------------------------------
 from handball import schedule_repository as sched_repo  # noqa: E402
+from handball.worker import Worker  # noqa: E402
 
 # _active_season() falls back to DEFAULT_SEASON when no games/season_state exist.
 _SEASON = 2026
@@ -196,13 +197,13 @@ _SEASON = 2026
 
 @pytest.fixture(autouse=True)
 def _clean_season_tables():
-    """season_state / schedule_games aren't in the shared truncate list; clear them
-    around each test so _active_season() and the run cursor start fresh."""
+    """season_state / schedule_games / sim_jobs aren't in the shared truncate list;
+    clear them around each test so _active_season() and the run cursor start fresh."""
     with _engine.begin() as c:
-        c.execute(text("truncate season_state, schedule_games restart identity cascade"))
+        c.execute(text("truncate season_state, schedule_games, sim_jobs restart identity cascade"))
     yield
     with _engine.begin() as c:
-        c.execute(text("truncate season_state, schedule_games restart identity cascade"))
+        c.execute(text("truncate season_state, schedule_games, sim_jobs restart identity cascade"))
 
 
 def _seed_one_week_schedule(season: int = _SEASON):
@@ -231,11 +232,15 @@ def test_season_state_reports_cursor(client, two_teams):
 def test_run_period_persists_games_and_advances_cursor(client, two_teams):
     _seed_one_week_schedule()
     _as_manager("", role="commissioner")
-    # The run is a background job; the TestClient runs it to completion before the
-    # 202 returns, so by the next line the period has finished.
+    # The API only queues the period (one game + the period_end job); a worker
+    # plays it.
     r = client.post("/periods/run")
     assert r.status_code == 202, r.text
     assert r.json()["run_status"] == "running"
+    assert r.json()["jobs"] == 2
+    assert client.get("/season/state").json()["run_progress"] == {
+        "total": 2, "done": 0, "queued": 2, "failed": 0}
+    assert Worker(_engine).drain() == 2
 
     with _engine.connect() as c:
         n_games = c.execute(text("select count(*) from games where season=:s"), {"s": _SEASON}).scalar_one()
@@ -247,6 +252,7 @@ def test_run_period_persists_games_and_advances_cursor(client, two_teams):
     assert state["run_status"] == "done"
     assert state["periods_run"] == 1
     assert state["next_period"] == 2
+    assert state["run_progress"]["done"] == 2
 
     # a game row carries its week (regression guard: week used to land NULL)
     with _engine.connect() as c:
@@ -374,6 +380,78 @@ def test_reset_rejected_while_genuinely_running(client, two_teams):
     assert "in progress" in r.json()["detail"].lower()
 
 
+def test_resume_skips_committed_weeks_and_finishes_the_period(client, two_teams):
+    _seed_one_week_schedule()
+    # the run died after week 1 committed: its game is kept, not replayed
+    with _engine.begin() as c:
+        c.execute(
+            text("update season_state set run_status='error', run_period=1, run_error='boom', "
+                 "checkpoint_week=1 where season=:s"),
+            {"s": _SEASON},
+        )
+    _as_manager("", role="commissioner")
+
+    r = client.post("/periods/resume")
+    assert r.status_code == 202, r.text
+    assert r.json()["resume_after_week"] == 1
+    assert Worker(_engine).drain() == 1          # just the period_end job
+
+    with _engine.connect() as c:
+        assert c.execute(text("select count(*) from games where season=:s"), {"s": _SEASON}).scalar_one() == 0
+    state = client.get("/season/state").json()
+    assert state["run_status"] == "done"
+    assert state["periods_run"] == 1
+
+
+def test_run_period_checkpoints_each_week(client, two_teams):
+    _seed_one_week_schedule()
+    _as_manager("", role="commissioner")
+    assert client.post("/periods/run").status_code == 202
+    Worker(_engine).drain()
+    assert client.get("/season/state").json()["checkpoint_week"] == 1
+
+
+def test_failed_job_blocks_the_period_until_resumed(client, two_teams):
+    _seed_one_week_schedule()
+    _as_manager("", role="commissioner")
+    assert client.post("/periods/run").status_code == 202
+    with _engine.begin() as c:   # a fixture no worker can load
+        c.execute(text("update sim_jobs set away_slug = 'Atlantis' where kind = 'game'"))
+    Worker(_engine).drain()
+
+    state = client.get("/season/state").json()
+    assert state["run_status"] == "error"
+    assert "Atlantis" in state["run_error"]
+    assert state["run_progress"] == {"total": 2, "done": 0, "queued": 1, "failed": 1}
+
+    with _engine.begin() as c:
+        c.execute(text("update sim_jobs set away_slug = 'Denver' where kind = 'game'"))
+    assert client.post("/periods/resume").status_code == 202
+    assert Worker(_engine).drain() == 2
+    state = client.get("/season/state").json()
+    assert state["run_status"] == "done"
+    assert state["periods_run"] == 1
+
+
+def test_reset_drops_the_period_jobs(client, two_teams):
+    _seed_one_week_schedule()
+    _as_manager("", role="commissioner")
+    assert client.post("/periods/run").status_code == 202
+    with _engine.begin() as c:
+        c.execute(text("update season_state set updated_at = now() - interval '10 minutes'"))
+    assert client.post("/periods/reset").status_code == 200
+    with _engine.connect() as c:
+        assert c.execute(text("select count(*) from sim_jobs")).scalar_one() == 0
+
+
+def test_resume_requires_an_interrupted_run(client, two_teams):
+    _seed_one_week_schedule()
+    _as_manager("", role="commissioner")
+    r = client.post("/periods/resume")
+    assert r.status_code == 409
+    assert "nothing to resume" in r.json()["detail"].lower()
+
+
 # -- offseason endpoints ---------------------------------------------------
 def test_advance_requires_complete_season(client, two_teams):
     # season_state exists but the regular season isn't finished
@@ -441,3 +519,30 @@ def test_internal_trade_auto_accepts_then_commissioner_commits(client, two_teams
     assert client.post(f"/trades/{trade_id}/approve").json()["status"] == "committed"
     assert repo.load("Denver").get("boston-r1") is not None
     assert repo.load("Boston").get("denver-f5") is not None
+
+
+def test_progress_stream_closes_its_subscription_when_the_client_leaves(monkeypatch):
+    import asyncio
+
+    from api import main
+    from handball.progress import WEEK_COMMITTED, ProgressBus, ProgressEvent
+
+    bus = ProgressBus()
+    monkeypatch.setattr(main, "progress", bus)
+
+    class _Request:
+        """Connected for one poll (during which a week is reported), then gone."""
+        polls = 0
+
+        async def is_disconnected(self):
+            self.polls += 1
+            if self.polls == 1:
+                bus.publish(ProgressEvent(WEEK_COMMITTED, 2026, 1, 1))
+            return self.polls > 1
+
+    async def consume():
+        return [chunk async for chunk in main._progress_stream(_Request())]
+
+    chunks = asyncio.run(consume())
+    assert len(chunks) == 1 and chunks[0].startswith(f"event: {WEEK_COMMITTED}\n")
+    assert bus._subscribers == []
@@ -0,0 +1,160 @@
+"""
+BatchGameSimulator plays many games in lockstep and must be a drop-in GameEngine:
+same GameResult shape as GameSimulatorAdapter, same mutations on the domain
+teams, and the same game statistically. Regulation is shortened here so the
+scalar comparison stays fast.
+
+`pytest tests/test_batch_simulator.py` or `python tests/test_batch_simulator.py`.
+"""
+import numpy as np
+
+import handball.game_simulator as game_simulator
+from handball.batch_simulator import BatchGameEngine, BatchGameSimulator
+from handball.domain import Player, Team
+from handball.orchestration import (
+    GameEngine,
+    GameSimulatorAdapter,
+    InMemoryRecordSink,
+    SeasonOrchestrator,
+)
+from handball.repository import InMemoryTeamRepository
+
+SHORT = 600  # seconds of regulation
+
+
+def _team(team_id: str) -> Team:
+    def p(pid, name, pos, off=5.0, deff=5.0, gk=0.1):
+        return Player(id=f"{team_id}-{pid}", name=f"{team_id} {name}", position=pos,
+                      offense=off, defense=deff, goalie_skill=gk, variance=0.5)
+
+    return Team(
+        id=team_id, name=f"{team_id} FC", coaches=["HC", "OC", "DC"],
+        starters={
+            "Forward": [p("f1", "F1", "Forward", off=7), p("f2", "F2", "Forward", off=6), p("f3", "F3", "Forward", off=6)],
+            "Midfielder": [p("m1", "M1", "Midfielder"), p("m2", "M2", "Midfielder"), p("m3", "M3", "Midfielder")],
+            "Defense": [p("d1", "D1", "Defense", deff=7), p("d2", "D2", "Defense", deff=7), p("d3", "D3", "Defense", deff=6)],
+            "Goalie": [p("g1", "G1", "Goalie", off=0.1, deff=0.1, gk=6.0)],
+        },
+        bench={
+            "Forward": [p("f4", "F4", "Forward"), p("f5", "F5", "Forward")],
+            "Midfielder": [p("m4", "M4", "Midfielder"), p("m5", "M5", "Midfielder")],
+            "Defense": [p("d4", "D4", "Defense"), p("d5", "D5", "Defense")],
+            "Goalie": [p("g2", "G2", "Goalie", off=0.1, deff=0.1, gk=5.0)],
+        },
+        reserves=[p("r1", "R1", "Forward"), p("r2", "R2", "Defense")],
+    )
+
+
+def _pairs(n):
+    return [(_team(f"H{i}"), _team(f"A{i}")) for i in range(n)]
+
+
+def test_batch_engine_satisfies_protocol():
+    assert isinstance(BatchGameEngine(), GameEngine)
+
+
+def test_play_many_returns_one_result_per_pair_in_order():
+    np.random.seed(3)
+    pairs = _pairs(25)
+    results = BatchGameEngine(regulation_time=SHORT).play_many(pairs)
+
+    assert [(r.home_id, r.away_id) for r in results] == [(h.id, a.id) for h, a in pairs]
+    for (home, away), r in zip(pairs, results):
+        assert r.home_score != r.away_score            # allow_tie=False resolves in OT
+        assert sum(home.record) == 1 and sum(away.record) == 1
+        if r.home_score > r.away_score:
+            assert home.record == (1, 0, 0) and away.record == (0, 1, 0)
+
+
+def test_player_lines_match_adapter_shape_and_reconcile():
+    np.random.seed(5)
+    pairs = _pairs(10)
+    results = BatchGameEngine(regulation_time=SHORT).play_many(pairs)
+
+    for (home, away), r in zip(pairs, results):
+        assert set(r.player_lines) == {p.id for p in home.roster()} | {p.id for p in away.roster()}
+        for line in r.player_lines.values():
+            assert set(line) == {"goals", "shots", "saves", "goals_allowed", "performance"}
+        assert sum(r.player_lines[p.id]["goals"] for p in home.roster()) == r.home_score
+        assert sum(r.player_lines[p.id]["goals"] for p in away.roster()) == r.away_score
+        # goals allowed by a side's goalies are the other side's goals
+        home_ga = sum(r.player_lines[p.id]["goals_allowed"] for p in home.roster())
+        assert home_ga == r.away_score
+
+
+def test_ties_allowed_skip_overtime():
+    np.random.seed(11)
+    results = BatchGameEngine(allow_tie=True, regulation_time=SHORT).play_many(_pairs(40))
+    assert not any(r.went_to_overtime for r in results)
+
+
+def test_same_seed_same_results():
+    a = BatchGameEngine(seed=9, regulation_time=SHORT)
+    b = BatchGameEngine(seed=9, regulation_time=SHORT)
+    np.random.seed(1)
+    ra = a.play_many(_pairs(8))
+    np.random.seed(1)
+    rb = b.play_many(_pairs(8))
+    assert [(r.home_score, r.away_score) for r in ra] == [(r.home_score, r.away_score) for r in rb]
+
+
+def test_seeded_game_does_not_depend_on_the_rest_of_the_batch():
+    np.random.seed(3)
+    alone = BatchGameEngine(regulation_time=SHORT).play(_team("H"), _team("A"), seed=123)
+    np.random.seed(5)
+    pairs = _pairs(4) + [(_team("H"), _team("A"))]
+    batched = BatchGameEngine(regulation_time=SHORT).play_many(pairs, [1, 2, 3, 4, 123])[-1]
+    assert batched.seed == 123
+    assert (batched.home_score, batched.away_score) == (alone.home_score, alone.away_score)
+    assert batched.player_lines == alone.player_lines
+
+
+def test_team_in_several_games_gets_each_game_in_order():
+    np.random.seed(2)
+    home, other = _team("H"), _team("A")
+    results = BatchGameSimulator(
+        [(home, other), (other, home), (home, other)], regulation_time=SHORT
+    ).simulate()
+
+    assert sum(home.record) == 3
+    f1 = home.starters["Forward"][0]
+    assert len(f1.current_season_log["goals"]) == 3
+    assert [r.player_lines[f1.id]["performance"] for r in results] == f1.current_season_log["performances"]
+    assert [r.player_lines[f1.id]["goals"] for r in results] == f1.current_season_log["goals"]
+
+
+def test_orchestrator_runs_unchanged_on_batch_engine():
+    np.random.seed(4)
+    repo = InMemoryTeamRepository()
+    repo.save(_team("Boston"))
+    repo.save(_team("New York"))
+    orch = SeasonOrchestrator(repo, None, BatchGameEngine(regulation_time=SHORT), InMemoryRecordSink())
+
+    results = orch.run_period([("Boston", "New York")])
+
+    assert len(results) == 1
+    assert sum(repo.load("Boston").record) == 1
+    assert len(orch.record_sink.games) == 1
+
+
+def test_batch_matches_scalar_simulator_statistically(monkeypatch):
+    monkeypatch.setattr(game_simulator, "REGULATION_TIME", SHORT)
+    np.random.seed(0)
+    scalar = [GameSimulatorAdapter().play(h, a) for h, a in _pairs(200)]
+    np.random.seed(0)
+    batch = BatchGameEngine(regulation_time=SHORT).play_many(_pairs(2000))
+
+    def mean_total(results):
+        return np.mean([r.home_score + r.away_score for r in results])
+
+    def mean_shots(results):
+        return np.mean([sum(line["shots"] for line in r.player_lines.values()) for r in results])
+
+    assert abs(mean_total(batch) - mean_total(scalar)) < 0.1 * mean_total(scalar)
+    assert abs(mean_shots(batch) - mean_shots(scalar)) < 0.1 * mean_shots(scalar)
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
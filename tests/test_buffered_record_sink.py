@@ -0,0 +1,130 @@
+"""
+Offline tests for BufferedRecordSink: games reach the wrapped sink in order,
+batched by size or by time; flush()/close() wait for the writer; and a failed
+background write is raised back to the caller (and to SeasonRunner).
+
+`pytest tests/test_buffered_record_sink.py` or `python tests/test_buffered_record_sink.py`.
+"""
+import threading
+import time
+
+import pytest
+
+from handball.buffered_record_sink import BufferedRecordSink, RecordSinkError
+from handball.domain import Player, Team
+from handball.orchestration import GameResult, InMemoryRecordSink, SeasonOrchestrator, SimpleGameEngine
+from handball.repository import InMemoryTeamRepository
+from handball.season import Schedule, SeasonRunner
+
+
+def _team(tid):
+    def p(pid, pos):
+        return Player(id=f"{tid}-{pid}", name=f"{tid}-{pid}", position=pos, offense=5.0, goalie_skill=3.0)
+
+    def lineup(prefix, n):
+        return {pos: [p(f"{prefix}{pos[0]}{i}", pos) for i in range(n if pos != "Goalie" else 1)]
+                for pos in ("Forward", "Midfielder", "Defense", "Goalie")}
+
+    return Team(id=tid, name=tid, coaches=[], starters=lineup("s", 3), bench=lineup("b", 2), reserves=[])
+
+
+def _result(i):
+    return GameResult(f"H{i}", f"A{i}", i, 0)
+
+
+class BatchingSink:
+    def __init__(self):
+        self.batches = []
+
+    def record_game(self, result, *, week=None):
+        raise AssertionError("record_games should be used")
+
+    def record_games(self, games):
+        self.batches.append(list(games))
+
+
+class FailingSink:
+    def record_game(self, result, *, week=None):
+        raise KeyError(result.home_id)
+
+
+def test_games_arrive_in_order_after_flush():
+    inner = InMemoryRecordSink()
+    with BufferedRecordSink(inner, batch_size=4, flush_interval=60) as sink:
+        for i in range(10):
+            sink.record_game(_result(i), week=1)
+        sink.flush()
+        assert [r.home_score for r in inner.games] == list(range(10))
+
+
+def test_batches_are_cut_by_size():
+    inner = BatchingSink()
+    sink = BufferedRecordSink(inner, batch_size=3, flush_interval=60)
+    for i in range(7):
+        sink.record_game(_result(i), week=2)
+    sink.close()
+    assert [len(b) for b in inner.batches] == [3, 3, 1]
+    assert all(week == 2 for batch in inner.batches for _, week in batch)
+
+
+def test_batches_are_cut_by_time():
+    inner = InMemoryRecordSink()
+    sink = BufferedRecordSink(inner, batch_size=100, flush_interval=0.05)
+    sink.record_game(_result(1))
+    deadline = time.monotonic() + 2
+    while not inner.games and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(inner.games) == 1
+    sink.close()
+
+
+def test_write_happens_off_the_calling_thread():
+    seen = []
+
+    class ThreadSink:
+        def record_game(self, result, *, week=None):
+            seen.append(threading.current_thread())
+
+    with BufferedRecordSink(ThreadSink()) as sink:
+        sink.record_game(_result(0))
+        sink.flush()
+    assert seen and seen[0] is not threading.current_thread()
+
+
+def test_failed_write_is_raised_to_the_caller():
+    sink = BufferedRecordSink(FailingSink(), batch_size=1)
+    sink.record_game(_result(0))
+    with pytest.raises(RecordSinkError) as info:
+        sink.flush()
+    assert isinstance(info.value.__cause__, KeyError)
+    with pytest.raises(RecordSinkError):
+        sink.record_game(_result(1))
+    with pytest.raises(RecordSinkError):
+        sink.close()
+
+
+def test_close_is_idempotent_and_rejects_new_games():
+    sink = BufferedRecordSink(InMemoryRecordSink())
+    sink.close()
+    sink.close()
+    with pytest.raises(RuntimeError):
+        sink.record_game(_result(0))
+
+
+def test_season_runner_flushes_and_sees_errors():
+    repo = InMemoryTeamRepository()
+    for tid in ("A", "B", "C", "D"):
+        repo.save(_team(tid))
+    inner = InMemoryRecordSink()
+    orch = SeasonOrchestrator(repo, None, SimpleGameEngine(), BufferedRecordSink(inner, flush_interval=60))
+    results = SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"])).run_period(1)
+    assert inner.games == results                     # flushed before run_period returned
+
+    orch = SeasonOrchestrator(repo, None, SimpleGameEngine(), BufferedRecordSink(FailingSink()))
+    with pytest.raises(RecordSinkError):
+        SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"])).run_week(1)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
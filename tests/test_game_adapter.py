@@ -50,6 +50,16 @@ def test_real_simulator_runs_on_domain_team():
     assert not (result.home_score == result.away_score)   # allow_tie=False resolves in OT
 
 
+def test_same_seed_replays_the_same_game():
+    np.random.seed(1)
+    first = GameSimulatorAdapter().play(_team("Boston"), _team("New York"), seed=2024)
+    np.random.seed(2)      # the global state plays no part in a seeded game
+    again = GameSimulatorAdapter().play(_team("Boston"), _team("New York"), seed=2024)
+    assert first.seed == again.seed == 2024
+    assert (first.home_score, first.away_score) == (again.home_score, again.away_score)
+    assert first.player_lines == again.player_lines
+
+
 def test_records_and_logs_land_on_the_model():
     np.random.seed(7)
     home, away = _team("Boston"), _team("New York")
@@ -7,10 +7,11 @@ Date: 3/1/2026
 import pytest
 import json
 
-from handball.game_simulator import GameSimulator, GameClock, StatTracker
+from handball.game_simulator import GameSimulator, GameClock, StatTracker, team_matrix
 from handball.domain import Player, Team
 from handball.players import InjuryReport
 from handball.simulation_vars import REGULATION_TIME
+from handball.utils import RandomSource
 
 
 @pytest.fixture
@@ -436,6 +437,77 @@ class TestGameSimulator:
         assert sum(home_team.record) == 2
         assert sum(away_team.record) == 2
     
+    @pytest.mark.parametrize("allow_tie", [False, True])
+    def test_flat_kernel_replays_the_loop_kernel(self, sample_team, monkeypatch, allow_tie):
+        """kernel="flat" consumes the same draws in the same order as "loop", so a
+        seeded game is identical, play by play."""
+        import handball.game_simulator as game_simulator
+        monkeypatch.setattr(game_simulator, "REGULATION_TIME", 1200)
+
+        def play(kernel, seed):
+            game = GameSimulator(sample_team("Home"), sample_team("Away"), allow_tie=allow_tie,
+                                 kernel=kernel, rng=RandomSource(seed))
+            game.simulate_game()
+            tracker = game.stat_tracker
+            return (game.home_score, game.away_score, tracker.get_score_info(),
+                    list(tracker.home_shots), list(tracker.away_shots),
+                    tracker.home_turnovers, tracker.away_turnovers, game.game_clock.time_left)
+
+        for seed in range(20):
+            assert play("flat", seed) == play("loop", seed)
+
+    def test_metrics_are_opt_in_and_reconcile_with_the_game(self, sample_team):
+        assert GameSimulator(sample_team("Home"), sample_team("Away")).metrics is None
+
+        game = GameSimulator(sample_team("Home"), sample_team("Away"), rng=RandomSource(4), metrics=True)
+        game.simulate_game()
+        m, tracker = game.metrics, game.stat_tracker
+        assert m.games == 1
+        assert m.shots == tracker.home_shots.sum() + tracker.away_shots.sum()
+        assert game.home_score + game.away_score <= m.shots_on_goal <= m.shots
+        assert m.turnovers == tracker.home_turnovers + tracker.away_turnovers <= m.passes
+        assert m.overtime_possessions <= m.possessions
+        assert m.rng_draws == game.rng.draws
+        assert min(m.init_stats_time, m.first_half_time, m.second_half_time, m.postgame_time) > 0
+
+    @pytest.mark.parametrize("kernel", ["chain", "flat"])
+    def test_kernels_report_comparable_metrics(self, sample_team, kernel):
+        """Every kernel counts the same things: flat matches loop exactly, chain
+        matches it on average."""
+        def totals(kernel):
+            m = None
+            for seed in range(10):
+                game = GameSimulator(sample_team("Home"), sample_team("Away"), kernel=kernel,
+                                     rng=RandomSource(seed), metrics=True)
+                game.simulate_game()
+                m = game.metrics if m is None else m + game.metrics
+            return m
+
+        loop, other = totals("loop"), totals(kernel)
+        assert other.games == loop.games == 10
+        if kernel == "flat":
+            assert (other.possessions, other.passes, other.shots, other.rng_draws) == \
+                (loop.possessions, loop.passes, loop.shots, loop.rng_draws)
+        else:
+            assert abs(other.possessions - loop.possessions) < 0.1 * loop.possessions
+            assert abs(other.passes - loop.passes) < 0.1 * loop.passes
+
+    def test_same_random_source_seed_replays_the_game(self, sample_team):
+        """A game draws only from its RandomSource: equal seeds replay it exactly
+        and the global np.random state is left untouched."""
+        import numpy as np
+        np.random.seed(1)
+        before = np.random.get_state()[1].copy()
+
+        games = []
+        for _ in range(2):
+            game = GameSimulator(sample_team("Home"), sample_team("Away"), rng=RandomSource(123))
+            game.simulate_game()
+            games.append((game.home_score, game.away_score, list(game.stat_tracker.home_shots)))
+
+        assert games[0] == games[1]
+        assert (np.random.get_state()[1] == before).all()
+
     def test_shots_and_goals_relationship(self, sample_team):
         """Test that goals never exceed shots taken"""
         home_team = sample_team("Home")
@@ -558,6 +630,33 @@ class TestGameSimulator:
         assert home_stats["goalie"] == 0
         assert home_stats["bench_goalie"] == 0
 
+    def test_team_matrix_is_cached_until_the_lineup_changes(self, sample_team):
+        home = sample_team("Home")
+        matrix = team_matrix(home)
+        GameSimulator(home, sample_team("Away"))
+        assert team_matrix(home) is matrix
+        assert matrix.players[:3] == home.starters["Forward"]
+        assert matrix.players[15:] == [home.starters["Goalie"][0], home.bench["Goalie"][0]]
+
+        arr = home.arrangement()
+        home.apply_arrangement(arr)
+        assert team_matrix(home) is not matrix
+
+    def test_next_game_sees_rating_changes_without_invalidation(self, sample_team):
+        home, away = sample_team("Home"), sample_team("Away")
+        before = GameSimulator(home, away).stat_tracker.home_scorers_likelihood[0]
+        forward = home.starters["Forward"][0]
+        forward.age, forward.peak_age, forward.max_offense = 20, 27, 10.0
+        forward.update_stats(years=1, rate_scale=1)
+
+        game = GameSimulator(home, away)
+        assert team_matrix(home).loc[0] == forward.offense
+        assert game.stat_tracker.home_scorers_likelihood[0] > before
+
+        forward.injure(year=2026, injury_type="ankle")
+        GameSimulator(home, away)
+        assert team_matrix(home).healthy[0] == 0.0
+
     def test_healthy_team_contributes_positive(self, sample_team):
         """Control for the injured-contributes-nothing test: a healthy team has
         positive offense and a positive goalie value."""
@@ -814,6 +913,35 @@ class TestGameSummary:
         assert "went_to_overtime" in summary
         assert isinstance(summary["went_to_overtime"], bool)
 
+    def test_summary_is_none_before_postgame(self, sample_team):
+        game = GameSimulator(sample_team("H"), sample_team("A"))
+        assert game.get_game_summary() is None
+
+    def test_scoring_log_renders_one_line_per_goal(self, sample_team):
+        game = GameSimulator(sample_team("H"), sample_team("A"), rng=RandomSource(7))
+        game.simulate_game()
+
+        lines = game.stat_tracker.scoring_tracker
+        goal_lines = [line for line in lines if " scores with " in line]
+        assert len(goal_lines) == game.home_score + game.away_score
+        assert len(game.stat_tracker.events) == len(lines)
+        first = goal_lines[0]
+        assert first.startswith(("H: ", "A: ")) and first.endswith(("in the 1st half!", "in the 2nd half!", "in the OT!"))
+        assert game.get_game_summary()["scoring_log"] == game.stat_tracker.get_score_info()
+
+    def test_summary_only_mode_skips_the_log_but_not_the_game(self, sample_team):
+        full = GameSimulator(sample_team("H"), sample_team("A"), rng=RandomSource(7))
+        full.simulate_game()
+        bare = GameSimulator(sample_team("H"), sample_team("A"), rng=RandomSource(7), record_events=False)
+        bare.simulate_game()
+
+        assert bare.stat_tracker.events is None
+        assert bare.stat_tracker.scoring_tracker == []
+        summary = bare.get_game_summary()
+        assert summary["scoring_log"] is None
+        assert (bare.home_score, bare.away_score) == (full.home_score, full.away_score)
+        assert summary["home_goals_by_player"] == full.get_game_summary()["home_goals_by_player"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
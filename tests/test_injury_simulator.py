@@ -71,6 +71,18 @@ def test_certain_injury_no_substitution():
     assert sum(e.kind == "injury" for e in sim.events) == _ACTIVE_COUNT
 
 
+def test_new_injury_drops_the_cached_team_matrix():
+    from handball.game_simulator import team_matrix
+    team = _team(risk=1.0)
+    before = team_matrix(team)
+    assert before.healthy.all()
+
+    InjurySimulator(rng=random.Random(0)).process_team(team, chunk=1)
+
+    assert team_matrix(team) is not before
+    assert not team_matrix(team).healthy.any()
+
+
 def test_rate_is_scaled_by_5():
     # 0.2 * 5 == 1.0, and rng.random() is always < 1.0, so the roll always hits.
     assert INJURY_CHUNK_RISK_SCALE == 5
@@ -119,6 +119,16 @@ def test_full_lifecycle_draft_and_playoffs():
     assert league.ranked_team_ids()[0] == "E1"
 
 
+def test_injected_ranking_seeds_the_draft():
+    # e.g. the Postgres league's goal-differential order from team_season_standings
+    base = _league()
+    league = LeagueOperations(base.orch, schedule=base.schedule,
+                              ranking=lambda: ["W2", "W1", "E2", "E1"])
+    assert league.ranked_team_ids() == ["W2", "W1", "E2", "E1"]
+    picks = league.run_draft([(f"Rookie{i}", "Forward") for i in range(4)], rounds=1)
+    assert picks[0].holder_team_id == "E1"
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,105 @@
+"""
+LeagueSnapshot (handball/league_snapshot.py): forks of an in-memory league are
+independent and reproduce the live run's seeds. The fork tests run offline on a
+hand-built snapshot; test_from_postgres_* needs the migrated dev Postgres and
+skips without it.
+"""
+import pytest
+from sqlalchemy import text
+
+from handball import schedule_repository as sched_repo
+from handball.db import get_engine, is_local_db
+from handball.domain import Player, Team
+from handball.league_snapshot import LeagueSnapshot
+from handball.orchestration import SimpleGameEngine
+from handball.repository import InMemoryTeamRepository
+from handball.season import Schedule, game_seed
+
+try:
+    _engine = get_engine()
+    with _engine.connect() as _c:
+        _c.execute(text("select 1 from teams, season_state limit 1"))
+    _PG_OK = is_local_db()        # destructive tests: local DB only, never remote
+except Exception:  # noqa: BLE001
+    _PG_OK = False
+
+_pg = pytest.mark.skipif(not _PG_OK, reason="Postgres dev DB not available/migrated")
+
+TEAMS = ["E1", "E2", "W1", "W2"]
+
+
+def _team(tid, strength):
+    def p(pid, pos, off=5.0, gk=0.1):
+        return Player(id=pid, name=pid, position=pos, offense=off, goalie_skill=gk)
+    return Team(
+        id=tid, name=tid, coaches=[],
+        starters={
+            "Forward": [p(f"{tid}-sf{i}", "Forward", off=strength) for i in range(3)],
+            "Midfielder": [p(f"{tid}-sm{i}", "Midfielder", off=strength) for i in range(3)],
+            "Defense": [p(f"{tid}-sd{i}", "Defense") for i in range(3)],
+            "Goalie": [p(f"{tid}-sg", "Goalie", gk=3.0)],
+        },
+        bench={
+            "Forward": [p(f"{tid}-bf{i}", "Forward") for i in range(2)],
+            "Midfielder": [p(f"{tid}-bm{i}", "Midfielder") for i in range(2)],
+            "Defense": [p(f"{tid}-bd{i}", "Defense") for i in range(2)],
+            "Goalie": [p(f"{tid}-bg", "Goalie", gk=2.0)],
+        },
+        reserves=[],
+    )
+
+
+def _snapshot():
+    repo = InMemoryTeamRepository()
+    for i, tid in enumerate(TEAMS):
+        repo.save(_team(tid, 9.0 - i))
+    return LeagueSnapshot(2026, repo, Schedule.round_robin(TEAMS), {"periods_run": 0, "injury_seed": 11})
+
+
+def test_forks_play_without_touching_the_base_or_each_other():
+    base = _snapshot()
+    a, b = base.fork(), base.fork()
+
+    a.league(game_engine=SimpleGameEngine()).run_period(1)
+
+    assert sum(sum(r) for r in a.repo.records().values()) == 12    # 6 games x 2 teams
+    assert all(r == (0, 0, 0) for r in base.repo.records().values())
+    assert all(r == (0, 0, 0) for r in b.repo.records().values())
+
+
+def test_a_fork_replays_the_live_seeds_unless_given_its_own():
+    base = _snapshot()
+    live = base.fork().league(game_engine=SimpleGameEngine())
+    live.run_period(1)
+    home, away = base.schedule.week(1)[0]
+    assert live.orch.record_sink.games[0].seed == game_seed(2026, 1, home, away, 11)
+
+    what_if = base.fork().league(game_engine=SimpleGameEngine(), seed=99)
+    what_if.run_period(1)
+    assert what_if.orch.record_sink.games[0].seed == game_seed(2026, 1, home, away, 99)
+
+
+@_pg
+def test_from_postgres_reads_the_league_and_never_writes_back():
+    from handball.migrate_json_to_pg import DEFAULT_DATAFILES, migrate
+    from handball.pg_repository import PostgresTeamRepository
+
+    with _engine.begin() as c:
+        c.execute(text("truncate teams, players, injuries, games, player_game_lines, "
+                       "season_state, schedule_games restart identity cascade"))
+    migrate(DEFAULT_DATAFILES, _engine)
+    sched_repo.init_season_state(_engine, 2026, schedule_seed=1, injury_seed=5)
+
+    snap = LeagueSnapshot.from_postgres(_engine, 2026)
+    live = PostgresTeamRepository(_engine)
+    assert snap.repo.all_team_ids() == live.all_team_ids()
+    first = live.all_team_ids()[0]
+    assert snap.repo.load(first) == live.load(first)
+    assert snap.schedule is None and snap.seed == 5 and snap.periods_run == 0
+
+    league = snap.fork().league()
+    league.set_schedule(Schedule.round_robin(snap.repo.all_team_ids()[:4]))
+    assert len(league.run_week(1)) == 2
+    with _engine.connect() as c:
+        assert c.execute(text("select count(*) from games")).scalar_one() == 0
+        assert c.execute(text("select coalesce(sum(wins+losses+ties),0) from teams")).scalar_one() == 0
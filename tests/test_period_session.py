@@ -0,0 +1,135 @@
+"""
+Offline tests for PeriodSession, the per-period unit of work: every team is
+loaded once, saves and game records stay in memory, and one flush writes the
+dirty teams and the period's games.
+
+`pytest tests/test_period_session.py` or `python tests/test_period_session.py`.
+"""
+import pytest
+
+from handball.domain import Player, Team
+from handball.orchestration import InMemoryRecordSink, SeasonOrchestrator, SimpleGameEngine
+from handball.period_session import PeriodSession
+from handball.repository import InMemoryTeamRepository
+from handball.season import Schedule, SeasonRunner
+
+TEAMS = ["A", "B", "C", "D"]
+
+
+def _player(pid, pos, off=5.0, gk=0.1):
+    return Player(id=pid, name=pid, position=pos, offense=off, goalie_skill=gk)
+
+
+def _team(tid, strength):
+    starters = {
+        "Forward": [_player(f"{tid}-sf{i}", "Forward", off=strength) for i in range(3)],
+        "Midfielder": [_player(f"{tid}-sm{i}", "Midfielder", off=strength) for i in range(3)],
+        "Defense": [_player(f"{tid}-sd{i}", "Defense") for i in range(3)],
+        "Goalie": [_player(f"{tid}-sg", "Goalie", gk=3.0)],
+    }
+    bench = {
+        "Forward": [_player(f"{tid}-bf{i}", "Forward") for i in range(2)],
+        "Midfielder": [_player(f"{tid}-bm{i}", "Midfielder") for i in range(2)],
+        "Defense": [_player(f"{tid}-bd{i}", "Defense") for i in range(2)],
+        "Goalie": [_player(f"{tid}-bg", "Goalie", gk=2.0)],
+    }
+    return Team(id=tid, name=tid, coaches=[], starters=starters, bench=bench, reserves=[])
+
+
+class CountingRepository(InMemoryTeamRepository):
+    def __init__(self):
+        super().__init__()
+        self.loads, self.saves, self.batches = 0, 0, 0
+
+    def load_many(self, team_ids):
+        self.batches += 1
+        return super().load_many(team_ids)
+
+    def load(self, team_id):
+        self.loads += 1
+        return super().load(team_id)
+
+    def save(self, team):
+        self.saves += 1
+        super().save(team)
+
+
+@pytest.fixture
+def orch():
+    repo = CountingRepository()
+    for tid, strength in zip(TEAMS, (8.0, 4.0, 6.0, 2.0)):
+        repo.save(_team(tid, strength))
+    repo.saves = 0
+    return SeasonOrchestrator(repo, None, SimpleGameEngine(), InMemoryRecordSink())
+
+
+def test_period_loads_and_saves_each_team_once(orch):
+    results = SeasonRunner(orch, Schedule.round_robin(TEAMS)).run_period(1)
+
+    assert len(results) == 6
+    assert orch.team_repo.loads == 4
+    assert orch.team_repo.saves == 4
+    assert orch.record_sink.games == results
+    assert all(sum(orch.team_repo.load(t).record) == 3 for t in TEAMS)
+
+
+def test_load_many_fetches_only_the_teams_it_lacks_in_one_batch(orch):
+    session = PeriodSession(orch)
+    a = session.load("A")
+    teams = session.load_many(["B", "A", "C", "B"])
+    assert teams[1] is a and teams[0] is teams[3]
+    assert orch.team_repo.batches == 1 and orch.team_repo.loads == 3   # A, then B + C
+
+
+def test_load_returns_the_same_live_team(orch):
+    session = PeriodSession(orch)
+    assert session.load("A") is session.load("A")
+    assert orch.team_repo.loads == 1
+
+
+def test_nothing_is_written_before_flush(orch):
+    session = PeriodSession(orch)
+    session.orch.simulate_matchup("A", "B", week=1)
+
+    assert session.dirty == ["A", "B"]
+    assert orch.record_sink.games == []
+    assert orch.team_repo.load("A").record == (0, 0, 0)
+
+    session.flush()
+    assert len(orch.record_sink.games) == 1
+    assert sum(orch.team_repo.load("A").record) == 1
+    assert session.dirty == []
+
+
+def test_standings_read_records_and_see_the_live_teams(orch):
+    session = PeriodSession(orch)
+    session.orch.simulate_matchup("A", "B", week=1)
+    loads = orch.team_repo.loads
+
+    assert sum(session.records()["A"]) == 1
+    assert orch.team_repo.records()["A"] == (0, 0, 0)
+    assert [tid for tid, _ in orch.standings()] == TEAMS
+    assert orch.team_repo.loads == loads            # no team was hydrated
+
+
+def test_a_failed_period_writes_nothing(orch):
+    with pytest.raises(RuntimeError):
+        with PeriodSession(orch) as session:
+            session.orch.simulate_matchup("A", "B", week=1)
+            raise RuntimeError("engine blew up")
+
+    assert orch.team_repo.saves == 0
+    assert orch.record_sink.games == []
+
+
+def test_flush_into_a_caller_transaction_needs_one_sql_engine(orch):
+    session = PeriodSession(orch)
+    session.orch.simulate_matchup("A", "B", week=1)
+    with pytest.raises(ValueError):
+        session.flush(conn=object())
+    assert orch.record_sink.games == []
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
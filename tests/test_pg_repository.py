@@ -11,11 +11,14 @@ The whole module skips cleanly if that database is not reachable.
 """
 import numpy as np
 import pytest
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 from handball.db import get_engine, is_local_db
 from handball.domain import Player, Team
-from handball.orchestration import GameSimulatorAdapter
+from handball import schedule_repository as sched_repo
+from handball import standings_repository
+from handball.orchestration import GameResult, GameSimulatorAdapter, SeasonOrchestrator
+from handball.period_session import PeriodSession
 from handball.pg_record_sink import PostgresRecordSink
 from handball.pg_repository import PostgresTeamRepository
 
@@ -88,6 +91,48 @@ def test_all_team_ids_and_load_all():
     assert {t.id for t in repo.load_all()} == {"Boston", "Denver"}
 
 
+def _statements(fn):
+    seen = []
+
+    def count(conn, cursor, statement, params, context, executemany):
+        seen.append(statement)
+
+    event.listen(_engine, "before_cursor_execute", count)
+    try:
+        fn()
+    finally:
+        event.remove(_engine, "before_cursor_execute", count)
+    return seen
+
+
+def test_load_all_and_load_many_take_three_queries():
+    repo = PostgresTeamRepository(_engine)
+    for t in ("Boston", "Denver", "Austin"):
+        repo.save(_team(t))
+    loaded = {}
+
+    def load():
+        loaded["all"] = repo.load_all()
+        loaded["many"] = repo.load_many(["Denver", "Boston"])
+
+    assert len(_statements(load)) == 6              # teams, players, injuries -- twice
+    teams, many = loaded["all"], loaded["many"]
+    assert [t.id for t in teams] == ["Austin", "Boston", "Denver"]
+    assert teams[1] == repo.load("Boston")
+    assert [t.id for t in many] == ["Denver", "Boston"]
+    with pytest.raises(KeyError):
+        repo.load_many(["Boston", "Nowhere"])
+
+
+def test_records_read_the_teams_rows():
+    repo = PostgresTeamRepository(_engine)
+    boston = _team("Boston")
+    boston.record = (3, 1, 0)
+    repo.save(boston)
+    repo.save(_team("Denver"))
+    assert repo.records() == {"Boston": (3, 1, 0), "Denver": (0, 0, 0)}
+
+
 def test_resave_updates_record_and_reorders_slots():
     repo = PostgresTeamRepository(_engine)
     team = _team("Boston")
@@ -103,6 +148,36 @@ def test_resave_updates_record_and_reorders_slots():
     assert [p.id for p in loaded.starters["Forward"]] == [p.id for p in team.starters["Forward"]]
 
 
+def test_save_writes_only_what_changed_since_load():
+    repo = PostgresTeamRepository(_engine)
+    repo.save(_team("Boston"))
+    team = repo.load("Boston")
+
+    team.record = (1, 0, 0)                          # a game: only the record moves
+    assert len(_statements(lambda: repo.save(team))) == 1
+    assert _statements(lambda: repo.save(team)) == []  # nothing changed
+
+    team.starters["Forward"] = list(reversed(team.starters["Forward"]))
+    statements = _statements(lambda: repo.save(team))
+    assert len(statements) == 2                      # clear the moved slots + one upsert
+    assert [p.id for p in PostgresTeamRepository(_engine).load("Boston").starters["Forward"]] == \
+        [p.id for p in team.starters["Forward"]]
+
+
+def test_a_rolled_back_save_is_written_again():
+    repo = PostgresTeamRepository(_engine)
+    repo.save(_team("Boston"))
+    team = repo.load("Boston")
+    team.record = (2, 0, 0)
+    with pytest.raises(RuntimeError):
+        with _engine.begin() as c:
+            repo.save(team, conn=c)
+            raise RuntimeError("the week failed")
+    assert repo.records()["Boston"] == (0, 0, 0)
+    repo.save(team)
+    assert repo.records()["Boston"] == (2, 0, 0)
+
+
 def test_injury_log_roundtrips():
     repo = PostgresTeamRepository(_engine)
     team = _team("Boston")
@@ -144,6 +219,200 @@ def test_record_sink_persists_game_lines_and_view_aggregates():
     assert view_goals == total_goals
 
 
+def test_record_sink_writes_a_game_in_two_statements_and_follows_trades():
+    repo = PostgresTeamRepository(_engine)
+    boston, denver = _team("Boston"), _team("Denver")
+    repo.save(boston)
+    repo.save(denver)
+    sink = PostgresRecordSink(_engine, season=1)
+    np.random.seed(7)
+    sink.record_game(GameSimulatorAdapter().play(boston, denver), week=1)   # warms the id caches
+
+    traded = boston.bench["Forward"].pop()
+    denver.reserves.append(traded)
+    repo.save(boston)
+    repo.save(denver)
+    result = GameSimulatorAdapter().play(boston, denver)
+    statements = _statements(lambda: sink.record_game(result, week=2))
+
+    assert len(statements) == 2                      # games + lines, then standings
+    with _engine.connect() as c:
+        team = c.execute(
+            text("select t.slug from player_game_lines l join games g on g.id = l.game_id "
+                 "join players p on p.id = l.player_id join teams t on t.id = l.team_id "
+                 "where g.week = 2 and p.legacy_id = :p"),
+            {"p": traded.id},
+        ).scalar_one()
+        n_lines = c.execute(text("select count(*) from player_game_lines")).scalar_one()
+    assert team == "Denver"
+    assert n_lines == 2 * (len(boston.roster()) + len(denver.roster()))
+
+
+
+def test_period_session_flushes_teams_and_games_in_one_transaction():
+    repo = PostgresTeamRepository(_engine)
+    for t in ("Boston", "Denver"):
+        repo.save(_team(t))
+    orch = SeasonOrchestrator(repo, None, GameSimulatorAdapter(),
+                              PostgresRecordSink(_engine, season=1))
+
+    session = PeriodSession(orch)
+    for week in (1, 2):
+        session.orch.simulate_matchup("Boston", "Denver", week=week, seed=week)
+    with _engine.connect() as c:          # nothing written before the flush
+        assert c.execute(text("select count(*) from games")).scalar_one() == 0
+    session.flush()
+
+    with _engine.connect() as c:
+        assert c.execute(text("select count(*) from games")).scalar_one() == 2
+    assert sum(repo.load("Boston").record) == 2
+
+
+def _result(home, away, hs, as_):
+    return GameResult(home_id=home, away_id=away, home_score=hs, away_score=as_,
+                      went_to_overtime=False, player_lines={})
+
+
+def test_record_sink_maintains_season_standings_with_tiebreakers():
+    repo = PostgresTeamRepository(_engine)
+    for t in ("Boston", "Denver", "Austin"):
+        repo.save(_team(t))
+    sink = PostgresRecordSink(_engine, season=1)
+    sink.record_game(_result("Boston", "Denver", 30, 20), week=1)
+    sink.record_game(_result("Denver", "Boston", 25, 24), week=2)
+    sink.record_game(_result("Denver", "Austin", 22, 22), week=3)
+
+    table = {s.team: s for s in standings_repository.standings(_engine, 1)}
+    boston, denver = table["Boston"], table["Denver"]
+    assert boston.record == (1, 1, 0) and (boston.goals_for, boston.goals_against) == (54, 45)
+    assert boston.home == (1, 0, 0) and boston.away == (0, 1, 0)
+    assert denver.record == (1, 1, 1) and denver.goal_diff == -9
+    assert (boston.streak, denver.streak) == (-1, 0)          # a tie ends a streak
+    assert table["Austin"].record == (0, 0, 1)
+    # 1-1 Boston leads 1-1 Denver on goal differential; Austin's tie leaves it last
+    assert standings_repository.ranked_team_ids(_engine, 1) == ["Boston", "Denver", "Austin"]
+    assert standings_repository.ranked_team_ids(_engine, 2) == ["Austin", "Boston", "Denver"]
+
+
+def test_reset_run_reverses_the_period_standings():
+    repo = PostgresTeamRepository(_engine)
+    for t in ("Boston", "Denver"):
+        repo.save(_team(t))
+    sink = PostgresRecordSink(_engine, season=1)
+    sink.record_game(_result("Boston", "Denver", 30, 20), week=1)
+    sink.record_game(_result("Boston", "Denver", 28, 21), week=12)     # period 2
+
+    assert sched_repo.reset_run(_engine, 1, 2) == 1
+    table = {s.team: s for s in standings_repository.standings(_engine, 1)}
+    assert table["Boston"].record == (1, 0, 0) and table["Boston"].goals_for == 30
+    assert (table["Boston"].streak, table["Denver"].streak) == (1, -1)
+
+
+
+def test_period_batch_copies_the_games_in_one_transaction_like_single_records():
+    repo = PostgresTeamRepository(_engine)
+    boston, denver = _team("Boston"), _team("Denver")
+    repo.save(boston)
+    repo.save(denver)
+    scores = [(30, 20), (20, 25), (22, 22)] + [(26, 24)] * 8     # ends on 8 straight home wins
+    np.random.seed(3)
+    played = GameSimulatorAdapter().play(boston, denver)           # one game with full lines
+
+    sink = PostgresRecordSink(_engine, season=1)
+    with pytest.raises(RuntimeError):
+        with sink.period_batch():
+            sink.record_game(played, week=1)
+            raise RuntimeError("the period failed")
+    with sink.period_batch():
+        sink.record_game(played, week=1)
+        for week, (hs, as_) in enumerate(scores, start=2):
+            sink.record_game(_result("Boston", "Denver", hs, as_), week=week)
+
+    with _engine.connect() as c:
+        assert c.execute(text("select count(*) from games")).scalar_one() == 1 + len(scores)
+        assert c.execute(text("select count(*) from player_game_lines")).scalar_one() == \
+            len(boston.roster()) + len(denver.roster())
+    table = {s.team: s for s in standings_repository.standings(_engine, 1)}
+    boston_gf = played.home_score + sum(hs for hs, _ in scores)
+    assert table["Boston"].goals_for == boston_gf and table["Boston"].streak == 8
+    assert table["Denver"].streak == -8 and sum(table["Denver"].record) == 1 + len(scores)
+
+
+def _batched_runner(teams):
+    from handball.orchestration import SimpleGameEngine
+    from handball.season import InMemoryCheckpointStore, Schedule, SeasonRunner
+
+    repo = PostgresTeamRepository(_engine)
+    for tid in teams:
+        repo.save(_team(tid))
+    sink = PostgresRecordSink(_engine, season=1)
+    return SeasonRunner(SeasonOrchestrator(repo, None, SimpleGameEngine(), sink),
+                        Schedule.round_robin(teams), season=1, seed=7,
+                        checkpoints=InMemoryCheckpointStore(), period_batch=True)
+
+
+def _committed():
+    """(games, games counted in the teams' W-L-T, games in the standings), as
+    another connection sees them."""
+    with _engine.connect() as c:
+        games = c.execute(text("select count(*) from games")).scalar_one()
+    records = sum(sum(r) for r in PostgresTeamRepository(_engine).records().values()) // 2
+    standings = sum(sum(s.record) for s in standings_repository.standings(_engine, 1)) // 2
+    return games, records, standings
+
+
+def test_period_batch_commits_a_season_runners_period_in_one_transaction():
+    from handball.progress import WEEK_COMMITTED
+
+    runner = _batched_runner(["Boston", "Denver", "Austin", "Seattle"])
+    seen = []
+
+    class _Watcher:
+        def publish(self, event, *, conn=None):
+            if event.kind == WEEK_COMMITTED:
+                seen.append(_committed())
+
+    runner.progress = _Watcher()
+    results = runner.run_period(1)
+    assert seen and set(seen) == {(0, 0, 0)}        # each week's write waits for the period
+    assert _committed() == (len(results),) * 3      # then teams, games and standings together
+
+
+def test_period_batch_rolls_the_whole_period_back_when_the_games_fail(monkeypatch):
+    runner = _batched_runner(["Boston", "Denver", "Austin", "Seattle"])
+    sink = runner.orch.record_sink
+
+    def fail(*_args):
+        raise RuntimeError("COPY failed")
+
+    monkeypatch.setattr(sink, "_copy_games", fail)
+    monkeypatch.setattr(sink, "_record", fail)
+    with pytest.raises(RuntimeError):
+        runner.run_period(1)
+    assert _committed() == (0, 0, 0)                # no team kept a record without its games
+
+
+def test_pipeline_mode_writes_the_same_rows():
+    piped = _engine.execution_options(pipeline=True)
+    repo = PostgresTeamRepository(piped)
+    boston, denver = _team("Boston"), _team("Denver")
+    boston.bench["Forward"][0].injure(year=2026, injury_type="ankle")
+    repo.save(boston)
+    repo.save(denver)
+    boston = repo.load("Boston")
+    boston.starters["Forward"] = list(reversed(boston.starters["Forward"]))
+    repo.save(boston)
+    np.random.seed(5)
+    result = GameSimulatorAdapter().play(boston, denver)
+    PostgresRecordSink(piped, season=1).record_game(result, week=1)
+
+    assert PostgresTeamRepository(_engine).load("Boston") == boston
+    with _engine.connect() as c:
+        assert c.execute(text("select count(*) from player_game_lines")).scalar_one() == \
+            len(boston.roster()) + len(denver.roster())
+    assert sum(standings_repository.standings(_engine, 1)[0].record) == 1
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main([__file__, "-q"]))
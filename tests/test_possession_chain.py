@@ -0,0 +1,142 @@
+"""
+The absorbing-chain possession tables must describe the same possessions as the
+per-pass loop in GameSimulator.offensive_posession. Checked at two levels:
+segment outcomes from a fixed start against a direct continuous-position walk,
+and whole-game score distributions of kernel="chain" against kernel="loop".
+
+`pytest tests/test_possession_chain.py` or `python tests/test_possession_chain.py`.
+"""
+import numpy as np
+import pytest
+
+import handball.game_simulator as game_simulator
+from handball.domain import Player, Team
+from handball.game_simulator import GameSimulator
+from handball.orchestration import GameSimulatorAdapter
+from handball.possession_chain import (
+    FAILED_PASS, GRID, SHOT, PossessionTable, max_passes, possession_table, snap,
+)
+
+
+def _team(team_id: str) -> Team:
+    def p(pid, name, pos, off=5.0, deff=5.0, gk=0.1):
+        return Player(id=f"{team_id}-{pid}", name=f"{team_id} {name}", position=pos,
+                      offense=off, defense=deff, goalie_skill=gk, variance=0.5)
+
+    return Team(
+        id=team_id, name=f"{team_id} FC", coaches=["HC", "OC", "DC"],
+        starters={
+            "Forward": [p("f1", "F1", "Forward", off=7), p("f2", "F2", "Forward", off=6), p("f3", "F3", "Forward", off=6)],
+            "Midfielder": [p("m1", "M1", "Midfielder"), p("m2", "M2", "Midfielder"), p("m3", "M3", "Midfielder")],
+            "Defense": [p("d1", "D1", "Defense", deff=7), p("d2", "D2", "Defense", deff=7), p("d3", "D3", "Defense", deff=6)],
+            "Goalie": [p("g1", "G1", "Goalie", off=0.1, deff=0.1, gk=6.0)],
+        },
+        bench={
+            "Forward": [p("f4", "F4", "Forward"), p("f5", "F5", "Forward")],
+            "Midfielder": [p("m4", "M4", "Midfielder"), p("m5", "M5", "Midfielder")],
+            "Defense": [p("d4", "D4", "Defense"), p("d5", "D5", "Defense")],
+            "Goalie": [p("g2", "G2", "Goalie", off=0.1, deff=0.1, gk=5.0)],
+        },
+        reserves=[p("r1", "R1", "Forward"), p("r2", "R2", "Defense")],
+    )
+
+
+def _walk(start, ratio, n, rng):
+    """The loop kernel's pass/shot walk, vectorised: (passes, end position, ending)."""
+    pos = np.full(n, float(start))
+    passes = np.zeros(n, dtype=int)
+    ending = np.full(n, -1)
+    live = np.arange(n)
+    while live.size:
+        shoot = rng.random(live.size) < 1 / (1 + np.exp(-0.3 * (pos[live] - 34)))
+        ending[live[shoot]] = SHOT
+        passing = live[~shoot]
+        complete = rng.random(passing.size) < ratio
+        ending[passing[~complete]] = FAILED_PASS
+        moved = passing[complete]
+        pos[moved] += np.minimum(40 - pos[moved], rng.normal(4, 1.5, moved.size))
+        passes[moved] += 1
+        live = moved
+    return passes, pos, ending
+
+
+def test_table_rows_are_distributions():
+    table = PossessionTable(0.5)
+    assert len(table.rows) == len(GRID)
+    for cdf, outcomes in table.rows:
+        assert cdf[-1] == 1.0 and len(cdf) == len(outcomes)
+        assert np.all(np.diff(cdf) >= 0)
+
+
+def test_snap_rounds_to_nearest_bin_and_clips():
+    assert GRID[snap(20.2)] == 20.0
+    assert GRID[snap(20.3)] == 20.5
+    assert snap(-1.0) == 0 and snap(41.0) == len(GRID) - 1
+
+
+def test_tables_are_shared_on_the_ratio_grid():
+    assert possession_table(0.4712, 0.99) is possession_table(0.4748, 0.99)
+    assert possession_table(0.4712, 0.99).ratio == pytest.approx(0.47)
+    assert possession_table(0.4712, 0.0).ratio == pytest.approx(0.48)
+
+
+def test_ratio_rounding_is_unbiased():
+    u = np.random.default_rng(0).random(20_000)
+    ratios = [possession_table(0.4737, x).ratio for x in u]
+    assert abs(np.mean(ratios) - 0.4737) < 2e-4
+
+
+def test_draw_snaps_and_appends_elapsed():
+    table = possession_table(0.5, 0.0)
+    for u in (0.1, 0.5, 0.9):
+        passes, position, ending, elapsed = table.draw(20.2, u)
+        assert (passes, position, ending) == table.sample(snap(20.2), u)
+        assert elapsed == table.elapsed(passes, ending)
+
+
+@pytest.mark.parametrize("ratio", [0.35, 0.5, 0.7])
+def test_segments_match_the_per_pass_walk(ratio):
+    rng = np.random.default_rng(0)
+    n = 40_000
+    table = PossessionTable(ratio)
+    chain = np.array([table.sample(snap(20.0), u) for u in rng.random(n)])
+    passes, pos, ending = _walk(20.0, ratio, n, rng)
+
+    assert chain[:, 0].max() <= max_passes()
+    assert abs(np.mean(chain[:, 2] == SHOT) - np.mean(ending == SHOT)) < 0.01
+    assert abs(chain[:, 0].mean() - passes.mean()) < 0.05
+    assert abs(chain[:, 1].mean() - pos.mean()) < 0.1
+
+
+def test_unknown_kernel_is_rejected():
+    with pytest.raises(ValueError):
+        GameSimulator(_team("H"), _team("A"), kernel="nope")
+
+
+def test_chain_and_loop_score_distributions_match(monkeypatch):
+    monkeypatch.setattr(game_simulator, "REGULATION_TIME", 7200)
+    scores = {}
+    for kernel in ("loop", "chain"):
+        np.random.seed(0)
+        results = [GameSimulatorAdapter(kernel=kernel).play(_team("H"), _team("A")) for _ in range(150)]
+        scores[kernel] = np.array([(r.home_score, r.away_score) for r in results], dtype=float)
+
+    loop, chain = scores["loop"], scores["chain"]
+    # Means within ~3 standard errors, spreads (pooled over both sides, as a
+    # single side's 150-game spread is too noisy) within 20%.
+    assert np.all(np.abs(chain.mean(axis=0) - loop.mean(axis=0)) < 3 * loop.std(axis=0) / np.sqrt(75))
+    assert abs(chain.std() / loop.std() - 1) < 0.2
+
+
+def test_chain_kernel_game_reconciles_with_logs():
+    np.random.seed(8)
+    home, away = _team("H"), _team("A")
+    result = GameSimulatorAdapter(kernel="chain").play(home, away)
+    assert result.home_score != result.away_score
+    assert sum(p.total_season_goals for p in home.roster()) == result.home_score
+    assert sum(p.total_season_goals for p in away.roster()) == result.away_score
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,174 @@
+"""
+Tests for handball.progress: the in-process ProgressBus, the games/sec meter,
+and the events a SeasonRunner publishes while it plays a period. The
+PostgresProgressBus test needs the migrated dev database (see
+tests/test_pg_repository.py) and skips without it.
+
+`pytest tests/test_progress.py` or `python tests/test_progress.py`.
+"""
+import random
+
+import pytest
+
+from handball.domain import Player, Team
+from handball.injury_simulator import InjurySimulator
+from handball.orchestration import InMemoryRecordSink, SeasonOrchestrator, SimpleGameEngine
+from handball.progress import (
+    GAME_FINISHED, INJURIES_PROCESSED, PERIOD_DONE, WEEK_COMMITTED, GameRate, ProgressBus,
+    ProgressEvent,
+)
+from handball.repository import InMemoryTeamRepository
+from handball.season import InMemoryCheckpointStore, Schedule, SeasonRunner
+
+TEAMS = ["A", "B", "C", "D"]
+
+
+def _team(tid):
+    def p(pid, pos, gk=0.1):
+        return Player(id=f"{tid}-{pid}", name=pid, position=pos, goalie_skill=gk)
+
+    starters = {
+        "Forward": [p(f"sf{i}", "Forward") for i in range(3)],
+        "Midfielder": [p(f"sm{i}", "Midfielder") for i in range(3)],
+        "Defense": [p(f"sd{i}", "Defense") for i in range(3)],
+        "Goalie": [p("sg", "Goalie", gk=3.0)],
+    }
+    bench = {
+        "Forward": [p(f"bf{i}", "Forward") for i in range(2)],
+        "Midfielder": [p(f"bm{i}", "Midfielder") for i in range(2)],
+        "Defense": [p(f"bd{i}", "Defense") for i in range(2)],
+        "Goalie": [p("bg", "Goalie", gk=2.0)],
+    }
+    return Team(id=tid, name=tid, coaches=[], starters=starters, bench=bench, reserves=[])
+
+
+def _runner(**kwargs):
+    repo = InMemoryTeamRepository()
+    for tid in TEAMS:
+        repo.save(_team(tid))
+    orch = SeasonOrchestrator(repo, None, SimpleGameEngine(), InMemoryRecordSink())
+    return SeasonRunner(orch, Schedule.round_robin(TEAMS), InjurySimulator(random.Random(1)),
+                        season=2026, seed=7, **kwargs)
+
+
+def _drain(sub):
+    events = []
+    while (event := sub.get(timeout=0)) is not None:
+        events.append(event)
+    return events
+
+
+def test_bus_fans_out_to_every_subscriber():
+    bus = ProgressBus()
+    with bus.subscribe() as a, bus.subscribe() as b:
+        bus.publish(ProgressEvent(GAME_FINISHED, 2026, 1, 1))
+        assert [e.kind for e in _drain(a)] == [GAME_FINISHED]
+        assert [e.kind for e in _drain(b)] == [GAME_FINISHED]
+    bus.publish(ProgressEvent(GAME_FINISHED, 2026, 1, 1))   # no subscribers left: a no-op
+    assert _drain(a) == []
+
+
+def test_a_slow_subscriber_loses_its_oldest_events():
+    bus = ProgressBus(maxsize=2)
+    with bus.subscribe() as sub:
+        for week in (1, 2, 3):
+            bus.publish(ProgressEvent(WEEK_COMMITTED, 2026, 1, week))
+        assert [e.week for e in _drain(sub)] == [2, 3]
+
+
+def test_event_json_round_trip():
+    event = ProgressEvent(GAME_FINISHED, 2026, 1, 3, "A", "B", 28, 25, at=12.5)
+    assert ProgressEvent.from_json(event.to_json()) == event
+
+
+def test_game_rate_counts_games_in_the_window():
+    rate = GameRate(window=10.0)
+    assert rate.add(0.0) == 0.0
+    assert rate.add(1.0) == 1.0
+    assert rate.add(2.0) == 1.0
+    assert rate.add(20.0) == 0.0        # the earlier games fell out of the window
+
+
+@pytest.mark.parametrize("checkpoints", [None, InMemoryCheckpointStore()])
+def test_runner_reports_games_weeks_injuries_and_the_period(checkpoints):
+    bus = ProgressBus()
+    runner = _runner(progress=bus, checkpoints=checkpoints)
+    with bus.subscribe() as sub:
+        results = runner.run_period(1)
+        events = _drain(sub)
+
+    weeks = runner.schedule.num_weeks
+    kinds = [e.kind for e in events]
+    assert kinds.count(GAME_FINISHED) == len(results)
+    assert [e.week for e in events if e.kind == WEEK_COMMITTED] == list(range(1, weeks + 1))
+    assert kinds[-2:] == [WEEK_COMMITTED, PERIOD_DONE]
+    assert kinds.index(INJURIES_PROCESSED) < len(kinds) - 2
+    game = events[0]
+    assert (game.home, game.away) == (results[0].home_id, results[0].away_id)
+    assert (game.home_score, game.away_score) == (results[0].home_score, results[0].away_score)
+    assert all(e.season == 2026 and e.period == 1 for e in events)
+
+
+class _SinkWatcher:
+    """Publisher noting how many games the sink holds as each week is reported."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.games_at = {}
+
+    def publish(self, event, *, conn=None):
+        if event.kind == WEEK_COMMITTED:
+            self.games_at[event.week] = len(self.sink.games)
+
+
+@pytest.mark.parametrize("mode", [{}, {"checkpoints": InMemoryCheckpointStore()}, {"pipeline": True}])
+def test_weeks_are_reported_only_once_their_games_are_in_the_sink(mode):
+    runner = _runner(**mode)
+    watcher = runner.progress = _SinkWatcher(runner.orch.record_sink)
+    runner.run_period(1)
+
+    weeks = range(1, runner.schedule.num_weeks + 1)
+    assert sorted(watcher.games_at) == list(weeks)
+    played = 0
+    for week in weeks:
+        played += len(runner.schedule.week(week))
+        assert watcher.games_at[week] >= played
+
+
+def test_runner_without_a_bus_publishes_nothing():
+    assert _runner().run_period(1)
+
+
+def test_postgres_bus_delivers_only_committed_notifies():
+    from sqlalchemy import text
+
+    from handball.db import get_engine, is_local_db
+    from handball.progress import PostgresProgressBus
+
+    try:
+        engine = get_engine()
+        with engine.connect() as c:
+            c.execute(text("select 1"))
+    except Exception:  # noqa: BLE001
+        pytest.skip("Postgres dev DB not available")
+    if not is_local_db():
+        pytest.skip("local Postgres only")
+
+    bus = PostgresProgressBus(engine, channel="sim_progress_test")
+    try:
+        with bus.subscribe() as sub:
+            sub.get(timeout=1.5)             # let the listener LISTEN
+            with engine.connect() as conn:
+                bus.publish(ProgressEvent(GAME_FINISHED, 2026, 1, 1), conn=conn)
+                conn.rollback()
+            bus.publish(ProgressEvent(PERIOD_DONE, 2026, 1))
+            event = sub.get(timeout=5)
+            assert event is not None and event.kind == PERIOD_DONE
+            assert sub.get(timeout=0.5) is None
+    finally:
+        bus.close()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -100,6 +100,53 @@ def test_all_team_ids_and_load_all(tmp_path):
     assert (tmp_path / "new_york.json").exists()   # filename normalization
 
 
+def _with_record(team_id, record):
+    team = _team(team_id)
+    team.record = record
+    return team
+
+
+def test_records_read_without_loading_teams(tmp_path):
+    for repo in (InMemoryTeamRepository(), JsonTeamRepository(tmp_path)):
+        repo.save(_with_record("New York", (1, 2, 0)))
+        repo.save(_with_record("Boston", (3, 0, 1)))
+        assert repo.records() == {"Boston": (3, 0, 1), "New York": (1, 2, 0)}
+        assert list(repo.records()) == repo.all_team_ids()
+
+
+def test_json_records_come_from_the_manifest(tmp_path):
+    repo = JsonTeamRepository(tmp_path)
+    repo.save(_with_record("Boston", (3, 0, 1)))
+    manifest = json.loads((tmp_path / JsonTeamRepository.MANIFEST).read_text())
+    assert manifest["boston.json"]["record"] == [3, 0, 1]
+    assert repo.all_team_ids() == ["Boston"]           # the manifest is not a team file
+
+
+def test_json_records_reread_a_team_file_changed_behind_the_manifest(tmp_path):
+    repo = JsonTeamRepository(tmp_path)
+    repo.save(_with_record("Boston", (3, 0, 1)))
+    blob = team_to_dict(_with_record("Boston", (4, 0, 1)))
+    (tmp_path / "boston.json").write_text(json.dumps(blob))    # another writer
+    (tmp_path / "new_york.json").write_text(json.dumps(team_to_dict(_with_record("New York", (0, 0, 0)))))
+    assert repo.records() == {"Boston": (4, 0, 1), "New York": (0, 0, 0)}
+
+    (tmp_path / JsonTeamRepository.MANIFEST).unlink()           # lost: read from the files
+    assert repo.records() == {"Boston": (4, 0, 1), "New York": (0, 0, 0)}
+
+
+def test_json_records_never_write_the_manifest(tmp_path):
+    repo = JsonTeamRepository(tmp_path)
+    (tmp_path / "boston.json").write_text(json.dumps(team_to_dict(_with_record("Boston", (3, 0, 1)))))
+    assert repo.records() == {"Boston": (3, 0, 1)}
+    assert not (tmp_path / JsonTeamRepository.MANIFEST).exists()
+
+    repo.save(_with_record("New York", (0, 1, 0)))
+    before = (tmp_path / JsonTeamRepository.MANIFEST).read_text()
+    (tmp_path / "boston.json").touch()                          # stale entry: read, not repaired
+    repo.records()
+    assert (tmp_path / JsonTeamRepository.MANIFEST).read_text() == before
+
+
 def test_corrupt_arrangement_rejected_on_load():
     team = _team()
     blob = team_to_dict(team)
@@ -5,19 +5,32 @@ deterministic SimpleGameEngine. No sheet, no OR-Tools.
 
 `pytest tests/test_season.py` or `python tests/test_season.py`.
 """
+import random
+import time
+
 import pytest
 
 from handball.domain import Player, Team
-from handball.orchestration import InMemoryRecordSink, SeasonOrchestrator, SimpleGameEngine
+from handball.injury_simulator import InjurySimulator
+from handball.orchestration import (
+    GameSimulatorAdapter,
+    InMemoryRecordSink,
+    SeasonOrchestrator,
+    SimpleGameEngine,
+)
 from handball.repository import InMemoryTeamRepository
 from handball.season import (
     PERIODS,
     REGULAR_SEASON_WEEKS,
     WEEKS_PER_PERIOD,
     Schedule,
+    Checkpoint,
+    InMemoryCheckpointStore,
     SeasonRunner,
+    game_seed,
 )
 from handball.sheet_gateway import FakeSheetGateway
+from handball.week_pipeline import PERSIST, PREFETCH, SIMULATE, PipelineError
 
 
 # --- Schedule (pure) -------------------------------------------------------
@@ -150,6 +163,261 @@ def test_standings_reflect_strength(orch_and_repo):
     assert table[-1][0] == "D"
 
 
+
+# --- per-game seeds ---------------------------------------------------------
+def test_game_seed_is_stable_and_distinct_per_game():
+    assert game_seed(2026, 3, "A", "B", 7) == game_seed(2026, 3, "A", "B", 7)
+    seeds = {
+        game_seed(2026, 3, "A", "B", 7),
+        game_seed(2026, 3, "B", "A", 7),
+        game_seed(2026, 4, "A", "B", 7),
+        game_seed(2025, 3, "A", "B", 7),
+        game_seed(2026, 3, "A", "B", 8),
+    }
+    assert len(seeds) == 5
+    assert all(0 <= s < 2**63 for s in seeds)   # fits games.seed (bigint)
+
+
+def test_runner_tags_each_result_with_its_game_seed(orch_and_repo):
+    orch, _ = orch_and_repo
+    runner = SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"]), season=2026, seed=7)
+    for r in runner.run_week(1):
+        assert r.seed == game_seed(2026, 1, r.home_id, r.away_id, 7)
+
+
+def test_week_results_do_not_depend_on_game_order():
+    def _score(r):
+        return r.home_score, r.away_score
+
+    def play(order):
+        repo = InMemoryTeamRepository()
+        for tid, strength in (("A", 8.0), ("B", 4.0), ("C", 6.0), ("D", 2.0)):
+            repo.save(_team(tid, strength))
+        orch = SeasonOrchestrator(repo, None, GameSimulatorAdapter(), InMemoryRecordSink())
+        sched = Schedule.round_robin(["A", "B", "C", "D"])
+        runner = SeasonRunner(orch, sched, season=2026, seed=7)
+        games = order(sched.week(1))
+        return {(h, a): _score(runner._play_game(h, a, 1)) for h, a in games}
+
+    assert play(list) == play(lambda games: list(reversed(games)))
+
+
+def test_run_period_sums_game_metrics():
+    repo = InMemoryTeamRepository()
+    for tid, strength in (("A", 8.0), ("B", 4.0), ("C", 6.0), ("D", 2.0)):
+        repo.save(_team(tid, strength))
+    orch = SeasonOrchestrator(repo, None, GameSimulatorAdapter(metrics=True), InMemoryRecordSink())
+    runner = SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"]), season=2026, seed=7)
+
+    results = runner.run_period(1)
+    total = runner.period_metrics[1]
+    assert total.games == len(results) == 6
+    assert total.shots == sum(r.metrics.shots for r in results)
+    assert total.first_half_time == pytest.approx(sum(r.metrics.first_half_time for r in results))
+
+
+def test_no_period_metrics_without_an_instrumented_engine(orch_and_repo):
+    orch, _ = orch_and_repo
+    runner = SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"]))
+    runner.run_period(1)
+    assert runner.period_metrics == {}
+
+
+# --- parallel weeks ---------------------------------------------------------
+def _league(engine):
+    repo = InMemoryTeamRepository()
+    for tid, strength in (("A", 8.0), ("B", 4.0), ("C", 6.0), ("D", 2.0)):
+        repo.save(_team(tid, strength))
+    return SeasonOrchestrator(repo, None, engine, InMemoryRecordSink()), repo
+
+
+def test_parallel_period_matches_serial():
+    runs = []
+    for workers in (1, 2):
+        orch, repo = _league(GameSimulatorAdapter())
+        runner = SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"]),
+                              season=2026, seed=7, workers=workers)
+        results = runner.run_period(1)
+        runs.append((
+            [(r.home_id, r.away_id, r.home_score, r.away_score, r.player_lines) for r in results],
+            [(r.home_id, r.away_id) for r in orch.record_sink.games],
+            {t: (repo.load(t).record, repo.load(t).starters["Forward"][0].current_season_log)
+             for t in ("A", "B", "C", "D")},
+        ))
+    assert runs[0] == runs[1]
+
+
+def test_parallel_week_rejects_a_team_playing_twice():
+    orch, _ = _league(SimpleGameEngine())
+    runner = SeasonRunner(orch, Schedule(weeks=((("A", "B"), ("B", "C")),)), workers=2)
+    with pytest.raises(ValueError, match="plays twice"):
+        runner.run_week(1)
+
+
+def test_workers_must_be_positive(orch_and_repo):
+    orch, _ = orch_and_repo
+    with pytest.raises(ValueError):
+        SeasonRunner(orch, Schedule.round_robin(["A", "B"]), workers=0)
+
+
+def test_period_batch_needs_a_batching_sink_and_no_pipeline(orch_and_repo):
+    orch, _ = orch_and_repo
+    with pytest.raises(ValueError, match="record sink"):
+        SeasonRunner(orch, Schedule.round_robin(["A", "B"]), period_batch=True)
+    orch.record_sink.period_batch = lambda: None
+    with pytest.raises(ValueError, match="combined"):
+        SeasonRunner(orch, Schedule.round_robin(["A", "B"]), period_batch=True, pipeline=True)
+
+
+# --- checkpoints + resume ---------------------------------------------------
+SIX = ["A", "B", "C", "D", "E", "F"]
+
+
+class CrashingEngine(GameSimulatorAdapter):
+    """Dies on its `crash_at`-th game, like an instance killed mid-period."""
+
+    def __init__(self, crash_at):
+        super().__init__()
+        self.crash_at, self.played = crash_at, 0
+
+    def play(self, home, away, *, seed=None):
+        self.played += 1
+        if self.played == self.crash_at:
+            raise RuntimeError("instance died")
+        return super().play(home, away, seed=seed)
+
+
+def _checkpointed_league(engine, repo=None):
+    repo = repo if repo is not None else InMemoryTeamRepository()
+    for i, tid in enumerate(SIX):
+        repo.save(_team(tid, 2.0 + i))
+    orch = SeasonOrchestrator(repo, None, engine, InMemoryRecordSink())
+    store = InMemoryCheckpointStore()
+
+    def runner(**kwargs):   # a fresh process: new injury RNG from the season seed
+        return SeasonRunner(orch, Schedule.round_robin(SIX), InjurySimulator(random.Random(3), year=2026),
+                            season=2026, seed=7, checkpoints=store, **kwargs)
+    return orch, repo, store, runner
+
+
+def _state(orch, repo):
+    return ([(r.home_id, r.away_id, r.home_score, r.away_score) for r in orch.record_sink.games],
+            {t: (repo.load(t).record, [p.is_injured for p in repo.load(t).roster()]) for t in SIX})
+
+
+def test_each_week_commits_with_a_checkpoint():
+    orch, _, store, runner = _checkpointed_league(GameSimulatorAdapter())
+    runner().run_period(1)
+    assert store.load().week == 5                    # 6 teams -> 5 round-robin weeks
+    assert store.load().injury_rng_state is not None
+    assert len(orch.record_sink.games) == 15
+
+
+def test_resumed_period_matches_an_uninterrupted_one():
+    orch, repo, _, runner = _checkpointed_league(GameSimulatorAdapter())
+    runner().run_period(1)
+    expected = _state(orch, repo)
+
+    engine = CrashingEngine(crash_at=8)              # dies in week 3
+    orch, repo, store, runner = _checkpointed_league(engine)
+    with pytest.raises(RuntimeError):
+        runner().run_period(1)
+    assert store.load().week == 2
+    assert len(orch.record_sink.games) == 6          # weeks 1-2 committed, week 3 not
+
+    engine.crash_at = None
+    resumed = runner().resume_period(1)
+    assert len(resumed) == 9
+    assert _state(orch, repo) == expected
+
+
+def test_resume_of_a_finished_period_plays_nothing():
+    orch, _, store, runner = _checkpointed_league(GameSimulatorAdapter())
+    runner().run_period(1)
+    assert runner().resume_period(1) == []
+    assert len(orch.record_sink.games) == 15
+
+
+def test_run_period_restores_the_injury_rng_from_the_checkpoint():
+    _, _, store, runner = _checkpointed_league(GameSimulatorAdapter())
+    store.save(Checkpoint(week=0, injury_rng_state=InjurySimulator(random.Random(99)).rng_state()))
+    restored = runner()
+    restored.run_period(1)
+
+    orch, _, _, _ = _checkpointed_league(GameSimulatorAdapter())
+    seeded = SeasonRunner(orch, Schedule.round_robin(SIX), InjurySimulator(random.Random(99), year=2026),
+                          season=2026, seed=7)
+    seeded.run_period(1)
+
+    assert restored.injuries.events == seeded.injuries.events
+    assert restored.injuries.rng_state() == seeded.injuries.rng_state() == store.load().injury_rng_state
+
+
+def test_resume_needs_checkpoints(orch_and_repo):
+    orch, _ = orch_and_repo
+    with pytest.raises(ValueError):
+        SeasonRunner(orch, Schedule.round_robin(["A", "B", "C", "D"])).resume_period(1)
+
+
+# --- pipelined periods -------------------------------------------------------
+class SlowRepository(InMemoryTeamRepository):
+    """Counts loads; every save takes `save_delay` seconds and the `fail_on`-th raises."""
+
+    def __init__(self, save_delay=0.0, fail_on=None):
+        super().__init__()
+        self.save_delay, self.fail_on = save_delay, fail_on
+        self.loads, self.saves = 0, 0
+
+    def load(self, team_id):
+        self.loads += 1
+        return super().load(team_id)
+
+    def save(self, team):
+        self.saves += 1
+        if self.saves == self.fail_on:
+            raise RuntimeError("database went away")
+        time.sleep(self.save_delay)
+        super().save(team)
+
+
+@pytest.mark.parametrize("checkpoints", [True, False])
+def test_pipelined_period_matches_a_plain_one(checkpoints):
+    runs = []
+    for pipeline in (False, True):
+        orch, repo, store, runner = _checkpointed_league(GameSimulatorAdapter())
+        r = runner(pipeline=pipeline)
+        if not checkpoints:
+            r.checkpoints = None
+        r.run_period(1)
+        runs.append((_state(orch, repo), store.load()))
+    assert runs[0] == runs[1]
+
+
+def test_pipeline_loads_each_team_once_and_reports_stage_utilisation():
+    repo = SlowRepository()
+    orch, _, _, runner = _checkpointed_league(GameSimulatorAdapter(), repo)
+    repo.save_delay, repo.loads, repo.saves = 0.01, 0, 0
+    r = runner(pipeline=True)
+    r.run_period(1)
+
+    assert repo.loads == len(SIX)
+    stats = r.pipeline_stats[1]
+    assert set(stats.utilisation()) == {PREFETCH, SIMULATE, PERSIST}
+    assert all(0.0 <= u <= 1.0 for u in stats.utilisation().values())
+    assert stats.busy_seconds[PERSIST] >= 0.01 * repo.saves
+    assert r.pipeline_stats[1].bottleneck in (SIMULATE, PERSIST)
+
+
+def test_a_failed_pipelined_write_raises_and_keeps_earlier_weeks():
+    repo = SlowRepository()
+    orch, _, store, runner = _checkpointed_league(GameSimulatorAdapter(), repo)
+    repo.saves, repo.fail_on = 0, len(SIX) + 1       # the first save of week 2
+    with pytest.raises(PipelineError):
+        runner(pipeline=True).run_period(1)
+    assert store.load().week == 1
+    assert len(orch.record_sink.games) == 3
+
+
 if __name__ == "__main__":
     import sys
     sys.exit(pytest.main([__file__, "-q"]))
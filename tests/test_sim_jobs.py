@@ -0,0 +1,87 @@
+"""
+Integration tests for the sim_jobs queue (handball/sim_jobs.py) against a real
+Postgres -- the claim query's SKIP LOCKED and stage ordering only mean anything
+there. Requires the migrated dev database (see tests/test_pg_repository.py);
+the module skips cleanly without it.
+"""
+import pytest
+from sqlalchemy import text
+
+from handball import sim_jobs
+from handball.db import get_engine, is_local_db
+from handball.season import Schedule
+
+try:
+    _engine = get_engine()
+    with _engine.connect() as _c:
+        _c.execute(text("select 1 from sim_jobs limit 1"))
+    _PG_OK = is_local_db()        # destructive tests: local DB only, never remote
+except Exception:  # noqa: BLE001
+    _PG_OK = False
+
+pytestmark = pytest.mark.skipif(not _PG_OK, reason="Postgres dev DB not available/migrated")
+
+_SEASON = 2026
+
+
+@pytest.fixture(autouse=True)
+def _clean_jobs():
+    with _engine.begin() as c:
+        c.execute(text("truncate sim_jobs restart identity"))
+    yield
+    with _engine.begin() as c:
+        c.execute(text("truncate sim_jobs restart identity"))
+
+
+def _enqueue_two_weeks() -> None:
+    schedule = Schedule.from_weeks([[("A", "B"), ("C", "D")], [("A", "C"), ("B", "D")]])
+    with _engine.begin() as c:
+        assert sim_jobs.enqueue_period(c, _SEASON, 1, schedule, 7) == 5
+
+
+def _finish(job) -> None:
+    with _engine.begin() as c:
+        c.execute(text("update sim_jobs set status = 'done' where id = :id"), {"id": job.id})
+
+
+def test_enqueue_seeds_games_like_season_runner():
+    from handball.season import game_seed
+
+    _enqueue_two_weeks()
+    with _engine.connect() as c:
+        rows = c.execute(text("select kind, stage, week, home_slug, away_slug, seed "
+                              "from sim_jobs order by id")).all()
+    assert [r[0] for r in rows] == ["game"] * 4 + ["period_end"]
+    assert [r[1] for r in rows] == [1, 1, 2, 2, 3]
+    assert rows[0][5] == game_seed(_SEASON, 1, "A", "B", 7)
+
+
+def test_concurrent_claims_skip_locked_rows_and_wait_for_earlier_weeks():
+    _enqueue_two_weeks()
+    with _engine.connect() as c1, _engine.connect() as c2, _engine.connect() as c3:
+        first = sim_jobs.claim(c1)
+        second = sim_jobs.claim(c2)
+        assert (first.week, first.home) == (1, "A")
+        assert (second.week, second.home) == (1, "C")   # A-B is locked by c1
+        assert sim_jobs.claim(c3) is None              # week 2 waits for week 1
+        for c in (c1, c2, c3):
+            c.rollback()
+
+    # a claim that rolls back (a worker died) leaves its job queued
+    with _engine.connect() as c:
+        assert sim_jobs.claim(c).id == first.id
+        c.rollback()
+
+
+def test_period_end_runs_after_every_game():
+    _enqueue_two_weeks()
+    kinds = []
+    while True:
+        with _engine.begin() as c:
+            job = sim_jobs.claim(c)
+        if job is None:
+            break
+        kinds.append((job.kind, job.stage))
+        _finish(job)
+    assert kinds == [("game", 1), ("game", 1), ("game", 2), ("game", 2), ("period_end", 3)]
+    assert sim_jobs.progress(_engine, _SEASON, 1) == {"total": 5, "done": 5, "queued": 0, "failed": 0}
@@ -0,0 +1,153 @@
+"""
+SurrogateGameEngine: the fitted score model must be a drop-in GameEngine (same
+GameResult shape and team mutations as GameSimulatorAdapter), the IRLS fit must
+recover known coefficients, the coefficients file must be versioned, and the
+shipped coefficients must track the real simulator's scoring.
+
+`pytest tests/test_surrogate_engine.py` or `python tests/test_surrogate_engine.py`.
+"""
+import json
+
+import numpy as np
+import pytest
+
+import handball.game_simulator as game_simulator
+from handball.domain import Player, Team
+from handball.league import build_projection_league
+from handball.orchestration import GameEngine
+from handball.repository import InMemoryTeamRepository, JsonTeamRepository
+from handball.season import Schedule
+from handball.surrogate_engine import (
+    DEFAULT_COEFFICIENTS, DEFAULT_DATAFILES, FEATURES, TARGETS, SurrogateGameEngine, SurrogateModel, collect,
+)
+
+
+def _team(team_id: str) -> Team:
+    def p(pid, name, pos, off=5.0, deff=5.0, gk=0.1):
+        return Player(id=f"{team_id}-{pid}", name=f"{team_id} {name}", position=pos,
+                      offense=off, defense=deff, goalie_skill=gk, variance=0.5)
+
+    return Team(
+        id=team_id, name=f"{team_id} FC", coaches=["HC", "OC", "DC"],
+        starters={
+            "Forward": [p("f1", "F1", "Forward", off=7), p("f2", "F2", "Forward", off=6), p("f3", "F3", "Forward", off=6)],
+            "Midfielder": [p("m1", "M1", "Midfielder"), p("m2", "M2", "Midfielder"), p("m3", "M3", "Midfielder")],
+            "Defense": [p("d1", "D1", "Defense", deff=7), p("d2", "D2", "Defense", deff=7), p("d3", "D3", "Defense", deff=6)],
+            "Goalie": [p("g1", "G1", "Goalie", off=0.1, deff=0.1, gk=6.0)],
+        },
+        bench={
+            "Forward": [p("f4", "F4", "Forward"), p("f5", "F5", "Forward")],
+            "Midfielder": [p("m4", "M4", "Midfielder"), p("m5", "M5", "Midfielder")],
+            "Defense": [p("d4", "D4", "Defense"), p("d5", "D5", "Defense")],
+            "Goalie": [p("g2", "G2", "Goalie", off=0.1, deff=0.1, gk=5.0)],
+        },
+        reserves=[p("r1", "R1", "Forward"), p("r2", "R2", "Defense")],
+    )
+
+
+def test_engine_satisfies_protocol():
+    assert isinstance(SurrogateGameEngine(), GameEngine)
+
+
+def test_fit_recovers_known_poisson_coefficients():
+    rng = np.random.default_rng(0)
+    n = 4000
+    X = np.column_stack([np.ones(n), rng.normal(0, 0.3, (n, len(FEATURES) - 1))])
+    truth = np.array([3.0, 0.5, -0.4, 0.3, 0.0, 0.2, -0.1])
+    Y = {t: rng.poisson(np.exp(X @ truth)).astype(float) for t in TARGETS}
+
+    model = SurrogateModel.fit(X, Y)
+
+    for t in TARGETS:
+        assert np.allclose(model.coefficients[t], truth, atol=0.03)
+        assert model.dispersion[t] == pytest.approx(1.0, abs=0.1)
+
+
+def test_coefficients_file_round_trips_and_is_versioned(tmp_path):
+    model = SurrogateModel.load()
+    path = tmp_path / "coef.json"
+    model.save(path)
+    assert SurrogateModel.load(path) == model
+
+    stale = json.loads(path.read_text())
+    stale["version"] = model.version + 1
+    path.write_text(json.dumps(stale))
+    with pytest.raises(ValueError):
+        SurrogateModel.load(path)
+
+
+def test_play_returns_a_complete_consistent_game():
+    np.random.seed(3)
+    home, away = _team("Boston"), _team("New York")
+    result = SurrogateGameEngine(rng=np.random.default_rng(1)).play(home, away)
+
+    assert result.home_score != result.away_score
+    assert sum(home.record) == 1 and sum(away.record) == 1
+    assert set(result.player_lines) == {p.id for p in home.roster()} | {p.id for p in away.roster()}
+    for team, score in ((home, result.home_score), (away, result.away_score)):
+        lines = [result.player_lines[p.id] for p in team.roster()]
+        assert sum(line["goals"] for line in lines) == score
+        assert all(line["shots"] >= line["goals"] for line in lines)
+        assert len(team.starters["Forward"][0].current_season_log["goals"]) == 1
+    assert sum(result.player_lines[p.id]["goals_allowed"] for p in home.roster()) == result.away_score
+
+
+def test_ties_resolve_in_overtime_unless_allowed():
+    np.random.seed(5)
+    engine = SurrogateGameEngine(rng=np.random.default_rng(5))
+    results = engine.play_many([(_team("H"), _team("A")) for _ in range(300)])
+    assert all(r.home_score != r.away_score for r in results)
+    assert all(abs(r.home_score - r.away_score) == 1 for r in results if r.went_to_overtime)
+
+    tie_engine = SurrogateGameEngine(allow_tie=True, rng=np.random.default_rng(5))
+    assert not any(r.went_to_overtime for r in tie_engine.play_many([(_team("H"), _team("A")) for _ in range(50)]))
+
+
+def test_shipped_coefficients_track_the_real_simulator():
+    """Production-length real games are slow, so compare against the goal
+    distribution the calibration recorded from the real simulator on the same
+    datafiles_v2 teams, with the same random pairing."""
+    model = SurrogateModel.load()
+    assert model.calibration["regulation_time"] == game_simulator.REGULATION_TIME
+    teams = JsonTeamRepository(DEFAULT_DATAFILES).load_all()
+    np.random.seed(11)
+    engine = SurrogateGameEngine(model, allow_tie=True, rng=np.random.default_rng(11))
+    pairs = [tuple(teams[k] for k in np.random.choice(len(teams), 2, replace=False)) for _ in range(1000)]
+    goals = np.array([[r.home_score, r.away_score] for r in engine.play_many(pairs)]).ravel()
+
+    real_mean, real_sd = model.calibration["mean_goals"], model.calibration["sd_goals"]
+    assert abs(goals.mean() - real_mean) < 0.02 * real_mean
+    assert abs(goals.std() / real_sd - 1) < 0.15
+
+
+def test_collect_produces_per_side_rows(monkeypatch):
+    monkeypatch.setattr(game_simulator, "REGULATION_TIME", 600)
+    np.random.seed(2)
+    X, Y = collect([_team("H"), _team("A"), _team("C")], games=3)
+    assert X.shape == (6, len(FEATURES))
+    assert np.all(X[:, 0] == 1.0)
+    for t in TARGETS:
+        assert Y[t].shape == (6,) and np.all(Y[t] >= 0)
+
+
+def test_projection_league_never_writes_back_to_the_source():
+    np.random.seed(4)
+    source = InMemoryTeamRepository()
+    for tid in ("A", "B", "C", "D"):
+        source.save(_team(tid))
+    league = build_projection_league(source, seed=1, schedule=Schedule.round_robin(["A", "B", "C", "D"]))
+
+    results = league.run_week(1) + league.run_week(2) + league.run_week(3)
+
+    assert len(results) == 6
+    assert sum(sum(league.orch.team_repo.load(t).record) for t in "ABCD") == 12
+    assert all(source.load(t).record == (0, 0, 0) for t in "ABCD")
+
+
+def test_default_coefficients_file_ships_with_the_package():
+    assert DEFAULT_COEFFICIENTS.exists()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -6,51 +6,96 @@ Author: Oliver Hvidsten
 import pytest
 import numpy as np
 
-from handball.utils import ProbabilityStack, dict_to_str, print_roster
+from handball.utils import AliasTable, RandomSource, dict_to_str, print_roster
 
 
 # ======================================================================
-# ProbabilityStack
+# RandomSource
 # ======================================================================
 
-class TestProbabilityStack:
-    def test_initialization(self):
-        ps = ProbabilityStack(length=50)
-        assert ps.index == 0
-        assert len(ps.backing_array) == 50
-
-    def test_pop_returns_float_between_0_and_1(self):
-        ps = ProbabilityStack(length=100)
-        for _ in range(100):
-            val = ps.pop()
-            assert 0.0 <= val < 1.0
-
-    def test_pop_advances_index(self):
-        ps = ProbabilityStack(length=10)
-        ps.pop()
-        assert ps.index == 1
-        ps.pop()
-        assert ps.index == 2
-
-    def test_regeneration_on_exhaustion(self):
-        ps = ProbabilityStack(length=5)
+class TestRandomSource:
+    def test_same_seed_same_stream(self):
+        a, b = RandomSource(7), RandomSource(7)
+        assert [a.uniform() for _ in range(10)] == [b.uniform() for _ in range(10)]
+        assert [a.normal(4, 1.5) for _ in range(10)] == [b.normal(4, 1.5) for _ in range(10)]
+
+    def test_uniforms_refill_across_blocks(self):
+        rs = RandomSource(1, block_size=4)
+        vals = [rs.uniform() for _ in range(11)]
+        assert all(0.0 <= v < 1.0 for v in vals)
+        assert len(set(vals)) == 11
+
+    def test_normal_scales_and_shifts(self):
+        rs = RandomSource(2)
+        draws = np.array([rs.normal(4, 1.5) for _ in range(20000)])
+        assert abs(draws.mean() - 4) < 0.05
+        assert abs(draws.std() - 1.5) < 0.05
+
+    def test_normals_vector_matches_loc_and_scale(self):
+        rs = RandomSource(4, block_size=8)
+        assert rs.normals([0.0, 10.0], [1.0, 0.0])[1] == 10.0
+
+    def test_normals_consume_the_same_stream_as_normal(self):
+        a, b = RandomSource(6, block_size=8), RandomSource(6, block_size=8)
+        a.normal()
+        b.normal()
+        vector = a.normals(np.full(20, 1.0), np.full(20, 2.0))   # spans several blocks
+        assert np.allclose(vector, [b.normal(1.0, 2.0) for _ in range(20)])
+        assert a.normal() == b.normal()
+
+    def test_draws_counts_every_value_handed_out(self):
+        rs = RandomSource(8, block_size=4)
+        for _ in range(9):
+            rs.uniform()
         for _ in range(5):
-            ps.pop()
-        val = ps.pop()
-        assert 0.0 <= val < 1.0
-        assert ps.index == 1
+            rs.normal()
+        rs.normals(np.zeros(6), np.ones(6))      # straddles a refill
+        assert rs.draws == 9 + 5 + 6
 
-    def test_multiple_regenerations(self):
-        ps = ProbabilityStack(length=3)
-        for _ in range(15):
-            val = ps.pop()
-            assert 0.0 <= val < 1.0
+    def test_from_global_follows_np_random_seed(self):
+        np.random.seed(9)
+        first = RandomSource.from_global().uniform()
+        np.random.seed(9)
+        assert RandomSource.from_global().uniform() == first
 
-    def test_default_length(self):
-        ps = ProbabilityStack()
-        assert len(ps.backing_array) == 1000
+    def test_shares_a_given_generator(self):
+        gen = np.random.default_rng(0)
+        assert RandomSource(gen).generator is gen
 
 
+# ======================================================================
+# AliasTable
+# ======================================================================
+
+class TestAliasTable:
+    WEIGHTS = [45 * 7, 45 * 6, 45 * 6, 45 * 5, 45 * 5, 45 * 5, 22.5 * 5, 22.5 * 5, 22.5 * 5, 22.5 * 5]
+
+    def test_draw_matches_weights(self):
+        table = AliasTable(self.WEIGHTS)
+        u = np.random.default_rng(0).random(100000)
+        counts = np.bincount([table.draw(x) for x in u], minlength=10)
+        expected = np.array(self.WEIGHTS) / sum(self.WEIGHTS)
+        assert np.allclose(counts / len(u), expected, atol=0.005)
+
+    def test_zero_weight_is_never_drawn(self):
+        table = AliasTable([0.0, 1.0, 0.0, 3.0])
+        draws = {table.draw(x) for x in np.linspace(0, 1, 10001, endpoint=False)}
+        assert draws == {1, 3}
+
+    def test_single_outcome(self):
+        assert AliasTable([2.0]).draw(0.999) == 0
+
+    def test_draw_many_agrees_with_draw(self):
+        table = AliasTable(self.WEIGHTS)
+        u = np.random.default_rng(1).random(1000)
+        assert table.draw_many(u).tolist() == [table.draw(x) for x in u]
+
+    def test_draw_rows_uses_each_rows_table(self):
+        a, b = AliasTable([1.0, 0.0]), AliasTable([0.0, 1.0])
+        prob, alias = AliasTable.stack([a, b, a])
+        u = np.random.default_rng(2).random(3)
+        assert AliasTable.draw_rows(prob, alias, u).tolist() == [0, 1, 0]
+
 
 # ======================================================================
 # dict_to_str
@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { supabase } from "../lib/supabase";
+import { apiFetch } from "../lib/api";
 import { DataTable, Alert } from "../ds";
 
 interface Row {
@@ -9,6 +10,18 @@ interface Row {
   wins: number;
   losses: number;
   ties: number;
+  goals_for: number;
+  goals_against: number;
+  goal_diff: number;
+  streak: number;
+}
+
+const ZERO = { wins: 0, losses: 0, ties: 0, goals_for: 0, goals_against: 0, goal_diff: 0, streak: 0 };
+
+function streakLabel(n: number) {
+  if (n > 0) return `W${n}`;
+  if (n < 0) return `L${-n}`;
+  return "—";
 }
 
 export default function Standings() {
@@ -17,15 +30,38 @@ export default function Standings() {
   const nav = useNavigate();
 
   useEffect(() => {
-    supabase
-      .from("teams")
-      .select("slug, name, wins, losses, ties")
-      .order("wins", { ascending: false })
-      .order("losses", { ascending: true })
-      .then(({ data, error }) => {
-        if (error) setErr(error.message);
-        else setRows((data as Row[]) ?? []);
-      });
+    (async () => {
+      // The active season, as the API picks it (season_state); until its first
+      // game has a standings row every team shows 0-0-0.
+      let season: number;
+      try {
+        season = (await apiFetch<{ season: number }>("/season/state", { method: "GET" })).season;
+      } catch (e: any) {
+        setErr(e?.message ?? "could not load the active season");
+        return;
+      }
+      const { data: teams, error: teamErr } = await supabase.from("teams").select("id, slug, name");
+      if (teamErr) { setErr(teamErr.message); return; }
+      // same order as the backend's draft/playoff seeding (standings_repository)
+      const { data, error } = await supabase
+        .from("team_season_standings")
+        .select("team_id, wins, losses, ties, goals_for, goals_against, goal_diff, streak")
+        .eq("season", season)
+        .order("wins", { ascending: false })
+        .order("losses", { ascending: true })
+        .order("goal_diff", { ascending: false })
+        .order("goals_for", { ascending: false });
+      if (error) { setErr(error.message); return; }
+      const table: any[] = data ?? [];
+      const byId = new Map((teams ?? []).map((t: any) => [t.id, t]));
+      const ranked: Row[] = table.map((s: any) => ({ ...byId.get(s.team_id), ...s }));
+      const seen = new Set(table.map((s: any) => s.team_id));
+      const unplayed = (teams ?? [])
+        .filter((t: any) => !seen.has(t.id))
+        .sort((a: any, b: any) => a.slug.localeCompare(b.slug))
+        .map((t: any) => ({ ...ZERO, slug: t.slug, name: t.name }));
+      setRows([...ranked, ...unplayed]);
+    })();
   }, []);
 
   const columns = [
@@ -34,6 +70,10 @@ export default function Standings() {
     { key: "losses", header: "L", numeric: true },
     { key: "ties", header: "T", numeric: true },
     { key: "pts", header: "PTS", numeric: true, render: (r: Row) => r.wins * 2 + r.ties },
+    { key: "goals_for", header: "GF", numeric: true },
+    { key: "goals_against", header: "GA", numeric: true },
+    { key: "goal_diff", header: "DIFF", numeric: true, render: (r: Row) => (r.goal_diff > 0 ? `+${r.goal_diff}` : r.goal_diff) },
+    { key: "streak", header: "STRK", render: (r: Row) => streakLabel(r.streak) },
   ];
 
   return (